@@ -0,0 +1,72 @@
+import sys
+import os
+import time
+import argparse
+import yaml
+
+# 解決路徑問題
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.infrastructure.config_loader import ConfigLoader
+from src.infrastructure.message_parsers.parser_factory import ParserFactory
+from src.core.backtester import PRESETS, load_signals, load_candles, param_grid, run_backtest, sweep
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="以歷史訊號與 K 線回測止盈階梯 / 移動止損參數 (多核心平行掃描)")
+    parser.add_argument("signals", help="歷史訊號 (JSONL：原始訊息記錄 {t,s,m} 或已解析的訊號 {t,symbol,side,...})")
+    parser.add_argument("--candles", required=True, help="K 線目錄 (每個交易對一個 CSV：timestamp,open,high,low,close)")
+    parser.add_argument("--config", default="config.yaml", help="配置檔路徑 (解析原始訊息時取 signals.sources 的解析器)")
+    parser.add_argument("--preset", default=",".join(PRESETS), help=f"基礎參數 (逗號分隔：{', '.join(PRESETS)})")
+    parser.add_argument("--grid", action="append", default=[], metavar="FIELD=V1,V2",
+                        help="掃描參數 (可重複，例: --grid max_tps=2,3,4 --grid trail=ladder,breakeven)")
+    parser.add_argument("--workers", type=int, default=0, help="平行行程數 (0 為 CPU 核心數)")
+    parser.add_argument("--top", type=int, default=20, help="報表列出的參數組數 (依總報酬排序)")
+    parser.add_argument("--trades", help="另存基礎參數的逐筆結果 (CSV)")
+    return parser.parse_args()
+
+def parse_grid(items):
+    """--grid max_tps=2,3 -> {'max_tps': [2, 3]} (數值 / null 以 YAML 規則轉換)"""
+    grid = {}
+    for item in items:
+        field, _, values = item.partition("=")
+        grid[field.strip()] = [yaml.safe_load(v) for v in values.split(",")]
+    return grid
+
+def build_parsers(config_path):
+    """依配置檔的 signals.sources 建立解析器 (只在訊號檔為原始訊息記錄時使用)"""
+    if not os.path.exists(config_path):
+        return {}
+    sources = ConfigLoader.load_config(config_path).get('signals', {}).get('sources', [])
+    parsers = {src['name']: ParserFactory.create_parser(src.get('parser')) for src in sources if src.get('parser')}
+    return {name: p for name, p in parsers.items() if p}
+
+def main():
+    args = parse_args()
+    signals = load_signals(args.signals, build_parsers(args.config))
+    candles = load_candles(args.candles, sorted({s.symbol for _, s in signals}))
+    print(f"訊號: {len(signals)} | 有 K 線的交易對: {len(candles)}")
+    if not signals:
+        return
+
+    grid = parse_grid(args.grid)
+    presets = [PRESETS[name] for name in args.preset.split(",")]
+    params_list = [params for base in presets for params in param_grid(base, grid)]
+
+    started = time.perf_counter()
+    results = sweep(signals, candles, params_list, workers=args.workers or None)
+    elapsed = time.perf_counter() - started
+    print(f"參數組: {len(params_list)} | 耗時: {elapsed:.2f}s ({len(params_list) * len(signals) / elapsed:,.0f} 筆模擬/s)\n")
+
+    print(f"{'參數':<48}{'進場':>6}{'勝率':>8}{'平均 %':>9}{'總報酬 %':>10}{'獲利因子':>9}{'平均 R':>8}{'平均 TP':>8}{'最大回撤 %':>11}")
+    for row in results.sort_values("total_pnl", ascending=False).head(args.top).itertuples():
+        print(f"{row.name:<48}{row.entered:>6}{row.win_rate:>8.1%}{row.avg_pnl * 100:>9.3f}{row.total_pnl * 100:>10.2f}"
+              f"{row.profit_factor:>9.2f}{row.avg_r:>8.2f}{row.avg_tp:>8.2f}{row.max_drawdown * 100:>11.2f}")
+
+    if args.trades:
+        for base in presets:
+            path = args.trades if len(presets) == 1 else f"{os.path.splitext(args.trades)[0]}_{base.name}.csv"
+            run_backtest(signals, candles, base).to_csv(path, index=False)
+            print(f"\n逐筆結果已寫入 {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from src.core.indicators import SMA, EMA, ATR, RSI, Crossover
+
+FAST, SLOW, PERIOD = 12, 26, 14
+
+def make_bars(symbols: int, n: int, seed: int = 0):
+    """每個交易對一條隨機漫步 K 線 (high / low / close)"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, (symbols, n)), axis=1))
+    spread = np.abs(rng.normal(0, 0.001, (symbols, n))) * close
+    return close + spread, close - spread, close
+
+class Incremental:
+    """單一交易對的串流指標組 (每根 K 線 O(1) 更新)"""
+    __slots__ = ("sma", "fast", "slow", "atr", "rsi", "cross")
+
+    def __init__(self):
+        self.sma, self.fast, self.slow = SMA(SLOW), EMA(FAST), EMA(SLOW)
+        self.atr, self.rsi, self.cross = ATR(PERIOD), RSI(PERIOD), Crossover()
+
+    def update(self, high: float, low: float, close: float):
+        self.sma.update(close)
+        self.atr.update(high, low, close)
+        self.rsi.update(close)
+        return self.cross.update(self.fast.update(close), self.slow.update(close))
+
+def pandas_recompute(high: np.ndarray, low: np.ndarray, close: np.ndarray, lookback: int):
+    """每個 tick 以最近 lookback 根重算 rolling / ewm 視窗 (常見的寫法)"""
+    h, l, c = (pd.Series(a[-lookback:]) for a in (high, low, close))
+    sma = c.rolling(SLOW).mean().iloc[-1]
+    macd = c.ewm(span=FAST, adjust=False).mean() - c.ewm(span=SLOW, adjust=False).mean()
+    cross = int(np.sign(macd.iloc[-1])) - int(np.sign(macd.iloc[-2]))
+    prev = c.shift()
+    tr = pd.concat([h - l, (h - prev).abs(), (l - prev).abs()], axis=1).max(axis=1)
+    atr = tr.ewm(alpha=1 / PERIOD, adjust=False).mean().iloc[-1]
+    delta = c.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / PERIOD, adjust=False).mean().iloc[-1]
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / PERIOD, adjust=False).mean().iloc[-1]
+    rsi = (50.0 if gain == 0 else 100.0) if loss == 0 else 100 - 100 / (1 + gain / loss)
+    return sma, cross, atr, rsi
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="串流指標 (O(1) 更新) 與每 tick 重算 pandas 滾動視窗的比較")
+    parser.add_argument("--symbols", type=int, default=300, help="交易對數量")
+    parser.add_argument("--history", type=int, default=500, help="每個交易對的歷史 K 線數 (pandas 重算的視窗長度)")
+    parser.add_argument("--ticks", type=int, default=20, help="量測的新 K 線數 (每個交易對)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    high, low, close = make_bars(args.symbols, args.history + args.ticks)
+    print(f"=== 指標更新壓測 (交易對 {args.symbols} / 歷史 {args.history} / 新 K 線 {args.ticks}) ===\n")
+
+    # 串流指標：先以歷史 K 線暖機，再量測新 K 線的更新
+    books = [Incremental() for _ in range(args.symbols)]
+    for s, book in enumerate(books):
+        for i in range(args.history):
+            book.update(high[s, i], low[s, i], close[s, i])
+    started = time.perf_counter()
+    crosses = 0
+    for i in range(args.history, args.history + args.ticks):
+        for s, book in enumerate(books):
+            crosses += book.update(high[s, i], low[s, i], close[s, i]) != 0
+    incremental = time.perf_counter() - started
+
+    # pandas：每個新 K 線重算整個視窗
+    started = time.perf_counter()
+    pandas_crosses = 0
+    for i in range(args.history, args.history + args.ticks):
+        for s in range(args.symbols):
+            _, cross, atr, rsi = pandas_recompute(high[s, :i + 1], low[s, :i + 1], close[s, :i + 1], args.history)
+            pandas_crosses += cross != 0
+    recompute = time.perf_counter() - started
+
+    # 最後一根的數值比對 (EMA 類起始值不同，視窗夠長時差異可忽略)
+    sma, _, atr, rsi = pandas_recompute(high[-1], low[-1], close[-1], args.history)
+    book = books[-1]
+    updates = args.symbols * args.ticks
+    print(f"{'方式':<18}{'總耗時 s':>10}{'每次更新 µs':>14}{'交叉次數':>10}")
+    print(f"{'串流 (ring buffer)':<18}{incremental:>10.3f}{incremental / updates * 1e6:>14.2f}{crosses:>10}")
+    print(f"{'pandas 重算':<18}{recompute:>10.3f}{recompute / updates * 1e6:>14.2f}{pandas_crosses:>10}")
+    print(f"\n加速: {recompute / incremental:,.0f}x")
+    print(f"數值差異 (最後一個交易對): SMA {abs(book.sma.value - sma):.2e} | ATR {abs(book.atr.value - atr):.2e} | RSI {abs(book.rsi.value - rsi):.2e}")
+
+if __name__ == "__main__":
+    main()
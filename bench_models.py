@@ -0,0 +1,65 @@
+import timeit
+import tracemalloc
+from src.core.models import TradeSignal, TPLeg, TrackedTrade
+
+N = 10000
+
+def make_dict_trade(i: int):
+    return {
+        "signal_id": f"sig{i}", "symbol": "BTC/USDT:USDT", "side": "buy", "entry_price": 95000.0 + i,
+        "tp_orders": [{"id": f"{i}-{s}", "price": 96000.0 + s * 500, "stage": s} for s in range(1, 5)],
+        "sl_order_id": f"{i}-sl", "tp_history": [96500.0, 97000.0, 97500.0, 98000.0],
+        "current_tp_stage": 0, "remaining_amount": 0.01, "timestamp": "12:00:00", "opened_at": 0,
+    }
+
+def make_model_trade(i: int):
+    return TrackedTrade(
+        signal_id=f"sig{i}", symbol="BTC/USDT:USDT", side="buy", entry_price=95000.0 + i,
+        tp_orders=[TPLeg(id=f"{i}-{s}", price=96000.0 + s * 500, stage=s) for s in range(1, 5)],
+        sl_order_id=f"{i}-sl", tp_history=(96500.0, 97000.0, 97500.0, 98000.0),
+        current_tp_stage=0, remaining_amount=0.01, timestamp="12:00:00",
+    )
+
+def make_dict_signal(i: int):
+    return {
+        "symbol": "BTC/USDT:USDT", "side": "buy", "leverage": 10, "entry_min": 95000.0, "entry_max": 95500.0 + i,
+        "stop_loss": 93000.0, "take_profits": [96500.0, 97000.0, 97500.0, 98000.0], "raw_text": "",
+    }
+
+def make_model_signal(i: int):
+    return TradeSignal(
+        symbol="BTC/USDT:USDT", side="buy", leverage=10, entry_min=95000.0, entry_max=95500.0 + i,
+        stop_loss=93000.0, take_profits=(96500.0, 97000.0, 97500.0, 98000.0),
+    )
+
+def measure_allocation(factory) -> int:
+    """建立 N 筆物件後仍存活的記憶體 (bytes)"""
+    tracemalloc.start()
+    objects = [factory(i) for i in range(N)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return current
+
+def measure_access(trade, getter) -> float:
+    """監控迴圈熱路徑：讀取交易對、止盈單 ID 與止盈級別 (每百萬次秒數)"""
+    return min(timeit.repeat(lambda: getter(trade), number=1_000_000, repeat=3))
+
+def main():
+    print(f"=== 訊號 / 持倉模型基準測試 (N={N}) ===\n")
+
+    rows = [
+        ("TradeSignal", measure_allocation(make_dict_signal), measure_allocation(make_model_signal)),
+        ("TrackedTrade + 4 TPLeg", measure_allocation(make_dict_trade), measure_allocation(make_model_trade)),
+    ]
+    print(f"{'記憶體':<24}{'dict (KiB)':>12}{'slots (KiB)':>14}{'節省':>8}")
+    for name, as_dict, as_model in rows:
+        print(f"{name:<24}{as_dict / 1024:>12.0f}{as_model / 1024:>14.0f}{1 - as_model / as_dict:>8.0%}")
+
+    dict_time = measure_access(make_dict_trade(0), lambda t: (t['symbol'], t['tp_orders'][0]['id'], t['current_tp_stage']))
+    model_time = measure_access(make_model_trade(0), lambda t: (t.symbol, t.tp_orders[0].id, t.current_tp_stage))
+    print(f"\n{'屬性存取 (每百萬次)':<24}{'dict (s)':>12}{'slots (s)':>14}{'節省':>8}")
+    print(f"{'TrackedTrade':<24}{dict_time:>12.3f}{model_time:>14.3f}{1 - model_time / dict_time:>8.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import time
+from src.infrastructure.message_parsers.parser_factory import ParserFactory
+
+N = 20000
+
+SAMPLES = {
+    "adtrack_parser": """🔮預言機訊號🔮
+💎交易對： DAMUSDT
+📈倉位： SHORT
+⚡槓桿倍數： 6X
+🎯進場區域： 0.02023-0.02003
+🛑止損： 0.0215
+✅目標1： 0.0195
+✅目標2： 0.0190
+✅目標3： 0.0185
+✅目標4： 0.0180""",
+    "italy_parser": """MORPHO/USDT
+LONG Cross 20x
+Entry Zone: 1.2168/1.2446
+TP1: 1.30
+TP2: 1.40
+SL: 1.10""",
+}
+
+NOISE = "gm everyone, market looks choppy today — waiting for a cleaner setup before the next call"
+
+def throughput(parser, message: str) -> float:
+    """每秒可解析的訊息數"""
+    started = time.perf_counter()
+    for _ in range(N):
+        parser.parse(message)
+    return N / (time.perf_counter() - started)
+
+def main():
+    print(f"=== 訊號格式解析效能 (N={N}) ===\n")
+    print(f"{'格式':<18}{'訊號 (msg/s)':>16}{'雜訊 (msg/s)':>16}")
+    for name, message in SAMPLES.items():
+        parser = ParserFactory.create_parser(name)
+        assert parser.parse(message) is not None, f"{name} 範例訊息解析失敗"
+        print(f"{name:<18}{throughput(parser, message):>16,.0f}{throughput(parser, NOISE):>16,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import io
+import sys
+import time
+import asyncio
+import argparse
+import contextlib
+from src.adapters.sim_adapter import SimulatedExchange
+from src.core.models import TradeSignal
+from src.strategies import adtrack_strategy, italy_strategy
+from src.strategies.adtrack_strategy import AdTrack
+from src.strategies.italy_strategy import ItalyStrategy
+
+STRATEGIES = {"AdTrack": AdTrack, "ItalyStrategy": ItalyStrategy}
+LADDER = (102.0, 104.0, 106.0, 108.0)
+
+class NullConsole:
+    """取代策略模組的 Rich Console (面板渲染每筆約數毫秒，會掩蓋下單流程本身的成本)"""
+    def print(self, *args, **kwargs):
+        pass
+
+def build_exchange(symbols, latency_ms: float, error_every: int, stop_amend: str) -> SimulatedExchange:
+    errors = [{"endpoint": "order/create", "code": 10001, "every": error_every}] if error_every else []
+    exchange = SimulatedExchange()
+    exchange.initialize({'active': 'sim', 'sim': {
+        'prices': {symbol: 100.0 for symbol in symbols},
+        'latency_ms': latency_ms,
+        'errors': errors,
+        'stop_amend': stop_amend,
+        'seed': 1,
+    }})
+    return exchange
+
+def make_signals(symbols, n: int):
+    return [
+        TradeSignal(symbol=symbols[i % len(symbols)], side='buy', leverage=10, entry_min=99.0, entry_max=101.0,
+                    stop_loss=95.0, take_profits=LADDER, signal_id=f"b{i}")
+        for i in range(n)
+    ]
+
+async def run(name: str, args) -> dict:
+    symbols = [f"S{i}/USDT:USDT" for i in range(args.symbols)]
+    exchange = build_exchange(symbols, args.latency, args.error_every, args.stop_amend)
+    await exchange.warm_up()
+    strategy = STRATEGIES[name](exchange)
+    signals = make_signals(symbols, args.signals)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        strategy.on_init({'investment_mode': 'USDT', 'investment_value': 100.0})
+        started = time.perf_counter()
+        for i in range(0, len(signals), args.concurrency):
+            await asyncio.gather(*(strategy.handle_signal(s, "bench") for s in signals[i:i + args.concurrency]))
+        entry_elapsed = time.perf_counter() - started
+        tracked = len(strategy.watched_trades)
+
+        # 價格逐級走過止盈階梯；每級等待推送回呼 (止盈成交 -> 移動止損) 全部結束後才走下一級
+        started = time.perf_counter()
+        baseline = len(asyncio.all_tasks())
+        for level in LADDER:
+            for symbol in symbols:
+                exchange.set_price(symbol, level + 0.5)
+            await asyncio.sleep(0)
+            while len(asyncio.all_tasks()) > baseline and time.perf_counter() - started < 30:
+                await asyncio.sleep(0.001)
+        exit_elapsed = time.perf_counter() - started
+        await strategy.stop()
+    await exchange.close()
+    return {"entry_rate": len(signals) / entry_elapsed, "tracked": tracked,
+            "exit_ms": exit_elapsed * 1000, "left": len(strategy.watched_trades), **exchange.stats()}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="以模擬交易所離線壓測訊號策略")
+    parser.add_argument("--signals", type=int, default=2000, help="訊號筆數")
+    parser.add_argument("--symbols", type=int, default=200, help="交易對數量")
+    parser.add_argument("--concurrency", type=int, default=64, help="同時執行的訊號數 (對應管線工作者數)")
+    parser.add_argument("--latency", type=float, default=0, help="每次請求的模擬延遲 (毫秒)")
+    parser.add_argument("--stop-amend", choices=["edit", "replace"], default="edit", help="移動止損方式：原單改價 / 撤單重掛")
+    parser.add_argument("--render", action="store_true", help="保留策略的 Rich 面板渲染 (預設略過以只量測下單流程)")
+    parser.add_argument("--error-every", type=int, default=0, help="每第 N 筆下單注入 10001 錯誤 (0 為不注入)")
+    return parser.parse_args()
+
+async def main():
+    args = parse_args()
+    if not args.render:
+        adtrack_strategy.console = italy_strategy.console = NullConsole()
+    print(f"=== 模擬交易所策略壓測 (訊號 {args.signals} / 交易對 {args.symbols} / 延遲 {args.latency:g}ms / 移動止損 {args.stop_amend}) ===\n")
+    print(f"{'策略':<16}{'進場 (signal/s)':>17}{'追蹤中':>8}{'出場 ms':>10}{'成交':>8}{'改單':>8}{'觸發':>8}{'取消':>8}{'拒單':>8}{'殘留':>6}")
+    for name in STRATEGIES:
+        r = await run(name, args)
+        print(f"{name:<16}{r['entry_rate']:>17,.0f}{r['tracked']:>8}{r['exit_ms']:>10.1f}{r['fills']:>8}{r['amends']:>8}{r['triggers']:>8}{r['cancels']:>8}{r['rejects']:>8}{r['left']:>6}")
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(main())
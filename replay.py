@@ -0,0 +1,97 @@
+import sys
+import os
+import asyncio
+import argparse
+
+# 解決路徑問題
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.infrastructure.config_loader import ConfigLoader
+from src.infrastructure.signal_recorder import read_records
+from src.infrastructure.signal_replay import SignalReplayer
+from src.core.exchange_manager import ExchangeManager
+from src.core.strategy_factory import StrategyFactory
+from src.core.strategy_engine import StrategyEngine
+
+# 修正 Windows 平台上 ProactorEventLoop 關閉時的 bug
+if sys.platform == 'win32':
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="重播訊號記錄檔並輸出吞吐與延遲報表")
+    parser.add_argument("record", help="訊號記錄檔 (signals.recorder 產生的 JSONL)")
+    parser.add_argument("--speed", type=float, default=0, help="重播速度：1 為即時、N 為 N 倍速、0 為最大速度 (預設)")
+    parser.add_argument("--config", default="config.yaml", help="配置檔路徑")
+    parser.add_argument("--accounts", help="使用的帳戶區塊 (逗號分隔，預設為 exchange.active)")
+    parser.add_argument("--source", help="只重播指定來源")
+    parser.add_argument("--traces", help="另存每筆訊號的追蹤點 (JSONL)")
+    parser.add_argument("--backend", choices=["sim", "config"], default="sim", help="sim: 以模擬交易所取代選定帳戶 (預設)；config: 依帳戶區塊的 type 建立")
+    parser.add_argument("--allow-live", action="store_true", help="backend 為 config 時允許對真實交易所帳戶下單 (ccxt 類型的帳戶區塊)")
+    return parser.parse_args()
+
+def simulated_accounts(exchange_cfg, accounts):
+    """將選定帳戶改為模擬交易所 (保留帳戶的 params，模擬參數取 exchange.sim 區塊)"""
+    template = exchange_cfg.get('sim') or {}
+    result = dict(exchange_cfg)
+    for account in accounts:
+        block = ExchangeManager._resolve_config({**exchange_cfg, 'active': account})[1]
+        result[account] = {**template, 'type': 'sim', 'params': block.get('params') or template.get('params')}
+    return result
+
+def build_engine(config, args) -> StrategyEngine:
+    exchange_cfg = config.get('exchange', {})
+    active = args.accounts.split(",") if args.accounts else exchange_cfg.get('active', [])
+    accounts = active if isinstance(active, list) else [active]
+
+    if args.backend == 'sim':
+        exchange_cfg = simulated_accounts(exchange_cfg, accounts)
+
+    live = [a for a in accounts if ExchangeManager._resolve_config({**exchange_cfg, 'active': a})[1].get('type', 'ccxt').lower() == 'ccxt']
+    if live and not args.allow_live:
+        raise SystemExit(f"帳戶 {', '.join(live)} 會對真實交易所下單；確認為測試網後請加上 --allow-live")
+
+    adapters = ExchangeManager.create_async_exchanges(exchange_cfg, accounts)
+    exchange = next(iter(adapters.values()))
+    return StrategyEngine(
+        exchange, adapters,
+        pipeline_config=config.get('pipeline', {}),
+        tracing_config={'path': args.traces, 'window': 100000},
+        # 重播不寫入正式的持倉狀態庫
+        store_config={'enabled': False}
+    )
+
+def add_strategies(engine: StrategyEngine, config) -> None:
+    """依 signals.sources 中各來源的 strategy 建立策略 (參數取策略預設值 + 帳戶覆寫)"""
+    signal_cfg = config.get('signals', {})
+    for src in signal_cfg.get('sources', []):
+        strat_name = src.get('strategy')
+        if not strat_name:
+            continue
+        for account, account_exchange in engine.accounts.items():
+            strategy = StrategyFactory.create_strategy(strat_name, account_exchange)
+            strategy.target_source = src['name']
+            params = {k: info.get('default') for k, info in strategy.requirements.items()}
+            params.update(ExchangeManager.account_params(config.get('exchange', {}), account))
+            engine.add_strategy(strategy, params)
+    engine.setup_signal_sources({**signal_cfg, 'enabled': True})
+
+async def main():
+    args = parse_args()
+    config = ConfigLoader.load_config(args.config)
+    engine = build_engine(config, args)
+    await asyncio.gather(*(adapter.warm_up() for adapter in engine.accounts.values()))
+    add_strategies(engine, config)
+    engine.start()
+
+    replayer = SignalReplayer(engine, speed=args.speed)
+    try:
+        await replayer.run(read_records(args.record, args.source))
+    finally:
+        await engine.stop()
+    print("\n".join(["", "=== 重播報表 ==="] + replayer.report()))
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -1,6 +1,7 @@
 import ccxt
-from typing import Dict, Any, List
-from src.core.interfaces.exchange_abc import ExchangeInterface
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from src.core.interfaces.exchange_abc import ExchangeInterface, batch_result
 
 class CCXTAdapter(ExchangeInterface):
     """
@@ -8,6 +9,9 @@ class CCXTAdapter(ExchangeInterface):
     將 CCXT 的 Unified API 封裝進系統定義的 ExchangeInterface。
     """
 
+    # 單次批次下單的最大筆數
+    BATCH_ORDER_LIMIT = 10
+
     def __init__(self):
         self._exchange: ccxt.Exchange = None
         self._exchange_name: str = ""
@@ -61,6 +65,76 @@ class CCXTAdapter(ExchangeInterface):
         # CCXT 的 create_order 本身就是統一接口
         return self._exchange.create_order(symbol, order_type, side, amount, price, params)
 
+    def create_orders(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        批次建立訂單 (支援時使用交易所批次端點分段送出，否則以執行緒並行逐筆送出)。
+        只有失敗的分段會退回逐筆送出；逾時等結果未知的分段先以 clientOrderId 查詢，只補送確實未成立的訂單。
+        """
+        if len(orders) > 1 and self._exchange.has.get('createOrders'):
+            reports = []
+            for i in range(0, len(orders), self.BATCH_ORDER_LIMIT):
+                chunk = orders[i:i + self.BATCH_ORDER_LIMIT]
+                try:
+                    batch = self._exchange.create_orders(chunk)
+                except Exception as e:
+                    reports.extend(self._recover_chunk(chunk, e))
+                    continue
+                results = list(batch) + [None] * (len(chunk) - len(batch))
+                reports.extend(batch_result(request, order) for request, order in zip(chunk, results))
+            return reports
+
+        return self._create_each(orders)
+
+    def _create_each(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """以執行緒並行逐筆送出"""
+        def submit(o):
+            try:
+                return self.create_order(o['symbol'], o['type'], o['side'], o['amount'], o.get('price'), o.get('params', {}))
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max(len(orders), 1)) as pool:
+            results = list(pool.map(submit, orders))
+        return [batch_result(request, result) for request, result in zip(orders, results)]
+
+    @staticmethod
+    def _is_ambiguous(error: Exception) -> bool:
+        """逾時 / 連線中斷等請求可能已被交易所處理的錯誤 (超限拒絕則確定未處理)"""
+        if isinstance(error, (ccxt.RateLimitExceeded, ccxt.DDoSProtection)):
+            return False
+        return isinstance(error, ccxt.NetworkError)
+
+    def _recover_chunk(self, chunk: List[Dict[str, Any]], error: Exception) -> List[Dict[str, Any]]:
+        """
+        處理失敗的批次分段：確定被拒絕時逐筆重送；結果未知時先以 clientOrderId 查回已成立的訂單，
+        查無者才補送，無 clientOrderId 者無法確認是否成立，回報錯誤而不盲目重送。
+        """
+        if not self._is_ambiguous(error):
+            print(f"[Exchange] 批次下單失敗，該批改為並行逐筆送出: {error}")
+            return self._create_each(chunk)
+
+        print(f"[Exchange] 批次下單結果未知，以 clientOrderId 查詢後補送: {error}")
+        reports: List[Optional[Dict[str, Any]]] = [None] * len(chunk)
+        resend = []
+        for i, request in enumerate(chunk):
+            client_id = (request.get('params') or {}).get('clientOrderId')
+            if not client_id:
+                reports[i] = batch_result(request, error)
+                continue
+            try:
+                order = self.find_order_by_client_id(request['symbol'], client_id)
+            except Exception as e:
+                reports[i] = batch_result(request, e)
+                continue
+            if order:
+                reports[i] = batch_result(request, order)
+            else:
+                resend.append(i)
+        if resend:
+            for i, report in zip(resend, self._create_each([chunk[i] for i in resend])):
+                reports[i] = report
+        return reports
+
     def cancel_order(self, order_id: str, symbol: str) -> bool:
         """取消訂單"""
         self._exchange.cancel_order(order_id, symbol)
@@ -74,6 +148,19 @@ class CCXTAdapter(ExchangeInterface):
         """獲取特定訂單詳細資訊"""
         return self._exchange.fetch_order(order_id, symbol)
 
+    def find_order_by_client_id(self, symbol: str, client_order_id: str) -> Optional[Dict[str, Any]]:
+        """以 clientOrderId 查回訂單 (Bybit 為 orderLinkId)：先查掛單，查無再查近期已成交 / 已取消訂單"""
+        params = {'orderLinkId': client_order_id} if self._exchange.id == 'bybit' else {'clientOrderId': client_order_id}
+        if self._exchange.has.get('fetchCanceledAndClosedOrders'):
+            history = self._exchange.fetch_canceled_and_closed_orders
+        else:
+            history = self._exchange.fetch_closed_orders
+        for fetch in (self._exchange.fetch_open_orders, history):
+            match = next((o for o in fetch(symbol, None, None, params) if o.get('clientOrderId') == client_order_id), None)
+            if match:
+                return match
+        return None
+
     @property
     def exchange_id(self) -> str:
         """獲取當前交易所 ID (字串)"""
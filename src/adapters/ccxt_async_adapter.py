@@ -0,0 +1,468 @@
+import time
+import asyncio
+import ccxt.async_support as ccxt_async
+import ccxt.pro as ccxt_pro
+from typing import Dict, Any, List, Optional
+from src.core.interfaces.async_exchange_abc import AsyncExchangeInterface
+from src.core.interfaces.exchange_abc import batch_result
+from src.infrastructure.market_cache import MarketCache
+from src.infrastructure.account_state import AccountStateCache
+from src.infrastructure.order_stream import OrderStream, LocalOrderFeed, LOCAL_FEED_PORT
+from src.infrastructure.price_book import PriceBook
+from src.infrastructure.keep_warm import ConnectionKeeper
+from src.infrastructure import metrics
+from src.infrastructure.request_scheduler import RequestScheduler, Priority, BYBIT_ENDPOINT_LIMITS, BYBIT_IP_RATE, shared_bucket, record_response_headers, with_response_headers
+
+class CCXTAsyncAdapter(AsyncExchangeInterface):
+    """
+    CCXT 非同步交易所適配器。
+    以 ccxt.async_support 取代同步客戶端，所有 REST 呼叫皆在事件迴圈內以 await 執行，
+    多筆訊號可同時下單而不會彼此排隊等待 HTTP 往返。
+    """
+
+    # 單次批次下單的最大筆數 (Bybit 合約為 10~20 筆，取保守值)
+    BATCH_ORDER_LIMIT = 10
+
+    def __init__(self):
+        self._exchange: ccxt_async.Exchange = None
+        self._exchange_name: str = ""
+        self.market_cache: MarketCache = None
+        self.account_state: AccountStateCache = None
+        self.order_stream: OrderStream = None
+        self._local_feed: LocalOrderFeed = None
+        self.price_book: PriceBook = None
+        self.connection: ConnectionKeeper = None
+        self.scheduler: RequestScheduler = None
+        self._stream_config: Dict[str, Any] = {}
+        self._price_watch: List[str] = []
+        self._background_tasks = set()
+        self.stop_amend: str = "edit"
+
+    def initialize(self, config: Dict[str, Any]) -> None:
+        """
+        根據配置動態初始化 CCXT 非同步交易所實例。
+        config 應包含: 'active' (帳戶區塊名稱) 以及對應的權限金鑰。
+        同一交易所的多個子帳戶可各自定義區塊，並以 'exchange_id' 指定 CCXT 交易所 (預設為區塊名稱)。
+        """
+        account = config.get('active')
+        if not account:
+            raise ValueError("配置中缺少 'exchange.active' 項")
+
+        exchange_config = config.get(account, {})
+        exchange_id = str(exchange_config.get('exchange_id', account)).lower()
+
+        # 動態獲取 CCXT 中的非同步交易所類別 (例如 ccxt.async_support.bybit)
+        # 啟用訂單串流時改用 ccxt.pro 類別 (繼承全部 REST 方法並額外提供 watch_*)
+        stream_mode = str(exchange_config.get('order_stream', '') or '').lower()
+        price_mode = str(exchange_config.get('price_feed', 'poll') or 'poll').lower()
+        module = ccxt_pro if 'ccxt' in (stream_mode, price_mode) else ccxt_async
+        try:
+            exchange_class = getattr(module, exchange_id)
+        except AttributeError:
+            raise ValueError(f"CCXT 不支援此交易所: {exchange_id}")
+
+        # 沙盒與正式網為不同主機：市場快照與 IP 限速額度皆分開
+        sandbox = exchange_config.get('sandbox', False)
+        host_key = f"{exchange_id}_sandbox" if sandbox else exchange_id
+
+        # 啟用優先權排程器時由其負責限速，關閉 ccxt 內建的單一 FIFO 節流
+        use_scheduler = exchange_config.get('request_scheduler', True)
+        self._exchange = exchange_class({
+            'apiKey': exchange_config.get('apiKey'),
+            'secret': exchange_config.get('secret'),
+            'enableRateLimit': False if use_scheduler else exchange_config.get('enableRateLimit', True),
+            'options': exchange_config.get('options', {})
+        })
+        if use_scheduler:
+            record_response_headers(self._exchange)
+            is_bybit = exchange_id.lower() == 'bybit'
+            self.scheduler = RequestScheduler(
+                endpoint_limits=BYBIT_ENDPOINT_LIMITS if is_bybit else {},
+                default_rate=10.0 if is_bybit else 1000 / (self._exchange.rateLimit or 100),
+                global_bucket=shared_bucket(host_key, BYBIT_IP_RATE) if is_bybit else None,
+                name=f"{account} Scheduler"
+            )
+
+        if sandbox:
+            self._exchange.set_sandbox_mode(True)
+            print(f"[Exchange] {account} 已啟動模擬網 (Sandbox) 模式 (Async)")
+        self._exchange_name = account
+
+        # 市場資訊快取 (同一交易所的子帳戶共用同一實例與快照)
+        self.market_cache = MarketCache.shared(
+            host_key,
+            cache_dir=exchange_config.get('market_cache_dir', 'cache'),
+            ttl=exchange_config.get('market_cache_ttl', 86400)
+        )
+        self.account_state = AccountStateCache(account)
+
+        # 私有訂單串流：'ccxt' 使用交易所 WebSocket，'local' 使用本地替身 (離線測試)
+        if stream_mode == 'ccxt':
+            self.order_stream = OrderStream(self._exchange, name=f"{account} OrderStream")
+        elif stream_mode == 'local':
+            self._local_feed = LocalOrderFeed()
+            self.order_stream = OrderStream(self._local_feed, name=f"{account} LocalOrderStream")
+        # 價格簿：'ccxt' 訂閱行情推送，'poll' 以 fetch_tickers 批次輪詢
+        self.price_book = PriceBook(
+            self._exchange,
+            mode=price_mode,
+            poll_interval=exchange_config.get('price_poll_interval', 1.0),
+            max_age=exchange_config.get('price_max_age', 3.0),
+            name=f"{account} PriceBook",
+            request=self._background_request,
+            idle_expiry=exchange_config.get('price_idle_expiry', 300.0)
+        )
+        # 啟動即訂閱價格的交易對 (每個交易對的第一筆訊號不必等待 REST 查價)
+        self._price_watch = list(exchange_config.get('price_watch') or [])
+        # 連線保溫：閒置時定期送出伺服器時間請求，避免訊號爆發後第一筆下單重新握手
+        self.connection = ConnectionKeeper(
+            self._exchange,
+            interval=exchange_config.get('keep_warm_interval', 10.0),
+            name=f"{account} KeepWarm",
+            request=self._background_request
+        )
+        # 移動止損方式："edit" 單次改單 (不支援時自動退回)；"replace" 一律撤單重掛
+        self.stop_amend = str(exchange_config.get('stop_amend', 'edit')).lower()
+        self._stream_config = {
+            "host": exchange_config.get('order_stream_host', '127.0.0.1'),
+            "port": exchange_config.get('order_stream_port', LOCAL_FEED_PORT),
+        }
+
+    async def _call(self, lane: int, endpoint: str, factory, measure: bool = False):
+        """
+        經由優先權排程器送出請求，並以回應標頭校正該端點的限速狀態。
+        所有請求都刷新連線閒置計時；measure 為 True 時另記錄 HTTP 往返延遲 (不含排隊等待) 的冷 / 熱統計。
+        """
+        factory = self.connection.wrap(factory, measure)
+        if not self.scheduler:
+            return await factory()
+        try:
+            result, headers = await self.scheduler.submit(lane, endpoint, with_response_headers(factory))
+        except ccxt_async.RateLimitExceeded:
+            self.scheduler.penalize(endpoint)
+            raise
+        self.scheduler.observe(endpoint, headers)
+        return result
+
+    def _background_request(self, endpoint: str, factory):
+        """背景通道的排程請求函式 (交給價格簿 / 連線保溫 / 市場快取，避免繞過排程器直接打 REST)"""
+        return self._call(Priority.BACKGROUND, endpoint, factory)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """建立受管理的背景任務 (close 時統一取消)"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def warm_up(self) -> None:
+        """
+        預熱：優先從本地快照載入市場資訊，讓第一筆訊號不必等待 load_markets()。
+        快照過期時改由背景任務刷新；完全沒有快照時才同步下載一次。
+        """
+        snapshot = self.market_cache.load_snapshot()
+        if snapshot:
+            self._exchange.set_markets(snapshot)
+            if self.market_cache.is_stale:
+                self._spawn(self._refresh_markets())
+        else:
+            await self._refresh_markets()
+        self._spawn(self._market_refresh_loop())
+        await self._warm_account_state()
+
+        if self._local_feed:
+            await self._local_feed.serve(self._stream_config['host'], self._stream_config['port'])
+        if self.order_stream:
+            self.order_stream.start()
+        for symbol in self._price_watch:
+            self.price_book.watch(symbol, pin=True)
+        self.price_book.start()
+        try:
+            await self.connection.ping()
+        except Exception as e:
+            print(f"[Exchange] 連線預熱失敗: {e}")
+        self.connection.start()
+
+    async def _warm_account_state(self) -> None:
+        """以目前持倉資訊預熱帳戶設定快取 (槓桿 / 保證金模式 / 持倉模式)"""
+        if not self._exchange.apiKey or not self._exchange.has.get('fetchPositions'):
+            return
+        try:
+            positions = await self._call(Priority.BACKGROUND, "position/list", lambda: self._exchange.fetch_positions())
+            count = self.account_state.warm_from_positions(positions)
+            print(f"[Exchange] 已從持倉資訊預熱 {count} 個交易對的帳戶設定")
+        except Exception as e:
+            print(f"[Exchange] 帳戶設定預熱失敗 (將於下單時按需設定): {e}")
+
+    async def _refresh_markets(self) -> None:
+        try:
+            await self.market_cache.refresh(self._exchange, self._background_request)
+        except Exception as e:
+            print(f"[MarketCache] 市場資訊刷新失敗: {e}")
+
+    async def _market_refresh_loop(self) -> None:
+        """依 TTL 週期性於背景刷新市場資訊 (共用快取已被其他帳戶刷新時只同步結果)"""
+        while True:
+            remaining = self.market_cache.updated_at + self.market_cache.ttl - time.time()
+            await asyncio.sleep(max(remaining + 1, 60.0))
+            await self._refresh_markets()
+
+    async def close(self) -> None:
+        """關閉 aiohttp Session，避免 'Unclosed client session' 警告"""
+        if self.order_stream:
+            await self.order_stream.stop()
+        if self.price_book:
+            await self.price_book.stop()
+        if self.connection:
+            await self.connection.stop()
+        if self.scheduler:
+            await self.scheduler.stop()
+        if self._local_feed:
+            await self._local_feed.close()
+        for task in list(self._background_tasks):
+            task.cancel()
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        if self._exchange:
+            await self._exchange.close()
+
+    async def get_balance(self) -> Dict[str, Any]:
+        """獲取帳戶餘額"""
+        if not self._exchange:
+            raise RuntimeError("交易所尚未初始化")
+        return await self._call(Priority.BACKGROUND, "account/wallet-balance", lambda: self._exchange.fetch_balance())
+
+    async def get_ticker(self, symbol: str) -> Dict[str, Any]:
+        """獲取行情價格"""
+        return await self._call(Priority.BACKGROUND, "market/tickers", lambda: self._exchange.fetch_ticker(symbol))
+
+    def get_cached_price(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """同步讀取價格簿 (未過期才回傳)，並將交易對加入追蹤清單"""
+        self.price_book.watch(symbol)
+        return self.price_book.get(symbol)
+
+    async def get_price(self, symbol: str) -> Dict[str, Any]:
+        """優先讀取價格簿，價格過期或尚未追蹤時才以 REST fetch_ticker 取得"""
+        price = self.get_cached_price(symbol)
+        if price:
+            return price
+        ticker = await self._call(Priority.CRITICAL, "market/tickers", lambda: self._exchange.fetch_ticker(symbol), measure=True)
+        self.price_book.update(ticker)
+        return self.price_book.get(symbol, max_age=float('inf'))
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: int = None, limit: int = None) -> List[List[float]]:
+        """取得 K 線 (背景通道，供主動型策略的已收盤 K 線輪詢)"""
+        return await self._call(Priority.BACKGROUND, "market/kline", lambda: self._exchange.fetch_ohlcv(symbol, timeframe, since, limit))
+
+    async def create_order(self, symbol: str, order_type: str, side: str, amount: float, price: float = None, params: Dict[str, Any] = {}, priority: int = Priority.CRITICAL) -> Dict[str, Any]:
+        """建立訂單 (預設走最高優先通道：進場單與止損變更)"""
+        try:
+            order = await self._call(priority, "order/create", lambda: self._exchange.create_order(symbol, order_type, side, amount, price, params), measure=True)
+        except Exception as e:
+            metrics.ORDER_ERRORS.inc(account=self._exchange_name, code=metrics.error_code(e))
+            raise
+        metrics.ORDERS_SENT.inc(account=self._exchange_name, type=order_type)
+        return order
+
+    async def create_orders(self, orders: List[Dict[str, Any]], priority: int = Priority.ORDERS) -> List[Dict[str, Any]]:
+        """
+        批次建立訂單，回傳與輸入順序一致的逐筆結果 {'request', 'order', 'error'}。
+        交易所支援批次下單 (如 Bybit /v5/order/create-batch) 時分段一次送出，否則並行逐筆送出。
+        只有失敗的分段會退回逐筆送出；逾時等結果未知的分段先以 clientOrderId 查詢，只補送確實未成立的訂單。
+        """
+        if len(orders) > 1 and self._exchange.has.get('createOrders'):
+            chunks = [orders[i:i + self.BATCH_ORDER_LIMIT] for i in range(0, len(orders), self.BATCH_ORDER_LIMIT)]
+            batches = await asyncio.gather(*(
+                self._call(priority, "order/create-batch", lambda chunk=chunk: self._exchange.create_orders(chunk), measure=True)
+                for chunk in chunks
+            ), return_exceptions=True)
+            results = await asyncio.gather(*(
+                self._recover_chunk(chunk, batch, priority) if isinstance(batch, Exception) else self._batch_reports(chunk, batch)
+                for chunk, batch in zip(chunks, batches)
+            ))
+            return [report for chunk_reports in results for report in chunk_reports]
+
+        return await self._create_each(orders, priority)
+
+    async def _batch_reports(self, chunk: List[Dict[str, Any]], batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """將一個成功送出的分段轉為逐筆結果並記錄指標"""
+        results = list(batch) + [None] * (len(chunk) - len(batch))
+        reports = [batch_result(request, order) for request, order in zip(chunk, results)]
+        for report, order in zip(reports, results):
+            if report['order']:
+                metrics.ORDERS_SENT.inc(account=self._exchange_name, type=report['request']['type'])
+            else:
+                info = (order or {}).get('info') or {}
+                code = info.get('code') if isinstance(info, dict) else None
+                metrics.ORDER_ERRORS.inc(account=self._exchange_name, code=str(code or 'rejected'))
+        return reports
+
+    async def _create_each(self, orders: List[Dict[str, Any]], priority: int) -> List[Dict[str, Any]]:
+        """並行逐筆送出"""
+        results = await asyncio.gather(
+            *(self.create_order(o['symbol'], o['type'], o['side'], o['amount'], o.get('price'), o.get('params', {}), priority=priority) for o in orders),
+            return_exceptions=True
+        )
+        return [batch_result(request, result) for request, result in zip(orders, results)]
+
+    @staticmethod
+    def _is_ambiguous(error: Exception) -> bool:
+        """逾時 / 連線中斷等請求可能已被交易所處理的錯誤 (超限拒絕則確定未處理)"""
+        if isinstance(error, (ccxt_async.RateLimitExceeded, ccxt_async.DDoSProtection)):
+            return False
+        return isinstance(error, (ccxt_async.NetworkError, asyncio.TimeoutError))
+
+    async def _recover_chunk(self, chunk: List[Dict[str, Any]], error: Exception, priority: int) -> List[Dict[str, Any]]:
+        """
+        處理失敗的批次分段：確定被拒絕時逐筆重送；結果未知時先以 clientOrderId 查回已成立的訂單，
+        查無者才補送，無 clientOrderId 者無法確認是否成立，回報錯誤而不盲目重送。
+        """
+        metrics.ORDER_ERRORS.inc(account=self._exchange_name, code=metrics.error_code(error))
+        if not self._is_ambiguous(error):
+            print(f"[Exchange] 批次下單失敗，該批改為並行逐筆送出: {error}")
+            return await self._create_each(chunk, priority)
+
+        print(f"[Exchange] 批次下單結果未知，以 clientOrderId 查詢後補送: {error}")
+
+        async def lookup(request):
+            client_id = (request.get('params') or {}).get('clientOrderId')
+            if not client_id:
+                return None
+            try:
+                return await self.find_order_by_client_id(request['symbol'], client_id)
+            except Exception as e:
+                return e
+
+        found = await asyncio.gather(*(lookup(request) for request in chunk))
+        reports: List[Optional[Dict[str, Any]]] = [None] * len(chunk)
+        resend = []
+        for i, (request, order) in enumerate(zip(chunk, found)):
+            if isinstance(order, dict):
+                reports[i] = batch_result(request, order)
+            elif isinstance(order, Exception) or not (request.get('params') or {}).get('clientOrderId'):
+                reports[i] = batch_result(request, order if isinstance(order, Exception) else error)
+            else:
+                resend.append(i)
+        if resend:
+            for i, report in zip(resend, await self._create_each([chunk[i] for i in resend], priority)):
+                reports[i] = report
+        return reports
+
+    async def cancel_order(self, order_id: str, symbol: str) -> bool:
+        """取消訂單"""
+        await self._call(Priority.CRITICAL, "order/cancel", lambda: self._exchange.cancel_order(order_id, symbol), measure=True)
+        return True
+
+    def supports_stop_edit(self, order_id: str) -> bool:
+        """設定為 edit 且交易所支援改單時，移動止損以原單改觸發價 (否則撤單重掛)"""
+        return self.stop_amend == 'edit' and bool(self._exchange.has.get('editOrder'))
+
+    async def edit_stop_order(self, order_id: str, symbol: str, side: str, amount: float, stop_price: float) -> Dict[str, Any]:
+        """以 edit_order 在原訂單上改觸發價 (Bybit /v5/order/amend)，一次往返且止損不中斷"""
+        return await self._call(Priority.CRITICAL, "order/amend", lambda: self._exchange.edit_order(
+            order_id, symbol, 'market', side, amount, None, {'triggerPrice': stop_price}
+        ), measure=True)
+
+    async def get_open_orders(self, symbol: str = None) -> List[Dict[str, Any]]:
+        """獲取掛單清單"""
+        return await self._call(Priority.BACKGROUND, "order/realtime", lambda: self._exchange.fetch_open_orders(symbol))
+
+    async def get_order(self, order_id: str, symbol: str) -> Dict[str, Any]:
+        """獲取特定訂單詳細資訊"""
+        return await self._call(Priority.BACKGROUND, "order/realtime", lambda: self._exchange.fetch_order(order_id, symbol))
+
+    async def find_order_by_client_id(self, symbol: str, client_order_id: str) -> Optional[Dict[str, Any]]:
+        """
+        以 clientOrderId 查回訂單 (Bybit 為 orderLinkId)：先查掛單，查無再查近期已成交 / 已取消訂單。
+        用於重送時遇到重複 ID 的拒單，確認先前的請求實際上已被接受。
+        """
+        params = {'orderLinkId': client_order_id} if self._exchange.id == 'bybit' else {'clientOrderId': client_order_id}
+        if self._exchange.has.get('fetchCanceledAndClosedOrders'):
+            history = self._exchange.fetch_canceled_and_closed_orders
+        else:
+            history = self._exchange.fetch_closed_orders
+        lookups = [("order/realtime", self._exchange.fetch_open_orders), ("order/history", history)]
+        for endpoint, fetch in lookups:
+            orders = await self._call(Priority.CRITICAL, endpoint, lambda fetch=fetch: fetch(symbol, None, None, params))
+            match = next((o for o in orders if o.get('clientOrderId') == client_order_id), None)
+            if match:
+                return match
+        return None
+
+    async def fetch_order_snapshot(self, symbol: str, since: int = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        一次取回交易對的掛單與近期已成交 / 已取消訂單 (並行兩個請求)。
+        用於批次對帳，請求數只與交易對數量相關，不隨追蹤中的訂單數增加。
+        """
+        lane = Priority.BACKGROUND
+        requests = [self.get_open_orders(symbol)]
+        if self._exchange.has.get('fetchCanceledAndClosedOrders'):
+            requests.append(self._call(lane, "order/history", lambda: self._exchange.fetch_canceled_and_closed_orders(symbol, since, limit)))
+        else:
+            requests.append(self._call(lane, "order/history", lambda: self._exchange.fetch_closed_orders(symbol, since, limit)))
+            if self._exchange.has.get('fetchCanceledOrders'):
+                requests.append(self._call(lane, "order/history", lambda: self._exchange.fetch_canceled_orders(symbol, since, limit)))
+        results = await asyncio.gather(*requests)
+        return [order for orders in results for order in orders]
+
+    async def set_margin_mode(self, margin_mode: str, symbol: str) -> None:
+        """設置保證金模式"""
+        await self._call(Priority.CRITICAL, "account/set-margin-mode", lambda: self._exchange.set_margin_mode(margin_mode, symbol))
+
+    async def set_position_mode(self, hedged: bool, symbol: str) -> None:
+        """設置持倉模式"""
+        await self._call(Priority.CRITICAL, "position/switch-mode", lambda: self._exchange.set_position_mode(hedged, symbol))
+
+    async def set_leverage(self, leverage: int, symbol: str) -> None:
+        """設置槓桿倍數"""
+        await self._call(Priority.CRITICAL, "position/set-leverage", lambda: self._exchange.set_leverage(leverage, symbol))
+
+    async def ensure_account_setup(self, symbol: str, leverage: int, margin_mode: str = 'cross', hedged: bool = False) -> None:
+        """確保交易對的帳戶設定符合目標值 (只送出快取中不一致的設定)"""
+        await self.account_state.ensure(self, symbol, leverage, margin_mode, hedged)
+
+    @property
+    def supports_order_stream(self) -> bool:
+        return self.order_stream is not None
+
+    def subscribe_orders(self, callback) -> bool:
+        """訂閱訂單 / 成交推送，回傳是否啟用串流 (False 時呼叫端應改用輪詢)"""
+        if not self.order_stream:
+            return False
+        self.order_stream.subscribe(callback)
+        return True
+
+    def unsubscribe_orders(self, callback) -> None:
+        if self.order_stream:
+            self.order_stream.unsubscribe(callback)
+
+    def scheduler_stats(self) -> Dict[str, Dict[str, Any]]:
+        """各優先通道的排隊深度與等待時間 (未啟用排程器時為空)"""
+        return self.scheduler.stats() if self.scheduler else {}
+
+    def latency_report(self) -> Dict[str, Any]:
+        """下單相關請求的冷 / 熱連線延遲統計"""
+        return self.connection.report()
+
+    def get_market_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """O(1) 查詢精度與限制 (amount_step / price_step / min_qty / min_cost)"""
+        return self.market_cache.get(symbol)
+
+    def amount_to_precision(self, symbol: str, amount: float) -> float:
+        """數量精度處理 (優先使用本地索引，非固定步進的精度模式交由 CCXT 本地計算)"""
+        value = self.market_cache.amount_to_precision(symbol, amount)
+        if value is None:
+            value = float(self._exchange.amount_to_precision(symbol, amount))
+        return value
+
+    def price_to_precision(self, symbol: str, price: float) -> float:
+        """價格精度處理"""
+        value = self.market_cache.price_to_precision(symbol, price)
+        if value is None:
+            value = float(self._exchange.price_to_precision(symbol, price))
+        return value
+
+    @property
+    def exchange_id(self) -> str:
+        """獲取當前帳戶名稱 (對應配置區塊，單帳戶時即交易所 ID)"""
+        return self._exchange_name
@@ -0,0 +1,627 @@
+import csv
+import json
+import time
+import heapq
+import random
+import asyncio
+import itertools
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple, Iterable, Union
+from src.core.interfaces.async_exchange_abc import AsyncExchangeInterface
+from src.core.interfaces.exchange_abc import batch_result
+from src.infrastructure.market_cache import MarketCache, TICK_SIZE
+from src.infrastructure.account_state import AccountStateCache
+from src.infrastructure.order_stream import OrderStream, LocalOrderFeed
+from src.infrastructure.candle_feed import timeframe_seconds
+from src.infrastructure import metrics
+
+# 常見 Bybit 錯誤碼的預設訊息 (錯誤注入未指定 message 時使用)
+SIM_ERROR_MESSAGES = {
+    10001: "position idx not match position mode",
+    10006: "Too many visits!",
+    110001: "order not exists or too late to cancel",
+    110007: "ab not enough for new order",
+    110017: "current position is zero, cannot fix reduce-only order qty",
+    110025: "position mode is not modified",
+    110026: "margin mode is not modified",
+    110043: "leverage not modified",
+    110072: "OrderLinkedID is duplicate",
+}
+
+# 未設定 markets 的交易對上架時使用的精度與限制
+DEFAULT_MARKET = {"amount_step": 0.001, "price_step": 0.0001, "min_qty": 0.001, "min_cost": None}
+
+# 價格路徑的單筆資料：(時間戳記秒, 交易對, 價格)
+PriceTick = Tuple[float, str, float]
+
+
+class SimulatedExchangeError(Exception):
+    """模擬交易所回報的錯誤 (訊息格式與 Bybit 一致，metrics.error_code 與策略的錯誤碼判斷可直接沿用)"""
+
+    def __init__(self, code: int, message: str = None):
+        self.code = int(code)
+        self.message = message or SIM_ERROR_MESSAGES.get(self.code, "simulated error")
+        super().__init__(f'bybit {{"retCode":{self.code},"retMsg":"{self.message}"}}')
+
+
+class _ErrorRule:
+    """
+    錯誤注入規則 (配置中的 errors 列表)：
+    endpoint 為端點名稱 ('*' 代表全部)，rate 為機率、every 為每第 N 次呼叫，times 為最多注入次數。
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.endpoint = spec.get('endpoint', '*')
+        self.code = int(spec['code'])
+        self.message = spec.get('message')
+        self.rate = float(spec.get('rate', 0 if spec.get('every') else 1))
+        self.every = int(spec.get('every') or 0)
+        self.remaining = spec.get('times')
+        self.calls = 0
+
+    def hit(self, endpoint: str, rng: random.Random) -> bool:
+        if self.remaining == 0 or self.endpoint not in ('*', endpoint):
+            return False
+        self.calls += 1
+        if self.every:
+            triggered = self.calls % self.every == 0
+        else:
+            triggered = rng.random() < self.rate
+        if triggered and self.remaining is not None:
+            self.remaining -= 1
+        return triggered
+
+
+class _SymbolBook:
+    """
+    單一交易對的掛單簿：限價單與條件單各以堆積排序 (惰性刪除，取消時只改狀態)，
+    價格更新時只需檢查堆頂，撮合成本與掛單數量無關。
+    """
+
+    __slots__ = ('bids', 'asks', 'rising', 'falling', 'open')
+
+    def __init__(self):
+        self.bids: List[Tuple[float, int, Dict[str, Any]]] = []     # 買單 (-價格，最高價在頂)
+        self.asks: List[Tuple[float, int, Dict[str, Any]]] = []     # 賣單 (價格，最低價在頂)
+        self.rising: List[Tuple[float, int, Dict[str, Any]]] = []   # 價格上穿觸發的條件單
+        self.falling: List[Tuple[float, int, Dict[str, Any]]] = []  # 價格下穿觸發的條件單 (-觸發價)
+        self.open: Dict[str, Dict[str, Any]] = {}
+
+
+def load_price_path(source: Union[str, Iterable]) -> List[PriceTick]:
+    """
+    讀取價格路徑：內嵌列表 [[t, symbol, price], ...]、CSV (t,symbol,price) 或 JSONL ({"t", "s", "p"})。
+    回傳依時間排序的 (t, symbol, price) 列表。
+    """
+    ticks: List[PriceTick] = []
+    if isinstance(source, str):
+        with open(source, 'r', encoding='utf-8') as f:
+            if source.endswith('.csv'):
+                for row in csv.reader(f):
+                    try:
+                        ticks.append((float(row[0]), row[1], float(row[2])))
+                    except (IndexError, ValueError):
+                        continue  # 標題列或損毀的行
+            else:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        ticks.append((float(entry['t']), entry['s'], float(entry['p'])))
+                    except (KeyError, TypeError, ValueError):
+                        continue
+    else:
+        ticks = [(float(t), symbol, float(price)) for t, symbol, price in source]
+    ticks.sort(key=lambda tick: tick[0])
+    return ticks
+
+
+class SimulatedExchange(AsyncExchangeInterface):
+    """
+    行程內模擬交易所 (配置 type: "sim")。
+    1. 以本地掛單簿撮合市價 / 限價 / 只減倉 / 條件單 (stopPrice、triggerPrice)，淨持倉為單向模式。
+    2. 價格由 set_price() 或價格路徑 (腳本 / 記錄檔) 驅動，每次更新即撮合跨越的掛單與條件單。
+    3. 可設定每次請求的延遲與錯誤注入 (如 10001 / 110043)，終態訂單經由 OrderStream 推送給策略。
+    不需網路與 API 金鑰，策略可離線以每秒數千筆訊號的速度測試與壓測。
+    """
+
+    def __init__(self):
+        self._exchange_name: str = ""
+        self.market_cache: MarketCache = None
+        self.account_state: AccountStateCache = None
+        self.order_stream: OrderStream = None
+        self._feed: LocalOrderFeed = None
+        self._books: Dict[str, _SymbolBook] = {}
+        self._orders: Dict[str, Dict[str, Any]] = {}
+        self._history: Dict[str, deque] = {}
+        self._client_ids: Dict[str, Dict[str, Any]] = {}
+        self._prices: Dict[str, Dict[str, Any]] = {}
+        # symbol -> 近期價格 (時間戳記秒, 價格)，供 fetch_ohlcv 聚合 K 線
+        self._ticks: Dict[str, deque] = {}
+        # symbol -> [持倉量 (多為正、空為負), 均價]
+        self._positions: Dict[str, List[float]] = {}
+        self._settings: Dict[str, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._errors: List[_ErrorRule] = []
+        self._rng = random.Random()
+        self._latencies: deque = deque(maxlen=1000)
+        self._background_tasks = set()
+        self.cash = 0.0
+        self.realized_pnl = 0.0
+        self.fees_paid = 0.0
+        self.counters = {"orders": 0, "fills": 0, "cancels": 0, "rejects": 0, "triggers": 0, "amends": 0}
+
+    def initialize(self, config: Dict[str, Any]) -> None:
+        """讀取帳戶區塊的模擬參數 (延遲、手續費、初始價格、錯誤注入與價格路徑)"""
+        account = config.get('active')
+        if not account:
+            raise ValueError("配置中缺少 'exchange.active' 項")
+        sim_config = config.get(account, {}) or {}
+        self._exchange_name = account
+
+        self.latency = float(sim_config.get('latency_ms', 0)) / 1000
+        self.jitter = float(sim_config.get('latency_jitter_ms', 0)) / 1000
+        self.maker_fee = float(sim_config.get('maker_fee', 0.0002))
+        self.taker_fee = float(sim_config.get('taker_fee', 0.00055))
+        self.slippage = float(sim_config.get('slippage_bps', 0)) / 10000
+        self.cash = float(sim_config.get('balance', 10000.0))
+        self.history_limit = int(sim_config.get('history_limit', 500))
+        self.tick_history = int(sim_config.get('tick_history', 100000))
+        # 移動止損方式："edit" 原單改觸發價；"replace" 撤單重掛 (用於比較兩者延遲)
+        self.stop_amend = str(sim_config.get('stop_amend', 'edit')).lower()
+        self.default_price = sim_config.get('default_price')
+        self._default_market = {**DEFAULT_MARKET, **(sim_config.get('default_market') or {})}
+        self._errors = [_ErrorRule(spec) for spec in sim_config.get('errors') or []]
+        self._rng = random.Random(sim_config.get('seed'))
+        self._price_path = sim_config.get('price_path')
+        self._price_path_speed = float(sim_config.get('price_path_speed', 1.0))
+
+        # 市場資訊沿用 MarketCache 的精度索引 (不寫入快照)
+        self.market_cache = MarketCache(f"sim_{account}", ttl=float('inf'))
+        self.market_cache.update({
+            symbol: self._market_spec(spec) for symbol, spec in (sim_config.get('markets') or {}).items()
+        }, TICK_SIZE)
+        self.account_state = AccountStateCache(account)
+        for symbol, price in (sim_config.get('prices') or {}).items():
+            self.set_price(symbol, float(price))
+
+        # 終態訂單經本地替身推送，與 order_stream: "local" 走相同的分發流程
+        if sim_config.get('order_stream', True):
+            self._feed = LocalOrderFeed()
+            self.order_stream = OrderStream(self._feed, name=f"{account} SimOrderStream")
+
+    def _market_spec(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        """將精簡的市場設定轉為 CCXT markets 結構 (TICK_SIZE 精度模式)"""
+        spec = {**self._default_market, **(spec or {})}
+        return {
+            "precision": {"amount": spec['amount_step'], "price": spec['price_step']},
+            "limits": {"amount": {"min": spec['min_qty']}, "cost": {"min": spec['min_cost']}},
+            "contractSize": 1,
+        }
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def warm_up(self) -> None:
+        """啟動訂單推送與價格路徑播放"""
+        if self.order_stream:
+            self.order_stream.start()
+        if self._price_path:
+            self._spawn(self.play_prices(load_price_path(self._price_path), self._price_path_speed))
+
+    async def close(self) -> None:
+        if self.order_stream:
+            await self.order_stream.stop()
+        for task in list(self._background_tasks):
+            task.cancel()
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+
+    # ------------------------------------------------------------------
+    # 請求模擬 (延遲 / 錯誤注入)
+    # ------------------------------------------------------------------
+    async def _round_trip(self, endpoint: str) -> None:
+        """模擬一次 REST 往返：等待設定的延遲後依規則注入錯誤"""
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._latencies.append(delay * 1000)
+        self._inject(endpoint)
+
+    def _inject(self, endpoint: str) -> None:
+        for rule in self._errors:
+            if rule.hit(endpoint, self._rng):
+                raise SimulatedExchangeError(rule.code, rule.message)
+
+    # ------------------------------------------------------------------
+    # 價格驅動與撮合
+    # ------------------------------------------------------------------
+    def set_price(self, symbol: str, price: float) -> None:
+        """更新最新價 (未上架的交易對自動上架)，並撮合被價格跨越的掛單與條件單"""
+        if self.market_cache.get(symbol) is None:
+            self.market_cache.add(symbol, self._market_spec(None))
+        now = time.time()
+        self._prices[symbol] = {"last": price, "bid": price, "ask": price, "mark": price, "updated_at": now}
+        ticks = self._ticks.get(symbol)
+        if ticks is None:
+            ticks = self._ticks[symbol] = deque(maxlen=self.tick_history)
+        ticks.append((now, price))
+        book = self._books.get(symbol)
+        if book and book.open:
+            self._match(book, price)
+
+    async def play_prices(self, ticks: List[PriceTick], speed: float = 1.0) -> None:
+        """依時間間隔 (除以 speed) 播放價格路徑；speed 為 0 時不等待，每 100 筆讓出事件迴圈"""
+        if not ticks:
+            return
+        started, first_t = time.perf_counter(), ticks[0][0]
+        for i, (t, symbol, price) in enumerate(ticks):
+            if speed > 0:
+                delay = (t - first_t) / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif i % 100 == 0:
+                await asyncio.sleep(0)
+            self.set_price(symbol, price)
+
+    def _last(self, symbol: str) -> float:
+        price = self._prices.get(symbol)
+        if price is None:
+            if self.default_price is None:
+                raise SimulatedExchangeError(10001, f"symbol invalid: {symbol} has no simulated price")
+            self.set_price(symbol, float(self.default_price))
+            price = self._prices[symbol]
+        return price['last']
+
+    def _match(self, book: _SymbolBook, price: float) -> None:
+        """檢查堆頂：先觸發條件單，再成交被跨越的限價單"""
+        # 改單後舊觸發價的堆積項目仍在堆中，以觸發價比對略過
+        while book.rising and book.rising[0][0] <= price:
+            stop, _, order = heapq.heappop(book.rising)
+            if order['status'] == 'open' and not order['triggered'] and order['stopPrice'] == stop:
+                self._trigger(book, order, price)
+        while book.falling and -book.falling[0][0] >= price:
+            stop, _, order = heapq.heappop(book.falling)
+            if order['status'] == 'open' and not order['triggered'] and order['stopPrice'] == -stop:
+                self._trigger(book, order, price)
+        while book.asks and book.asks[0][0] <= price:
+            order = heapq.heappop(book.asks)[2]
+            if order['status'] == 'open':
+                self._fill(book, order, order['price'], maker=True)
+        while book.bids and -book.bids[0][0] >= price:
+            order = heapq.heappop(book.bids)[2]
+            if order['status'] == 'open':
+                self._fill(book, order, order['price'], maker=True)
+
+    def _trigger(self, book: _SymbolBook, order: Dict[str, Any], price: float) -> None:
+        """條件單觸發後轉為市價 (或限價) 單"""
+        self.counters['triggers'] += 1
+        order['triggered'] = True
+        self._activate(book, order, price)
+
+    def _activate(self, book: _SymbolBook, order: Dict[str, Any], last: float) -> None:
+        """市價單立即成交；限價單可成交時以市價成交 (吃單)，否則掛入掛單簿"""
+        limit = order['price']
+        if order['type'] == 'market' or limit is None:
+            slip = 1 + self.slippage if order['side'] == 'buy' else 1 - self.slippage
+            self._fill(book, order, last * slip, maker=False)
+        elif (order['side'] == 'buy' and limit >= last) or (order['side'] == 'sell' and limit <= last):
+            self._fill(book, order, last, maker=False)
+        elif order['side'] == 'buy':
+            heapq.heappush(book.bids, (-limit, next(self._seq), order))
+        else:
+            heapq.heappush(book.asks, (limit, next(self._seq), order))
+
+    def _closable(self, symbol: str, side: str) -> float:
+        """此方向的只減倉單最多可成交的數量 (反向持倉量)"""
+        size = self._positions.get(symbol, (0.0, 0.0))[0]
+        return -size if side == 'buy' else size
+
+    def _fill(self, book: _SymbolBook, order: Dict[str, Any], price: float, maker: bool) -> None:
+        symbol, side = order['symbol'], order['side']
+        amount = order['remaining']
+        if order['reduceOnly']:
+            closable = self._closable(symbol, side)
+            if closable <= 0:
+                # 與 Bybit 相同：持倉已歸零時只減倉單直接取消
+                self._finish(book, order, 'canceled')
+                return
+            amount = min(amount, closable)
+
+        fee = amount * price * (self.maker_fee if maker else self.taker_fee)
+        self._apply_position(symbol, amount if side == 'buy' else -amount, price)
+        self.cash -= fee
+        self.fees_paid += fee
+        self.counters['fills'] += 1
+        order.update(
+            filled=amount, remaining=0.0, average=price, cost=amount * price,
+            fee={"cost": fee, "currency": "USDT"}, lastTradeTimestamp=int(time.time() * 1000)
+        )
+        self._finish(book, order, 'closed')
+
+        if not self._positions.get(symbol, (0.0,))[0]:
+            # 平倉後取消剩餘的只減倉單 (止盈 / 止損)
+            for other in [o for o in book.open.values() if o['reduceOnly']]:
+                self._finish(book, other, 'canceled')
+
+    def _apply_position(self, symbol: str, qty: float, price: float) -> None:
+        size, entry = self._positions.get(symbol, (0.0, 0.0))
+        if size == 0 or (size > 0) == (qty > 0):
+            new_size = size + qty
+            entry = (size * entry + qty * price) / new_size
+        else:
+            closed = min(abs(qty), abs(size))
+            pnl = closed * (price - entry) * (1 if size > 0 else -1)
+            self.realized_pnl += pnl
+            self.cash += pnl
+            new_size = size + qty
+            if abs(new_size) < 1e-12:
+                new_size = 0.0
+            elif (new_size > 0) != (size > 0):
+                entry = price  # 反手
+        if new_size:
+            self._positions[symbol] = [new_size, entry]
+        else:
+            self._positions.pop(symbol, None)
+
+    def _finish(self, book: _SymbolBook, order: Dict[str, Any], status: str) -> None:
+        """訂單進入終態：移出掛單、寫入歷史並推送事件"""
+        order['status'] = status
+        book.open.pop(order['id'], None)
+        if status == 'canceled':
+            self.counters['cancels'] += 1
+        history = self._history.get(order['symbol'])
+        if history is None:
+            history = self._history[order['symbol']] = deque(maxlen=self.history_limit)
+        history.append(order)
+        if self._feed:
+            self._feed.push(dict(order))
+
+    def _submit(self, symbol: str, order_type: str, side: str, amount: float, price: float = None, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """同步建立並撮合訂單 (驗證失敗時拋出 SimulatedExchangeError)"""
+        params = params or {}
+        last = self._last(symbol)
+        if side not in ('buy', 'sell'):
+            raise SimulatedExchangeError(10001, f"invalid side: {side}")
+        if not amount or amount <= 0:
+            raise SimulatedExchangeError(10001, f"invalid qty: {amount}")
+        if order_type == 'limit' and not price:
+            raise SimulatedExchangeError(10001, "limit order requires price")
+
+        client_id = params.get('clientOrderId')
+        if client_id and client_id in self._client_ids:
+            raise SimulatedExchangeError(110072)
+
+        stop_price = params.get('stopPrice') or params.get('triggerPrice')
+        reduce_only = bool(params.get('reduceOnly'))
+        if reduce_only and not stop_price and self._closable(symbol, side) <= 0:
+            raise SimulatedExchangeError(110017)
+
+        order = {
+            "id": str(next(self._ids)), "clientOrderId": client_id, "symbol": symbol,
+            "type": order_type, "side": side, "price": float(price) if price else None,
+            "stopPrice": float(stop_price) if stop_price else None, "triggered": False,
+            "amount": float(amount), "filled": 0.0, "remaining": float(amount),
+            "average": None, "cost": 0.0, "fee": None, "reduceOnly": reduce_only,
+            "status": "open", "timestamp": int(time.time() * 1000), "lastTradeTimestamp": None,
+            "info": {"simulated": True},
+        }
+        self._orders[order['id']] = order
+        if client_id:
+            self._client_ids[client_id] = order
+        self.counters['orders'] += 1
+
+        book = self._books.get(symbol)
+        if book is None:
+            book = self._books[symbol] = _SymbolBook()
+        book.open[order['id']] = order
+        if stop_price:
+            self._arm(book, order, last)
+        else:
+            self._activate(book, order, last)
+        return order
+
+    def _arm(self, book: _SymbolBook, order: Dict[str, Any], last: float) -> None:
+        """掛入條件單；觸發方向在下單 / 改單當下決定 (與 Bybit triggerDirection 相同)"""
+        if order['stopPrice'] > last:
+            heapq.heappush(book.rising, (order['stopPrice'], next(self._seq), order))
+        else:
+            heapq.heappush(book.falling, (-order['stopPrice'], next(self._seq), order))
+
+    # ------------------------------------------------------------------
+    # AsyncExchangeInterface
+    # ------------------------------------------------------------------
+    async def get_balance(self) -> Dict[str, Any]:
+        await self._round_trip("account/wallet-balance")
+        used = sum(abs(size) * entry / self._settings.get(symbol, {}).get('leverage', 1)
+                   for symbol, (size, entry) in self._positions.items())
+        usdt = {"free": self.cash - used, "used": used, "total": self.cash}
+        return {"USDT": usdt, "free": {"USDT": usdt['free']}, "used": {"USDT": used}, "total": {"USDT": self.cash}}
+
+    async def get_ticker(self, symbol: str) -> Dict[str, Any]:
+        await self._round_trip("market/tickers")
+        last = self._last(symbol)
+        price = self._prices[symbol]
+        return {"symbol": symbol, "last": last, "bid": price['bid'], "ask": price['ask'],
+                "markPrice": price['mark'], "timestamp": int(price['updated_at'] * 1000)}
+
+    def get_cached_price(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """模擬價格不會過期，有價格即回傳"""
+        return self._prices.get(symbol)
+
+    async def get_price(self, symbol: str) -> Dict[str, Any]:
+        price = self._prices.get(symbol)
+        if price:
+            return price
+        await self._round_trip("market/tickers")
+        self._last(symbol)
+        return self._prices[symbol]
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: int = None, limit: int = None) -> List[List[float]]:
+        """以近期價格更新聚合 K 線 (成交量為 0；沒有價格更新的週期不產生 K 線)"""
+        await self._round_trip("market/kline")
+        step = timeframe_seconds(timeframe) * 1000
+        bars: List[List[float]] = []
+        for t, price in self._ticks.get(symbol, ()):
+            ts = int(t * 1000) // step * step
+            if since and ts < since:
+                continue
+            if bars and bars[-1][0] == ts:
+                bar = bars[-1]
+                bar[2], bar[3], bar[4] = max(bar[2], price), min(bar[3], price), price
+            else:
+                bars.append([ts, price, price, price, price, 0.0])
+        return bars[-limit:] if limit else bars
+
+    async def create_order(self, symbol: str, order_type: str, side: str, amount: float, price: float = None, params: Dict[str, Any] = {}, priority: int = 0) -> Dict[str, Any]:
+        try:
+            await self._round_trip("order/create")
+            order = self._submit(symbol, order_type, side, amount, price, params)
+        except Exception as e:
+            self.counters['rejects'] += 1
+            metrics.ORDER_ERRORS.inc(account=self._exchange_name, code=metrics.error_code(e))
+            raise
+        metrics.ORDERS_SENT.inc(account=self._exchange_name, type=order_type)
+        return dict(order)
+
+    async def create_orders(self, orders: List[Dict[str, Any]], priority: int = 1) -> List[Dict[str, Any]]:
+        """一次往返送出整批訂單 (對應 Bybit create-batch)，錯誤注入與驗證逐筆進行"""
+        await self._round_trip("order/create-batch")
+        reports = []
+        for request in orders:
+            try:
+                self._inject("order/create")
+                order = dict(self._submit(request['symbol'], request['type'], request['side'], request['amount'],
+                                          request.get('price'), request.get('params', {})))
+                metrics.ORDERS_SENT.inc(account=self._exchange_name, type=request['type'])
+            except SimulatedExchangeError as e:
+                self.counters['rejects'] += 1
+                metrics.ORDER_ERRORS.inc(account=self._exchange_name, code=str(e.code))
+                order = e
+            reports.append(batch_result(request, order))
+        return reports
+
+    async def cancel_order(self, order_id: str, symbol: str) -> bool:
+        await self._round_trip("order/cancel")
+        order = self._orders.get(order_id)
+        if not order or order['status'] != 'open':
+            raise SimulatedExchangeError(110001)
+        self._finish(self._books[order['symbol']], order, 'canceled')
+        return True
+
+    def supports_stop_edit(self, order_id: str) -> bool:
+        """設定為 edit 且止損單仍在掛單中 (未觸發) 時原單改觸發價；replace、找不到或已觸發者撤單重掛"""
+        order = self._orders.get(order_id)
+        return self.stop_amend == 'edit' and bool(order) and order['status'] == 'open' and not order['triggered']
+
+    async def edit_stop_order(self, order_id: str, symbol: str, side: str, amount: float, stop_price: float) -> Dict[str, Any]:
+        """原單改觸發價與數量 (一次往返)"""
+        await self._round_trip("order/amend")
+        order = self._orders.get(order_id)
+        if not order or order['status'] != 'open' or order['triggered']:
+            raise SimulatedExchangeError(110001)
+        order.update(stopPrice=float(stop_price), amount=float(amount), remaining=float(amount))
+        self._arm(self._books[symbol], order, self._last(symbol))
+        self.counters['amends'] += 1
+        return dict(order)
+
+    async def get_open_orders(self, symbol: str = None) -> List[Dict[str, Any]]:
+        await self._round_trip("order/realtime")
+        books = [self._books.get(symbol)] if symbol else list(self._books.values())
+        return [dict(order) for book in books if book for order in book.open.values()]
+
+    async def get_order(self, order_id: str, symbol: str) -> Dict[str, Any]:
+        await self._round_trip("order/realtime")
+        order = self._orders.get(order_id)
+        if not order:
+            raise SimulatedExchangeError(110001)
+        return dict(order)
+
+    async def find_order_by_client_id(self, symbol: str, client_order_id: str) -> Optional[Dict[str, Any]]:
+        await self._round_trip("order/realtime")
+        order = self._client_ids.get(client_order_id)
+        return dict(order) if order and order['symbol'] == symbol else None
+
+    async def fetch_order_snapshot(self, symbol: str, since: int = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """掛單 + 近期已完成訂單 (與 CCXT 適配器相同為兩次往返，並行送出)"""
+        open_orders, _ = await asyncio.gather(self.get_open_orders(symbol), self._round_trip("order/history"))
+        finished = [o for o in self._history.get(symbol, ()) if not since or o['timestamp'] >= since]
+        return open_orders + [dict(o) for o in finished[-limit:]]
+
+    async def set_margin_mode(self, margin_mode: str, symbol: str) -> None:
+        await self._round_trip("account/set-margin-mode")
+        self._apply_setting(symbol, 'margin_mode', margin_mode, 110026)
+
+    async def set_position_mode(self, hedged: bool, symbol: str) -> None:
+        await self._round_trip("position/switch-mode")
+        self._apply_setting(symbol, 'hedged', hedged, 110025)
+
+    async def set_leverage(self, leverage: int, symbol: str) -> None:
+        await self._round_trip("position/set-leverage")
+        self._apply_setting(symbol, 'leverage', int(leverage), 110043)
+
+    def _apply_setting(self, symbol: str, field: str, value: Any, not_modified_code: int) -> None:
+        """與 Bybit 相同：設定值未變更時回報對應的「未變更」錯誤碼"""
+        settings = self._settings.setdefault(symbol, {})
+        if settings.get(field) == value:
+            raise SimulatedExchangeError(not_modified_code)
+        settings[field] = value
+
+    async def ensure_account_setup(self, symbol: str, leverage: int, margin_mode: str = 'cross', hedged: bool = False) -> None:
+        """與 CCXT 適配器共用快取與「未變更」處理 (AccountStateCache.ensure)"""
+        await self.account_state.ensure(self, symbol, leverage, margin_mode, hedged)
+
+    def subscribe_orders(self, callback) -> bool:
+        if not self.order_stream:
+            return False
+        self.order_stream.subscribe(callback)
+        return True
+
+    def unsubscribe_orders(self, callback) -> None:
+        if self.order_stream:
+            self.order_stream.unsubscribe(callback)
+
+    def scheduler_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {}
+
+    def latency_report(self) -> Dict[str, Any]:
+        """模擬延遲統計 (全部視為熱連線)"""
+        samples = self._latencies
+        return {
+            "ping_ms": None,
+            "warm": {"count": len(samples), "avg_ms": sum(samples) / len(samples) if samples else None, "last_ms": samples[-1] if samples else None},
+            "cold": {"count": 0, "avg_ms": None, "last_ms": None},
+        }
+
+    def get_market_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.market_cache.get(symbol)
+
+    def amount_to_precision(self, symbol: str, amount: float) -> float:
+        value = self.market_cache.amount_to_precision(symbol, amount)
+        return amount if value is None else value
+
+    def price_to_precision(self, symbol: str, price: float) -> float:
+        value = self.market_cache.price_to_precision(symbol, price)
+        return price if value is None else value
+
+    def get_position(self, symbol: str) -> Dict[str, float]:
+        """目前持倉 {'size' (多為正、空為負), 'entry_price'}，供測試與壓測檢查"""
+        size, entry = self._positions.get(symbol, (0.0, 0.0))
+        return {"size": size, "entry_price": entry}
+
+    def stats(self) -> Dict[str, Any]:
+        """撮合統計 (訂單 / 成交 / 取消 / 拒單 / 觸發 / 改單數、掛單數與損益)"""
+        return {
+            **self.counters,
+            "open_orders": sum(len(book.open) for book in self._books.values()),
+            "positions": len(self._positions),
+            "realized_pnl": self.realized_pnl,
+            "fees": self.fees_paid,
+        }
+
+    @property
+    def exchange_id(self) -> str:
+        return self._exchange_name
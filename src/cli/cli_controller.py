@@ -1,6 +1,7 @@
 import questionary
 from questionary import Style
 from rich.console import Console
+import asyncio
 from typing import Dict, Any, List
 
 # 定義自定義樣式，解決高亮塊不跟隨的問題並提升質感
@@ -35,30 +36,38 @@ class CLIController:
     async def run_menu(self):
         console.print("[bold blue]=== 交易系統啟動選單 ===[/bold blue]\n")
 
-        # 1. 選擇交易所
+        # 1. 選擇交易帳戶 (可多選：同一訊號會並行扇出至所有選定的子帳戶 / 交易所)
         exchange_cfg = self.config.get('exchange', {})
         exchange_options = list(exchange_cfg.keys())
         if 'active' in exchange_options: exchange_options.remove('active')
         
-        active_default = exchange_cfg.get('active', '').lower()
-        default_choice = None
-        for opt in exchange_options:
-            if opt.lower() == active_default:
-                default_choice = opt
-                break
+        active_default = exchange_cfg.get('active', '')
+        active_defaults = [a.lower() for a in (active_default if isinstance(active_default, list) else [active_default])]
+        from questionary import Choice
+        account_choices = [Choice(opt, checked=opt.lower() in active_defaults) for opt in exchange_options]
         
-        exchange_id = await questionary.select(
-            "請選擇要執行的交易所:",
-            choices=exchange_options,
-            default=default_choice,
+        accounts = await questionary.checkbox(
+            "請選擇要執行的交易帳戶 (多選):",
+            choices=account_choices,
+            validate=lambda x: True if len(x) > 0 else "請至少選擇一個帳戶",
             style=custom_style
         ).ask_async()
+        if not accounts: return
 
         # 2. 初始化引擎
         exchange_cfg = self.config.get('exchange')
-        exchange_cfg['active'] = exchange_id 
-        exchange = ExchangeManager.create_exchange(exchange_cfg)
-        self.engine = StrategyEngine(exchange)
+        adapters = ExchangeManager.create_async_exchanges(exchange_cfg, accounts)
+        # 預熱：載入市場資訊快照，避免第一筆訊號才下載市場清單 (各帳戶並行)
+        await asyncio.gather(*(adapter.warm_up() for adapter in adapters.values()))
+        exchange = next(iter(adapters.values()))
+        self.engine = StrategyEngine(
+            exchange, adapters,
+            pipeline_config=self.config.get('pipeline', {}),
+            tracing_config=self.config.get('tracing', {}),
+            store_config=self.config.get('trade_store', {}),
+            monitor_config=self.config.get('monitor', {})
+        )
+        exchange_id = ", ".join(adapters)
 
         # 3. 選擇執行模式
         mode = await questionary.select(
@@ -86,6 +95,9 @@ class CLIController:
 
         if confirm_choice == "Yes (啟動)":
             await self._start_monitoring_session(exchange_id)
+        else:
+            # 未啟動引擎時仍需釋放所有帳戶的非同步交易所連線
+            await asyncio.gather(*(adapter.close() for adapter in adapters.values()), return_exceptions=True)
 
     async def _start_monitoring_session(self, exchange_id):
         from rich.live import Live
@@ -93,7 +105,22 @@ class CLIController:
         from src.infrastructure.signal_receivers.tg_receiver import TGSignalReceiver
         import asyncio
 
-        self.engine.is_running = True
+        # 啟動訊號管線 (解析 / 各帳戶派發工作者)
+        self.engine.start()
+        # 還原上次運行中的持倉並與交易所對帳 (重啟後繼續管理止盈 / 移動止損)
+        await self.engine.restore_trades()
+
+        # 選配：本地 Prometheus 抓取端點
+        metrics_cfg = self.config.get('metrics', {})
+        metrics_server = None
+        if metrics_cfg.get('enabled', False):
+            from src.infrastructure.metrics import MetricsServer
+            metrics_server = MetricsServer(host=metrics_cfg.get('host', '127.0.0.1'), port=metrics_cfg.get('port', 9108))
+            try:
+                await metrics_server.start()
+            except Exception as e:
+                console.print(f"[red]指標端點啟動失敗: {e}[/red]")
+                metrics_server = None
         layout = Dashboard.create_layout()
         
         # --- 1. 啟動連線預檢 (包含互動式登入) ---
@@ -107,6 +134,7 @@ class CLIController:
             await asyncio.sleep(1) # 給使用者看一眼成功訊息
         except Exception as e:
             console.print(f"[bold red]❌ Telegram 初始化失敗: {e}[/bold red]")
+            await self.engine.stop()
             return
 
         # 啟動非同步運行任務 (在背景跑 run_forever)
@@ -117,9 +145,12 @@ class CLIController:
             with Live(layout, refresh_per_second=4, screen=False) as live:
                 while self.engine.is_running:
                     # 更新 UI
+                    self.engine.stats['order_latency'] = self.engine.exchange.latency_report()
+                    self.engine.stats['pipeline'] = self.engine.pipeline.stats()
                     layout["header"].update(Dashboard.get_header_panel())
                     layout["upper"].update(Dashboard.get_stats_panel(self.engine.stats, exchange_id))
-                    layout["middle"].update(Dashboard.get_trades_panel(self.engine.stats['active_trades']))
+                    layout["middle"].update(Dashboard.get_trades_panel(self.engine.active_trades))
+                    layout["latency"].update(Dashboard.get_latency_panel(self.engine.tracer))
                     layout["lower"].update(Dashboard.get_logs_panel(self.engine.stats['message_logs']))
                     
                     await asyncio.sleep(0.5)
@@ -132,6 +163,8 @@ class CLIController:
             self.engine.is_running = False
             # 1. 停止策略任務 (防止 Task pending 警告)
             await self.engine.stop()
+            if metrics_server:
+                await metrics_server.stop()
             # 2. 停止訊號接收器
             await receiver.stop()
             if not receiver_task.done():
@@ -209,11 +242,10 @@ class CLIController:
             if not strat_name: continue
 
             console.print(f"\n[bold blue]>>> 為頻道『{chan_name}』配置參數 ({strat_name})[/bold blue]")
-            strategy = StrategyFactory.create_strategy(strat_name, exchange)
-            strategy.target_source = chan_name # 綁定來源
+            requirements = StrategyFactory.create_strategy(strat_name, exchange).requirements
             
             final_params = {}
-            for param_id, info in strategy.requirements.items():
+            for param_id, info in requirements.items():
                 default_val = str(info.get('default', ''))
                 
                 # 動態調整預設值
@@ -233,7 +265,12 @@ class CLIController:
                 
                 final_params[param_id] = val if val != "" else info.get('default')
             
-            self.engine.add_strategy(strategy, final_params)
+            # 每個帳戶各自一個策略實例，帳戶區塊中的 params 可覆寫下單數值
+            for account, account_exchange in self.engine.accounts.items():
+                strategy = StrategyFactory.create_strategy(strat_name, account_exchange)
+                strategy.target_source = chan_name # 綁定來源
+                account_params = ExchangeManager.account_params(self.config.get('exchange', {}), account)
+                self.engine.add_strategy(strategy, {**final_params, **account_params})
 
         # 3. 註冊連線配置
         self.selected_signal_config = signal_cfg.copy()
@@ -0,0 +1,260 @@
+import os
+import json
+import itertools
+from dataclasses import dataclass, replace, asdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Sequence
+import numpy as np
+import pandas as pd
+from src.core.models import TradeSignal, SignalValidationError
+
+# (訊號時間 ms, 訊號) / 單一交易對的 K 線陣列 (開盤時間 ms, open, high, low, close)
+TimedSignal = Tuple[int, TradeSignal]
+CandleArrays = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+# 有進場的結果狀態 (其餘為未成交 / 無資料)
+EXIT_STATUSES = ("tp", "sl", "trail", "open")
+
+@dataclass(frozen=True, slots=True)
+class LadderParams:
+    """
+    一組進場 / 止盈階梯 / 移動止損參數 (參數掃描的單位)。
+    entry: 'zone' 區間內市價、區間外於區間邊界掛限價 (AdTrack) / 'market' 一律市價 (Italy)
+    trail: 'ladder' TP1 後止損移至開倉價，之後每級移至前一級止盈價 / 'breakeven' 僅 TP1 後移至開倉價 / 'none' 不移動
+    max_tps: 使用前幾個止盈 (0 為全部)；leg_fraction: 每階止盈佔總量比例 (None 為依止盈數平均分配)
+    """
+
+    name: str = "custom"
+    entry: str = "zone"
+    max_tps: int = 4
+    leg_fraction: Optional[float] = 0.25
+    trail: str = "ladder"
+    maker_fee: float = 0.0002
+    taker_fee: float = 0.00055
+    # 區間外限價單的有效 K 線數 / 每筆交易最多模擬的 K 線數 (到期以收盤價平倉)
+    limit_expiry_bars: int = 1440
+    max_bars: int = 10080
+
+# 對應現行策略的預設參數
+PRESETS: Dict[str, LadderParams] = {
+    "AdTrack": LadderParams(name="AdTrack", entry="zone", max_tps=4, leg_fraction=0.25, trail="ladder"),
+    "ItalyStrategy": LadderParams(name="ItalyStrategy", entry="market", max_tps=0, leg_fraction=None, trail="breakeven"),
+}
+
+# ----------------------------------------------------------------------
+# 資料載入
+# ----------------------------------------------------------------------
+def candle_key(symbol: str) -> str:
+    """交易對對應的 K 線檔名 (BTC/USDT:USDT -> BTC_USDT_USDT)"""
+    return symbol.replace("/", "_").replace(":", "_")
+
+def load_candles(directory: str, symbols: Sequence[str] = None) -> Dict[str, CandleArrays]:
+    """
+    讀取 K 線目錄：每個交易對一個 {candle_key}.csv，欄位 timestamp, open, high, low, close (與 ccxt fetch_ohlcv 相同)。
+    timestamp 為毫秒 (秒級數值自動換算)；缺檔的交易對略過。
+    """
+    names = [candle_key(s) for s in symbols] if symbols else [f[:-4] for f in os.listdir(directory) if f.endswith(".csv")]
+    keys = dict(zip(names, symbols)) if symbols else {}
+    candles = {}
+    for name in names:
+        path = os.path.join(directory, f"{name}.csv")
+        if not os.path.exists(path):
+            continue
+        frame = pd.read_csv(path, usecols=["timestamp", "open", "high", "low", "close"]).sort_values("timestamp")
+        ts = frame["timestamp"].to_numpy(dtype=np.int64)
+        if len(ts) and ts[-1] < 10**11:
+            ts = ts * 1000
+        candles[keys.get(name, name)] = (ts, *(frame[col].to_numpy(dtype=np.float64) for col in ("open", "high", "low", "close")))
+    return candles
+
+def load_signals(path: str, parsers: Dict[str, Any] = None) -> List[TimedSignal]:
+    """
+    讀取歷史訊號 (JSONL，依時間排序後回傳)：
+    1. 原始訊息記錄 {"t", "s", "m"} (signals.recorder 產生)，以對應來源的解析器解析；
+    2. 已解析的訊號 {"t", "symbol", "side", "entry_min", ..., "take_profits"}。
+    t 為 epoch 秒；無法解析的行略過。
+    """
+    signals: List[TimedSignal] = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                if 'm' in entry:
+                    parser = (parsers or {}).get(entry.get('s'))
+                    signal = parser.parse(entry['m']) if parser else None
+                else:
+                    fields = {k: v for k, v in entry.items() if k in TradeSignal.__dataclass_fields__ and k != 'trace'}
+                    fields['take_profits'] = tuple(fields.get('take_profits') or ())
+                    signal = TradeSignal(**fields)
+            except (ValueError, TypeError, SignalValidationError):
+                continue
+            if signal is not None:
+                signals.append((int(float(entry.get('t', 0)) * 1000), signal))
+    signals.sort(key=lambda item: item[0])
+    return [(t, signal if signal.signal_id else replace(signal, signal_id=f"bt{i}")) for i, (t, signal) in enumerate(signals)]
+
+# ----------------------------------------------------------------------
+# 模擬
+# ----------------------------------------------------------------------
+def _stop_levels(params: LadderParams, stop_loss: Optional[float], entry: float, tps: np.ndarray, direction: int) -> np.ndarray:
+    """各止盈級別 (已成交階數 0..k) 對應的止損價；無止損以無限遠代替"""
+    initial = stop_loss if stop_loss else -direction * np.inf
+    levels = np.full(len(tps) + 1, initial, dtype=np.float64)
+    if params.trail in ("ladder", "breakeven") and len(tps):
+        levels[1:] = entry
+        if params.trail == "ladder" and len(tps) > 1:
+            levels[2:] = tps[:-1]
+    return levels
+
+def simulate_signal(t_ms: int, signal: TradeSignal, candles: CandleArrays, params: LadderParams) -> Dict[str, Any]:
+    """
+    以 K 線路徑模擬單筆訊號 (整段路徑以 NumPy 向量運算，不逐根迴圈)：
+    1. 進場：訊號後第一根 K 線開盤；依 entry 決定市價或區間邊界限價 (限價於 limit_expiry_bars 內觸及才成交)。
+    2. 止盈：以累積最高 (空單為累積最低) 搜尋各階首次觸及的 K 線。
+    3. 止損：依「該根之前已成交的止盈階數」取得每根 K 線的止損價，首次觸及即以止損價 (跳空時為開盤價) 平倉剩餘倉位。
+       同一根 K 線同時觸及止盈與止損時保守地視為先止損。
+    報酬以名目本金比例計算 (已扣手續費；止盈為掛單費率，市價進場 / 止損 / 到期平倉為吃單費率)。
+    """
+    ts, o, h, l, c = candles
+    direction = 1 if signal.side == 'buy' else -1
+    result = {"t": t_ms, "signal_id": signal.signal_id, "symbol": signal.symbol, "side": signal.side, "status": "no_data",
+              "entry_price": np.nan, "exit_price": np.nan, "tp_filled": 0, "bars": 0, "pnl": np.nan, "r": np.nan, "roe": np.nan}
+
+    start = int(np.searchsorted(ts, t_ms, side='left'))
+    end = min(len(ts), start + params.max_bars)
+    if start >= end:
+        return result
+
+    # 1. 進場
+    open_price = o[start]
+    zone = signal.entry_min is not None and signal.entry_max is not None
+    limit = (signal.entry_max if direction == 1 else signal.entry_min) if zone else None
+    if params.entry == 'market' or not zone or signal.entry_min <= open_price <= signal.entry_max \
+            or direction * (limit - open_price) >= 0:
+        # 市價進場 (區間外但限價已優於市價時同樣立即以開盤價成交)
+        entry_bar, entry, entry_fee, first = start, open_price, params.taker_fee, start
+    else:
+        window = slice(start, min(end, start + params.limit_expiry_bars))
+        touched = l[window] <= limit if direction == 1 else h[window] >= limit
+        if not touched.any():
+            result["status"] = "not_filled"
+            return result
+        # 限價於 K 線內成交，出場從下一根開始判斷
+        entry_bar = start + int(touched.argmax())
+        entry, entry_fee, first = limit, params.maker_fee, entry_bar + 1
+
+    tps = np.asarray(signal.take_profits[:params.max_tps] if params.max_tps else signal.take_profits, dtype=np.float64)
+    tps = np.sort(tps)[::direction] if len(tps) else tps
+    fraction = params.leg_fraction or (1.0 / len(tps) if len(tps) else 0.0)
+    legs = np.diff(np.minimum(fraction * np.arange(len(tps) + 1), 1.0))
+
+    H, L, O, C = h[first:end], l[first:end], o[first:end], c[first:end]
+    n = len(H)
+
+    # 2. 止盈首次觸及的 K 線 (n 代表未觸及)
+    if direction == 1:
+        tp_hit = np.searchsorted(np.maximum.accumulate(H), tps, side='left') if n else np.zeros(len(tps), dtype=np.int64)
+    else:
+        tp_hit = np.searchsorted(-np.minimum.accumulate(L), -tps, side='left') if n else np.zeros(len(tps), dtype=np.int64)
+
+    # 3. 每根 K 線適用的止損價與首次觸及
+    levels = _stop_levels(params, signal.stop_loss, entry, tps, direction)
+    stage = np.searchsorted(tp_hit, np.arange(n), side='left')
+    stop_level = levels[stage]
+    stopped = L <= stop_level if direction == 1 else H >= stop_level
+    stop_bar = int(stopped.argmax()) if stopped.any() else n
+
+    filled = tp_hit < stop_bar
+    remaining = 1.0 - legs[filled].sum()
+    gross = (legs[filled] * direction * (tps[filled] - entry)).sum() / entry
+    fees = entry_fee + (legs[filled] * tps[filled]).sum() / entry * params.maker_fee
+
+    if remaining <= 1e-9:
+        status, exit_bar, exit_price = "tp", int(tp_hit[filled].max()), float(tps[filled][-1])
+        remaining = 0.0
+    elif stop_bar < n:
+        level = stop_level[stop_bar]
+        exit_bar = stop_bar
+        exit_price = float(min(O[stop_bar], level) if direction == 1 else max(O[stop_bar], level))
+        status = "trail" if stage[stop_bar] else "sl"
+    else:
+        status, exit_bar = "open", n - 1
+        exit_price = float(C[-1]) if n else entry
+    gross += remaining * direction * (exit_price - entry) / entry
+    fees += remaining * exit_price / entry * params.taker_fee
+
+    pnl = gross - fees
+    risk = abs(entry - signal.stop_loss) / entry if signal.stop_loss else np.nan
+    result.update(status=status, entry_price=float(entry), exit_price=exit_price, tp_filled=int(filled.sum()),
+                  bars=int(first + max(exit_bar, 0) - entry_bar), pnl=float(pnl), r=float(pnl / risk) if risk else np.nan,
+                  roe=float(pnl * signal.leverage))
+    return result
+
+def run_backtest(signals: Sequence[TimedSignal], candles: Dict[str, CandleArrays], params: LadderParams) -> pd.DataFrame:
+    """以一組參數回測所有訊號 (無 K 線的交易對標記為 no_data)，每筆訊號一列"""
+    rows = []
+    for t_ms, signal in signals:
+        arrays = candles.get(signal.symbol)
+        if arrays is None:
+            rows.append({"t": t_ms, "signal_id": signal.signal_id, "symbol": signal.symbol, "side": signal.side, "status": "no_data"})
+            continue
+        rows.append(simulate_signal(t_ms, signal, arrays, params))
+    return pd.DataFrame(rows)
+
+def summarize(trades: pd.DataFrame) -> Dict[str, Any]:
+    """彙總：進場數、勝率、平均 / 總報酬、獲利因子、平均 R、最大回撤 (依訊號時間累積報酬)"""
+    entered = trades[trades["status"].isin(EXIT_STATUSES)] if len(trades) else trades
+    pnl = entered["pnl"] if len(entered) else pd.Series(dtype=np.float64)
+    equity = pnl.cumsum()
+    losses = -pnl[pnl < 0].sum()
+    return {
+        "signals": len(trades),
+        "entered": len(entered),
+        "win_rate": float((pnl > 0).mean()) if len(pnl) else np.nan,
+        "avg_pnl": float(pnl.mean()) if len(pnl) else np.nan,
+        "total_pnl": float(pnl.sum()),
+        "profit_factor": float(pnl[pnl > 0].sum() / losses) if losses else np.inf,
+        "avg_r": float(entered["r"].mean()) if len(entered) else np.nan,
+        "avg_tp": float(entered["tp_filled"].mean()) if len(entered) else np.nan,
+        "max_drawdown": float((equity.cummax().clip(lower=0) - equity).max()) if len(equity) else 0.0,
+    }
+
+# ----------------------------------------------------------------------
+# 參數掃描
+# ----------------------------------------------------------------------
+def param_grid(base: LadderParams, grid: Dict[str, Sequence[Any]]) -> List[LadderParams]:
+    """以 base 為基礎展開參數組合 (名稱附加變動的參數，例: AdTrack[max_tps=2,trail=breakeven])"""
+    if not grid:
+        return [base]
+    keys = list(grid)
+    combos = []
+    for values in itertools.product(*(grid[k] for k in keys)):
+        label = ",".join(f"{k}={v}" for k, v in zip(keys, values))
+        combos.append(replace(base, name=f"{base.name}[{label}]", **dict(zip(keys, values))))
+    return combos
+
+# 工作行程的共用資料 (由 initializer 每個行程載入一次，避免每組參數重複傳送 K 線)
+_worker_data: Dict[str, Any] = {}
+
+def _init_worker(signals: Sequence[TimedSignal], candles: Dict[str, CandleArrays]) -> None:
+    _worker_data["signals"] = signals
+    _worker_data["candles"] = candles
+
+def _sweep_one(params: LadderParams) -> Dict[str, Any]:
+    trades = run_backtest(_worker_data["signals"], _worker_data["candles"], params)
+    return {**asdict(params), **summarize(trades)}
+
+def sweep(signals: Sequence[TimedSignal], candles: Dict[str, CandleArrays], params_list: Sequence[LadderParams], workers: int = None) -> pd.DataFrame:
+    """
+    多組參數平行回測 (ProcessPoolExecutor，預設使用所有 CPU 核心)，每組參數回傳一列彙總。
+    只有一個核心或一組參數時直接在本行程執行。
+    """
+    workers = min(workers or os.cpu_count() or 1, len(params_list))
+    if workers <= 1:
+        _init_worker(signals, candles)
+        rows = [_sweep_one(params) for params in params_list]
+    else:
+        chunksize = max(1, len(params_list) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(signals, candles)) as pool:
+            rows = list(pool.map(_sweep_one, params_list, chunksize=chunksize))
+    return pd.DataFrame(rows)
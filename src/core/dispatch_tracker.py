@@ -0,0 +1,44 @@
+import time
+import itertools
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+class DispatchTracker:
+    """
+    多帳戶派發偏差統計。
+    同一筆訊號扇出到多個帳戶時，記錄每個帳戶送出進場單的時間點，
+    計算第一筆與最後一筆之間的偏差 (skew) 以及各帳戶相對第一筆的延遲。
+    """
+
+    def __init__(self, history: int = 50):
+        self.history = history
+        self._seq = itertools.count(1)
+        self._dispatches: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self.last: Optional[Dict[str, Any]] = None
+
+    def begin(self, accounts: List[str]) -> int:
+        """訊號開始扇出時呼叫，回傳派發 ID"""
+        dispatch_id = next(self._seq)
+        self._dispatches[dispatch_id] = {"started": time.perf_counter(), "accounts": list(accounts), "sent": {}}
+        while len(self._dispatches) > self.history:
+            self._dispatches.popitem(last=False)
+        return dispatch_id
+
+    def mark_sent(self, dispatch_id: Optional[int], account: str) -> None:
+        """帳戶送出進場單時呼叫 (同帳戶重複呼叫只記錄第一次)"""
+        dispatch = self._dispatches.get(dispatch_id)
+        if not dispatch or account in dispatch['sent']:
+            return
+        dispatch['sent'][account] = time.perf_counter()
+        self.last = self._summarize(dispatch_id, dispatch)
+
+    def _summarize(self, dispatch_id: int, dispatch: Dict[str, Any]) -> Dict[str, Any]:
+        sent = dispatch['sent']
+        first = min(sent.values())
+        return {
+            "id": dispatch_id,
+            "skew_ms": (max(sent.values()) - first) * 1000,
+            "first_ms": (first - dispatch['started']) * 1000,
+            "offsets_ms": {account: (t - first) * 1000 for account, t in sent.items()},
+            "pending": [a for a in dispatch['accounts'] if a not in sent],
+        }
@@ -1,6 +1,10 @@
-from typing import Dict, Any
+from typing import Dict, Any, Tuple, List
 from src.core.interfaces.exchange_abc import ExchangeInterface
+from src.core.interfaces.async_exchange_abc import AsyncExchangeInterface
 from src.adapters.ccxt_adapter import CCXTAdapter
+from src.adapters.ccxt_async_adapter import CCXTAsyncAdapter
+from src.adapters.sim_adapter import SimulatedExchange
+from src.infrastructure.order_stream import LOCAL_FEED_PORT
 
 class ExchangeManager:
     """
@@ -9,9 +13,10 @@ class ExchangeManager:
     """
 
     @staticmethod
-    def create_exchange(config: Dict[str, Any]) -> ExchangeInterface:
+    def _resolve_config(config: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         """
-        根據配置中的 'active' 交易所及其 'type' 來建立對象。
+        解析 'active' 交易所對應的配置區塊。
+        回傳 (標準化後的完整配置, 該交易所的細節配置)。
         """
         active_id_raw = config.get('active')
         if not active_id_raw:
@@ -36,6 +41,14 @@ class ExchangeManager:
         effective_config = config.copy()
         effective_config['active'] = target_key
 
+        return effective_config, exchange_cfg
+
+    @staticmethod
+    def create_exchange(config: Dict[str, Any]) -> ExchangeInterface:
+        """
+        根據配置中的 'active' 交易所及其 'type' 來建立對象。
+        """
+        effective_config, exchange_cfg = ExchangeManager._resolve_config(config)
         exchange_type = exchange_cfg.get('type', 'ccxt').lower()
 
         # 分流邏輯：
@@ -44,6 +57,9 @@ class ExchangeManager:
             adapter.initialize(effective_config)
             return adapter
         
+        elif exchange_type == 'sim':
+            raise NotImplementedError("模擬交易所 (sim) 僅提供非同步介面，請改用 create_async_exchange")
+
         elif exchange_type == 'dex':
             # 未來在此處對接 DEXAdapter
             raise NotImplementedError("目前尚未實作 DEX 適配器")
@@ -54,3 +70,82 @@ class ExchangeManager:
             
         else:
             raise ValueError(f"不支緩的交易所類型: {exchange_type}")
+
+    @staticmethod
+    def create_async_exchange(config: Dict[str, Any]) -> AsyncExchangeInterface:
+        """
+        建立非同步交易所適配器 (供策略引擎在事件迴圈中使用)。
+        """
+        effective_config, exchange_cfg = ExchangeManager._resolve_config(config)
+        exchange_type = exchange_cfg.get('type', 'ccxt').lower()
+
+        if exchange_type == 'ccxt':
+            adapter = CCXTAsyncAdapter()
+            adapter.initialize(effective_config)
+            return adapter
+
+        elif exchange_type == 'sim':
+            # 行程內模擬交易所 (離線測試 / 壓測 / 重播，不連線、不需金鑰)
+            adapter = SimulatedExchange()
+            adapter.initialize(effective_config)
+            return adapter
+
+        elif exchange_type in ('dex', 'custom'):
+            raise NotImplementedError(f"目前尚未實作 {exchange_type} 非同步適配器")
+
+        else:
+            raise ValueError(f"不支緩的交易所類型: {exchange_type}")
+
+    @staticmethod
+    def create_async_exchanges(config: Dict[str, Any], accounts: List[str]) -> Dict[str, AsyncExchangeInterface]:
+        """
+        一次建立多個帳戶 (子帳戶或不同交易所) 的非同步適配器，回傳 {帳戶名稱: 適配器}。
+        """
+        ports = ExchangeManager._local_stream_ports(config, accounts)
+        adapters = {}
+        for account in accounts:
+            account_config = config.copy()
+            account_config['active'] = account
+            if account in ports:
+                effective_config, exchange_cfg = ExchangeManager._resolve_config(account_config)
+                account_config[effective_config['active']] = {**exchange_cfg, 'order_stream_port': ports[account]}
+            adapter = ExchangeManager.create_async_exchange(account_config)
+            adapters[adapter.exchange_id] = adapter
+        return adapters
+
+    @staticmethod
+    def _local_stream_ports(config: Dict[str, Any], accounts: List[str]) -> Dict[str, int]:
+        """
+        為啟用本地訂單串流 (order_stream: "local") 的帳戶分配埠號，避免多帳戶共用預設埠而啟動失敗。
+        已指定 order_stream_port 者沿用 (重複時報錯)，其餘自預設埠號起依序取用未被占用的埠號。
+        """
+        local = []
+        for account in accounts:
+            account_config = config.copy()
+            account_config['active'] = account
+            _, exchange_cfg = ExchangeManager._resolve_config(account_config)
+            if exchange_cfg.get('type', 'ccxt').lower() == 'ccxt' and str(exchange_cfg.get('order_stream') or '').lower() == 'local':
+                local.append((account, exchange_cfg.get('order_stream_port')))
+
+        used = {}
+        for account, port in local:
+            if port is not None:
+                if int(port) in used:
+                    raise ValueError(f"帳戶 {used[int(port)]} 與 {account} 的 order_stream_port 重複: {port}")
+                used[int(port)] = account
+        ports, candidate = {}, LOCAL_FEED_PORT
+        for account, port in local:
+            if port is None:
+                while candidate in used:
+                    candidate += 1
+                used[candidate] = account
+                ports[account] = candidate
+        return ports
+
+    @staticmethod
+    def account_params(config: Dict[str, Any], account: str) -> Dict[str, Any]:
+        """讀取帳戶區塊中的下單參數覆寫 (例如子帳戶各自的 investment_value)"""
+        for key, value in config.items():
+            if key.lower() == account.lower() and isinstance(value, dict):
+                return dict(value.get('params') or {})
+        return {}
@@ -0,0 +1,203 @@
+from typing import Optional, Iterator, List
+
+class RingBuffer:
+    """
+    固定長度環形緩衝 (預先配置，append 為 O(1))。
+    索引 0 為最舊、-1 為最新；寫滿後 append 回傳被擠出的最舊值。
+    """
+
+    __slots__ = ("size", "_data", "_index", "_count")
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError(f"緩衝長度必須 >= 1: {size}")
+        self.size = size
+        self._data: List[float] = [0.0] * size
+        self._index = 0  # 下一個寫入位置 (寫滿後即最舊值的位置)
+        self._count = 0
+
+    def append(self, value: float) -> Optional[float]:
+        evicted = self._data[self._index] if self._count == self.size else None
+        self._data[self._index] = value
+        self._index += 1
+        if self._index == self.size:
+            self._index = 0
+        if self._count < self.size:
+            self._count += 1
+        return evicted
+
+    @property
+    def full(self) -> bool:
+        return self._count == self.size
+
+    @property
+    def last(self) -> Optional[float]:
+        return self._data[self._index - 1] if self._count else None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> float:
+        if not -self._count <= i < self._count:
+            raise IndexError("RingBuffer 索引超出範圍")
+        if i < 0:
+            i += self._count
+        start = self._index if self._count == self.size else 0
+        return self._data[(start + i) % self.size]
+
+    def __iter__(self) -> Iterator[float]:
+        """由舊到新"""
+        start = self._index if self._count == self.size else 0
+        for i in range(self._count):
+            yield self._data[(start + i) % self.size]
+
+
+class SMA:
+    """簡單移動平均：環形緩衝 + 滾動總和 (每繞一圈重算一次總和，消除浮點累積誤差，均攤 O(1))"""
+
+    __slots__ = ("period", "_window", "_sum", "value")
+
+    def __init__(self, period: int):
+        self.period = period
+        self._window = RingBuffer(period)
+        self._sum = 0.0
+        self.value: Optional[float] = None
+
+    def update(self, price: float) -> Optional[float]:
+        evicted = self._window.append(price)
+        self._sum += price if evicted is None else price - evicted
+        if self._window._index == 0:
+            self._sum = sum(self._window._data)
+        if self._window.full:
+            self.value = self._sum / self.period
+        return self.value
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+
+class EMA:
+    """指數移動平均 (alpha = 2 / (period + 1))，以前 period 筆的 SMA 作為起始值"""
+
+    __slots__ = ("period", "alpha", "_seed", "_count", "value")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self._seed = 0.0
+        self._count = 0
+        self.value: Optional[float] = None
+
+    def update(self, price: float) -> Optional[float]:
+        if self.value is not None:
+            self.value += self.alpha * (price - self.value)
+        else:
+            self._seed += price
+            self._count += 1
+            if self._count == self.period:
+                self.value = self._seed / self.period
+        return self.value
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+
+class _Wilder:
+    """Wilder 平滑 (alpha = 1 / period)，以前 period 筆的平均作為起始值"""
+
+    __slots__ = ("period", "_seed", "_count", "value")
+
+    def __init__(self, period: int):
+        self.period = period
+        self._seed = 0.0
+        self._count = 0
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> Optional[float]:
+        if self.value is not None:
+            self.value += (x - self.value) / self.period
+        else:
+            self._seed += x
+            self._count += 1
+            if self._count == self.period:
+                self.value = self._seed / self.period
+        return self.value
+
+
+class ATR:
+    """平均真實波幅 (Wilder)：TR = max(高 - 低, |高 - 前收|, |低 - 前收|)"""
+
+    __slots__ = ("period", "_avg", "_prev_close", "value")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._avg = _Wilder(period)
+        self._prev_close: Optional[float] = None
+        self.value: Optional[float] = None
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        prev = self._prev_close
+        tr = high - low if prev is None else max(high - low, abs(high - prev), abs(low - prev))
+        self._prev_close = close
+        self.value = self._avg.update(tr)
+        return self.value
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+
+class RSI:
+    """相對強弱指標 (Wilder，0 ~ 100)；第一筆價格只作為比較基準，期間內完全沒有漲跌時為中性值 50"""
+
+    __slots__ = ("period", "_gain", "_loss", "_prev", "value")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._gain = _Wilder(period)
+        self._loss = _Wilder(period)
+        self._prev: Optional[float] = None
+        self.value: Optional[float] = None
+
+    def update(self, price: float) -> Optional[float]:
+        prev, self._prev = self._prev, price
+        if prev is None:
+            return self.value
+        change = price - prev
+        gain = self._gain.update(change if change > 0 else 0.0)
+        loss = self._loss.update(-change if change < 0 else 0.0)
+        if gain is not None:
+            if loss == 0:
+                self.value = 50.0 if gain == 0 else 100.0
+            else:
+                self.value = 100.0 - 100.0 / (1.0 + gain / loss)
+        return self.value
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+
+class Crossover:
+    """
+    交叉偵測：update(快線, 慢線) 回傳 1 (向上穿越)、-1 (向下穿越) 或 0。
+    只有快慢線差值的正負號真正翻轉才算穿越：兩線相等 (差值為 0) 不算，且不改變比較基準；
+    任一值尚未就緒 (None) 時回傳 0。
+    """
+
+    __slots__ = ("_sign",)
+
+    def __init__(self):
+        self._sign: Optional[int] = None  # 最近一次非零差值的正負號
+
+    def update(self, fast: Optional[float], slow: Optional[float]) -> int:
+        if fast is None or slow is None:
+            return 0
+        diff = fast - slow
+        if diff == 0:
+            return 0
+        sign = 1 if diff > 0 else -1
+        prev, self._sign = self._sign, sign
+        return sign if prev is not None and prev != sign else 0
@@ -0,0 +1,188 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional
+from src.infrastructure import metrics
+
+class AsyncExchangeInterface(ABC):
+    """
+    非同步交易所抽象基類 (Interface)。
+    與 ExchangeInterface 方法對應，但所有網路呼叫皆為 awaitable，
+    讓策略在 asyncio 事件迴圈中下單時不會阻塞 Telethon / Dashboard 等其他任務。
+    """
+
+    @abstractmethod
+    def initialize(self, config: Dict[str, Any]) -> None:
+        """初始化交易所連接 (僅建立客戶端實例，不進行網路請求)"""
+        pass
+
+    @abstractmethod
+    async def warm_up(self) -> None:
+        """啟動時的預熱工作 (載入市場資訊快取等)，應在第一筆訊號前呼叫"""
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        """關閉底層 HTTP Session 等連線資源"""
+        pass
+
+    @abstractmethod
+    async def get_balance(self) -> Dict[str, Any]:
+        """獲取當前帳戶餘額"""
+        pass
+
+    @abstractmethod
+    async def get_ticker(self, symbol: str) -> Dict[str, Any]:
+        """獲取特定交易對的最新價格資訊"""
+        pass
+
+    @abstractmethod
+    def get_cached_price(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """同步讀取本地價格簿 {'last', 'bid', 'ask', 'mark', 'updated_at'}，過期或無資料時回傳 None"""
+        pass
+
+    @abstractmethod
+    async def get_price(self, symbol: str) -> Dict[str, Any]:
+        """取得最新價格 (價格簿優先，過期時退回 REST 查詢)"""
+        pass
+
+    @abstractmethod
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: int = None, limit: int = None) -> List[List[float]]:
+        """取得 K 線 [[開盤時間毫秒, 開, 高, 低, 收, 量], ...] (由舊到新，最後一根可能尚未收盤)"""
+        pass
+
+    @abstractmethod
+    async def create_order(self, symbol: str, order_type: str, side: str, amount: float, price: float = None, params: Dict[str, Any] = {}, priority: int = 0) -> Dict[str, Any]:
+        """建立訂單 (市價/限價/止損等)；priority 為限速排程通道 (0 最優先)"""
+        pass
+
+    @abstractmethod
+    async def create_orders(self, orders: List[Dict[str, Any]], priority: int = 1) -> List[Dict[str, Any]]:
+        """批次建立訂單 (格式同 ExchangeInterface.create_orders，回傳逐筆結果)"""
+        pass
+
+    @abstractmethod
+    async def cancel_order(self, order_id: str, symbol: str) -> bool:
+        """取消訂單"""
+        pass
+
+    async def amend_stop_order(self, order_id: str, symbol: str, side: str, amount: float, stop_price: float, params: Dict[str, Any] = {}) -> Dict[str, Any]:
+        """
+        將既有止損條件單改到新的觸發價 (優先以單次改單請求完成，止損在過程中持續有效)。
+        不支援改單或改單失敗時退回撤單重掛 (params 為重掛時的下單參數)，回傳生效中的止損單 (重掛時 ID 會改變)；
+        撤單失敗 (舊止損已觸發 / 已取消) 時不重掛並回傳 None。
+        各適配器只需實作 supports_stop_edit / edit_stop_order，退回流程與延遲指標由此共用。
+        """
+        started = time.perf_counter()
+        if order_id and self.supports_stop_edit(order_id):
+            try:
+                order = await self.edit_stop_order(order_id, symbol, side, amount, stop_price)
+                metrics.STOP_AMEND_SECONDS.observe(time.perf_counter() - started, account=self.exchange_id, method="edit")
+                return {**order, 'id': order.get('id') or order_id}
+            except Exception as e:
+                metrics.ORDER_ERRORS.inc(account=self.exchange_id, code=metrics.error_code(e))
+                print(f"[Exchange] 止損改單失敗，改為撤單重掛: {e}")
+
+        if order_id:
+            try:
+                await self.cancel_order(order_id, symbol)
+            except Exception as e:
+                # 舊止損已觸發 / 已隨持倉歸零取消，或仍在生效中：皆不重掛，避免重複或殘留的止損單
+                print(f"[Exchange] 撤銷舊止損失敗，不重掛 ({order_id}): {e}")
+                return None
+        order = await self.create_order(symbol, 'market', side, amount, None, {**params, 'stopPrice': stop_price})
+        metrics.STOP_AMEND_SECONDS.observe(time.perf_counter() - started, account=self.exchange_id, method="replace")
+        return order
+
+    @abstractmethod
+    def supports_stop_edit(self, order_id: str) -> bool:
+        """此止損單是否可直接改觸發價 (交易所支援改單且設定為 edit)；False 時 amend_stop_order 直接撤單重掛"""
+        pass
+
+    @abstractmethod
+    async def edit_stop_order(self, order_id: str, symbol: str, side: str, amount: float, stop_price: float) -> Dict[str, Any]:
+        """以單次改單請求更新止損單的觸發價與數量 (失敗時拋出例外)"""
+        pass
+
+    @abstractmethod
+    async def get_open_orders(self, symbol: str = None) -> List[Dict[str, Any]]:
+        """獲取當前掛單中的訂單"""
+        pass
+
+    @abstractmethod
+    async def get_order(self, order_id: str, symbol: str) -> Dict[str, Any]:
+        """獲取特定訂單的詳細狀態"""
+        pass
+
+    @abstractmethod
+    async def find_order_by_client_id(self, symbol: str, client_order_id: str) -> Optional[Dict[str, Any]]:
+        """以 clientOrderId 查詢訂單 (含掛單與近期已完成訂單)，查無時回傳 None"""
+        pass
+
+    @abstractmethod
+    async def fetch_order_snapshot(self, symbol: str, since: int = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """取得交易對的掛單與近期已完成訂單 (供批次對帳使用)"""
+        pass
+
+    @abstractmethod
+    async def set_margin_mode(self, margin_mode: str, symbol: str) -> None:
+        """設置保證金模式 ('cross' 全倉 / 'isolated' 逐倉)"""
+        pass
+
+    @abstractmethod
+    async def set_position_mode(self, hedged: bool, symbol: str) -> None:
+        """設置持倉模式 (False 單向 / True 雙向)"""
+        pass
+
+    @abstractmethod
+    async def set_leverage(self, leverage: int, symbol: str) -> None:
+        """設置槓桿倍數"""
+        pass
+
+    @abstractmethod
+    async def ensure_account_setup(self, symbol: str, leverage: int, margin_mode: str = 'cross', hedged: bool = False) -> None:
+        """確保保證金模式、持倉模式與槓桿為目標值 (已符合者不重複送出)"""
+        pass
+
+    @abstractmethod
+    def subscribe_orders(self, callback) -> bool:
+        """
+        訂閱訂單狀態推送 (callback 為接收 CCXT 統一訂單格式的協程函式)。
+        回傳 False 代表此適配器未啟用串流，呼叫端需自行輪詢。
+        """
+        pass
+
+    @abstractmethod
+    def unsubscribe_orders(self, callback) -> None:
+        """取消訂單狀態推送訂閱"""
+        pass
+
+    @abstractmethod
+    def scheduler_stats(self) -> Dict[str, Dict[str, Any]]:
+        """各優先通道的排隊深度與等待時間 {'critical': {'depth', 'avg_wait_ms', 'max_wait_ms'}, ...}"""
+        pass
+
+    @abstractmethod
+    def latency_report(self) -> Dict[str, Any]:
+        """回傳請求延遲統計 {'ping_ms', 'warm': {...}, 'cold': {...}} (單位毫秒)"""
+        pass
+
+    @abstractmethod
+    def get_market_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """從本地快取查詢精度、最小下單量與最小跳動價 (不觸發網路請求)"""
+        pass
+
+    @abstractmethod
+    def amount_to_precision(self, symbol: str, amount: float) -> float:
+        """將下單數量對齊交易所精度 (本地計算)"""
+        pass
+
+    @abstractmethod
+    def price_to_precision(self, symbol: str, price: float) -> float:
+        """將價格對齊交易所最小跳動價 (本地計算)"""
+        pass
+
+    @property
+    @abstractmethod
+    def exchange_id(self) -> str:
+        """回傳交易所標識符 (如 'binance')"""
+        pass
@@ -1,5 +1,28 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union, Optional
+
+# 重複 clientOrderId 的拒單 (Bybit orderLinkId 110072)：代表同一腿先前已被交易所接受 (例如逾時後重送)
+DUPLICATE_CLIENT_ID_ERRORS = ("110072", "orderlinkedid is duplicate")
+
+
+def is_duplicate_client_id(error: Union[Exception, str, None]) -> bool:
+    """判斷拒單原因是否為 clientOrderId 重複 (可為例外或 batch_result 的 error 字串)"""
+    err_msg = str(error or "").lower()
+    return any(token in err_msg for token in DUPLICATE_CLIENT_ID_ERRORS)
+
+
+def batch_result(request: Dict[str, Any], outcome: Union[Dict[str, Any], Exception, None]) -> Dict[str, Any]:
+    """
+    將批次下單的單筆回報轉為統一格式 {'request', 'order', 'error'}。
+    outcome 可為訂單、例外，或交易所回報的拒單 (無 id / status 為 'rejected')。
+    """
+    if isinstance(outcome, Exception):
+        return {"request": request, "order": None, "error": str(outcome)}
+    if not outcome or not outcome.get('id') or outcome.get('status') == 'rejected':
+        info = (outcome or {}).get('info') or {}
+        error = (info.get('msg') or info.get('retMsg')) if isinstance(info, dict) else None
+        return {"request": request, "order": None, "error": error or str(info or "empty response")}
+    return {"request": request, "order": outcome, "error": None}
 
 class ExchangeInterface(ABC):
     """
@@ -27,6 +50,14 @@ class ExchangeInterface(ABC):
         """建立訂單 (市價/限價/止損等)"""
         pass
 
+    @abstractmethod
+    def create_orders(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        批次建立訂單。orders 每筆為 {'symbol', 'type', 'side', 'amount', 'price', 'params'}，
+        回傳與輸入順序一致的逐筆結果 {'request', 'order', 'error'}，失敗者 order 為 None 以便重試。
+        """
+        pass
+
     @abstractmethod
     def cancel_order(self, order_id: str, symbol: str) -> bool:
         """取消訂單"""
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
+from src.core.models import TradeSignal
 
 class ParserInterface(ABC):
     """
@@ -8,14 +9,21 @@ class ParserInterface(ABC):
     """
 
     @abstractmethod
-    def parse(self, raw_message: Any) -> Optional[Dict[str, Any]]:
+    def parse(self, raw_message: Any) -> Optional[TradeSignal]:
         """
-        將原始訊息解析為統一的交易指令。
-        回傳格式應包含: symbol, side, amount, entry_price, sl, tp 等。
-        若解析失敗或非交易訊號，應回傳 None。
+        將原始訊息解析為統一的交易指令 (TradeSignal，建立時即完成欄位驗證)。
+        若解析失敗或非交易訊號，應回傳 None；欄位不合法時拋出 SignalValidationError。
         """
         pass
 
+    @property
+    def prefilter(self) -> Optional[Dict[str, Any]]:
+        """
+        快速前置過濾條件 (接收端在解析前以單一比對器評估)，None 代表不過濾。
+        格式: {'all': [必須全部出現的關鍵字], 'any': [至少出現一個], 'prefix': [訊息開頭]}
+        """
+        return None
+
     @property
     @abstractmethod
     def source_name(self) -> str:
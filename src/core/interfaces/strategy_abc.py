@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any
+from src.core.models import TradeSignal
 
 class StrategyInterface(ABC):
     """
@@ -18,7 +19,7 @@ class StrategyInterface(ABC):
         pass
 
     @abstractmethod
-    def on_signal(self, signal_data: Dict[str, Any], source: str) -> None:
+    def on_signal(self, signal_data: TradeSignal, source: str) -> None:
         """當接收到外部訊號時觸發 (被動式/訊號驅動策略)"""
         pass
 
@@ -0,0 +1,149 @@
+import copy
+from dataclasses import dataclass, field, fields
+from typing import Dict, Any, List, Optional, Tuple
+
+class SignalValidationError(ValueError):
+    """訊號欄位不合法 (解析器產出後立即驗證，之後的流程不再重複檢查)"""
+    pass
+
+
+def _price(name: str, value: Any) -> Optional[float]:
+    """價格欄位正規化：None / 0 視為未提供，負值或非數字視為錯誤"""
+    if value is None:
+        return None
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        raise SignalValidationError(f"{name} 不是數字: {value!r}")
+    if price < 0:
+        raise SignalValidationError(f"{name} 不可為負數: {price}")
+    return price or None
+
+
+@dataclass(frozen=True, slots=True)
+class TradeSignal:
+    """
+    解析後的交易訊號 (不可變)。
+    解析器建立時即完成驗證與正規化，管線 / 策略 / 儀表板直接以屬性存取。
+    派發到各帳戶時以 bind() 附加派發資訊 (淺複製，不重新驗證)。
+    """
+
+    symbol: str
+    side: str
+    leverage: int = 1
+    entry_min: Optional[float] = None
+    entry_max: Optional[float] = None
+    entry_price: Optional[float] = None
+    stop_loss: Optional[float] = None
+    take_profits: Tuple[float, ...] = ()
+    force_market: bool = False
+    raw_text: str = ""
+    # 派發資訊 (由訊號管線附加)
+    signal_id: Optional[str] = None
+    dispatch_id: Optional[int] = None
+    trace: Any = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self):
+        if not self.symbol:
+            raise SignalValidationError("缺少交易對")
+        if self.side not in ('buy', 'sell'):
+            raise SignalValidationError(f"無效的方向: {self.side!r}")
+        try:
+            leverage = int(self.leverage)
+        except (TypeError, ValueError):
+            raise SignalValidationError(f"無效的槓桿: {self.leverage!r}")
+        if leverage < 1:
+            raise SignalValidationError(f"槓桿需大於 0: {leverage}")
+
+        entry_min = _price("entry_min", self.entry_min)
+        entry_max = _price("entry_max", self.entry_max)
+        if entry_min and entry_max and entry_min > entry_max:
+            entry_min, entry_max = entry_max, entry_min
+        take_profits = tuple(p for p in (_price("take_profit", tp) for tp in self.take_profits) if p)
+
+        # frozen dataclass 只能在 __post_init__ 以 object.__setattr__ 寫入正規化後的值
+        object.__setattr__(self, 'leverage', leverage)
+        object.__setattr__(self, 'entry_min', entry_min)
+        object.__setattr__(self, 'entry_max', entry_max)
+        object.__setattr__(self, 'entry_price', _price("entry_price", self.entry_price))
+        object.__setattr__(self, 'stop_loss', _price("stop_loss", self.stop_loss))
+        object.__setattr__(self, 'take_profits', take_profits)
+
+    def bind(self, **context) -> "TradeSignal":
+        """回傳附加派發資訊 (signal_id / dispatch_id / trace) 的副本，略過重新驗證"""
+        clone = copy.copy(self)
+        for name, value in context.items():
+            object.__setattr__(clone, name, value)
+        return clone
+
+    def to_dict(self) -> Dict[str, Any]:
+        """序列化為字典 (溢出檔 / 記錄檔使用，不含延遲追蹤物件)"""
+        data = {f.name: getattr(self, f.name) for f in fields(self) if f.name != 'trace'}
+        data['take_profits'] = list(self.take_profits)
+        return data
+
+
+@dataclass(frozen=True, slots=True)
+class TPLeg:
+    """已掛出的單一止盈腿"""
+
+    id: str
+    price: float
+    stage: int
+
+
+@dataclass(slots=True, eq=False)
+class TrackedTrade:
+    """
+    監控中的持倉 (可變)。
+    以身分比較 (eq=False)，讓 list.remove / in 判斷不逐欄位比對。
+    """
+
+    symbol: str
+    side: str
+    entry_price: float
+    remaining_amount: float
+    tp_orders: List[TPLeg] = field(default_factory=list)
+    tp_history: Tuple[float, ...] = ()
+    sl_order_id: Optional[str] = None
+    # 目前止損觸發價 (監控排程依價格與最近止盈 / 止損的距離決定檢查間隔)
+    sl_price: Optional[float] = None
+    current_tp_stage: int = 0
+    timestamp: str = ""
+    signal_id: Optional[str] = None
+    # 建立時間 (毫秒)，作為對帳快照的回溯起點
+    opened_at: int = 0
+    _row: Optional[Tuple[Any, Tuple[str, ...]]] = field(default=None, init=False, repr=False)
+
+    @property
+    def key(self) -> str:
+        """持久化用的識別鍵 (訊號 ID；直接呼叫下單時以交易對 + 建立時間代替)"""
+        return self.signal_id or f"{self.symbol}@{self.opened_at}"
+
+    def to_record(self) -> Dict[str, Any]:
+        """序列化為可寫入 JSON 的字典 (止盈腿壓縮為 [id, price, stage])"""
+        return {
+            "symbol": self.symbol, "side": self.side, "entry_price": self.entry_price,
+            "remaining_amount": self.remaining_amount,
+            "tp_orders": [[tp.id, tp.price, tp.stage] for tp in self.tp_orders],
+            "tp_history": list(self.tp_history), "sl_order_id": self.sl_order_id, "sl_price": self.sl_price,
+            "current_tp_stage": self.current_tp_stage, "timestamp": self.timestamp,
+            "signal_id": self.signal_id, "opened_at": self.opened_at,
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "TrackedTrade":
+        record = dict(record)
+        record['tp_orders'] = [TPLeg(*leg) for leg in record.get('tp_orders', [])]
+        record['tp_history'] = tuple(record.get('tp_history', ()))
+        return cls(**record)
+
+    def display_row(self) -> Tuple[str, ...]:
+        """儀表板列 (時間, 交易對, 方向, 進場價, 止盈級別, 剩餘量)；狀態未變時重用上次的字串"""
+        key = (self.current_tp_stage, self.remaining_amount)
+        if self._row is None or self._row[0] != key:
+            self._row = (key, (
+                self.timestamp or "N/A", self.symbol, self.side, str(self.entry_price),
+                str(self.current_tp_stage), str(self.remaining_amount),
+            ))
+        return self._row[1]
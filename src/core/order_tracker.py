@@ -0,0 +1,345 @@
+import time
+import heapq
+import asyncio
+import itertools
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+from src.core.models import TrackedTrade, TPLeg
+from src.infrastructure import metrics
+
+# (帳戶, 交易對) / (帳戶, 訂單 ID)
+SymbolKey = Tuple[str, str]
+OrderKey = Tuple[str, str]
+
+class OrderTracker:
+    """
+    引擎層級的訂單追蹤服務 (所有策略實例共用)。
+    1. 追蹤中的交易依擁有者、(帳戶, 交易對) 與止盈單 (帳戶, 訂單 ID) 建立索引，加入 / 移除皆為 O(1)。
+    2. 每個帳戶只訂閱一次訂單推送；監控迴圈只有一個，到期的交易依 (帳戶, 交易對) 合併只取一次訂單快照，
+       再將成交 / 取消回呼給擁有該交易的策略 (owner._apply_tp_status)。
+    3. 每筆交易依「最新價與最近止盈 / 止損的距離 ÷ drift_per_second」排程下次檢查 (限制在 min_interval ~ max_interval)，
+       以到期時間為鍵的優先佇列排序；價格取自適配器價格簿 (批次行情，不另發請求)。
+    4. 每 RESCAN_INTERVAL 秒以價格簿重算距離，價格急速靠近價位的交易提前到期 (只會提前，不會延後)。
+    5. 快照請求以 max_requests_per_second 為上限 (令牌桶)，超出預算的到期交易保留原到期時間順延至下一輪。
+    6. active_trades 為所有策略合併後的持倉清單 (有變動時才重建)，供儀表板顯示。
+    """
+
+    # 每次訂單快照的 REST 請求數 (掛單 + 近期已完成訂單)
+    SNAPSHOT_COST = 2
+    # 重新讀取價格簿、提前接近價位之交易的週期 (秒；僅讀本地價格，不發請求)
+    RESCAN_INTERVAL = 1.0
+
+    def __init__(self, poll_interval: float = 5, stream_poll_interval: float = 60, min_interval: float = 0.5,
+                 max_interval: float = 300, drift_per_second: float = 0.001, max_requests_per_second: float = 4.0):
+        # 無價格可參考時的檢查間隔；有推送的帳戶以 stream_poll_interval 為下限 (輪詢僅作為安全網對帳)
+        self.poll_interval = poll_interval
+        self.stream_poll_interval = stream_poll_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        # 假設的最大價格變動速度 (每秒相對變動)，距離 / 速度 = 最快可能觸及價位的時間
+        self.drift_per_second = drift_per_second
+        self.max_requests_per_second = max_requests_per_second
+        self.deferred_checks = 0
+        self._owners: Dict[TrackedTrade, Any] = {}
+        self._by_owner: Dict[Any, Dict[TrackedTrade, None]] = {}
+        self._by_symbol: Dict[SymbolKey, Dict[TrackedTrade, None]] = {}
+        self._legs: Dict[OrderKey, Tuple[Any, TrackedTrade, TPLeg]] = {}
+        self._exchanges: Dict[str, Any] = {}
+        # 帳戶 -> 訂單推送回呼 (None 代表未啟用推送，需輪詢)
+        self._callbacks: Dict[str, Any] = {}
+        # 優先佇列 (到期時間, 序號, 交易)；_due 為每筆交易目前有效的到期時間，不符者為過期項目
+        self._queue: List[Tuple[float, int, TrackedTrade]] = []
+        self._due: Dict[TrackedTrade, float] = {}
+        self._seq = itertools.count()
+        self._tokens = float(max(max_requests_per_second, self.SNAPSHOT_COST))
+        self._refilled_at = time.monotonic()
+        self._wakeup = asyncio.Event()
+        self._rescanned_at = 0.0
+        self._reported = set()
+        self._task: Optional[asyncio.Task] = None
+        self._snapshot: Optional[List[TrackedTrade]] = None
+
+    # ------------------------------------------------------------------
+    # 註冊 / 索引
+    # ------------------------------------------------------------------
+    def watch(self, exchange) -> bool:
+        """納入帳戶 (每個帳戶只訂閱一次訂單推送)並啟動監控迴圈，回傳該帳戶是否啟用推送"""
+        account = exchange.exchange_id
+        if account not in self._exchanges:
+            self._exchanges[account] = exchange
+
+            async def on_order(order: Dict[str, Any], account: str = account) -> None:
+                await self._on_order_update(account, order)
+
+            self._callbacks[account] = on_order if exchange.subscribe_orders(on_order) else None
+        if not self._task:
+            self._task = asyncio.create_task(self._monitor_loop())
+        return self._callbacks[account] is not None
+
+    def register(self, owner, trade: TrackedTrade) -> None:
+        """加入追蹤 (owner 為擁有該交易的策略)"""
+        account = owner.exchange.exchange_id
+        if account not in self._exchanges:
+            self.watch(owner.exchange)
+        self._owners[trade] = owner
+        self._by_owner.setdefault(owner, {})[trade] = None
+        self._by_symbol.setdefault((account, trade.symbol), {})[trade] = None
+        for tp in trade.tp_orders:
+            self._legs[(account, tp.id)] = (owner, trade, tp)
+        self._snapshot = None
+        self._schedule(account, trade)
+
+    def unregister(self, trade: TrackedTrade) -> bool:
+        """移出追蹤，回傳該交易先前是否在追蹤中"""
+        owner = self._owners.pop(trade, None)
+        if owner is None:
+            return False
+        account = owner.exchange.exchange_id
+        trades = self._by_owner.get(owner)
+        if trades is not None:
+            trades.pop(trade, None)
+            if not trades:
+                del self._by_owner[owner]
+        key = (account, trade.symbol)
+        trades = self._by_symbol.get(key)
+        if trades is not None:
+            trades.pop(trade, None)
+            if not trades:
+                del self._by_symbol[key]
+        for tp in trade.tp_orders:
+            self._legs.pop((account, tp.id), None)
+        self._due.pop(trade, None)
+        self._snapshot = None
+        return True
+
+    def claim(self, account: str, order_id: str) -> bool:
+        """
+        取得止盈單的處理權 (同步移出索引)。
+        推送與輪詢重複回報同一筆成交時只有第一個呼叫者取得 True。
+        """
+        return self._legs.pop((account, order_id), None) is not None
+
+    def trades_of(self, owner) -> List[TrackedTrade]:
+        return list(self._by_owner.get(owner, ()))
+
+    @property
+    def active_trades(self) -> List[TrackedTrade]:
+        """所有策略追蹤中的持倉 (依加入順序；內容未變動時重用上次的清單)"""
+        if self._snapshot is None:
+            self._snapshot = list(self._owners)
+        return self._snapshot
+
+    # ------------------------------------------------------------------
+    # 排程
+    # ------------------------------------------------------------------
+    def _distance(self, account: str, trade: TrackedTrade) -> Optional[float]:
+        """最新價與最近止盈 / 止損的相對距離 (已越過的價位為 0；無價格或無價位時為 None)"""
+        exchange = self._exchanges.get(account)
+        price = exchange.get_cached_price(trade.symbol) if exchange else None
+        last = price.get('last') if price else None
+        if not last:
+            return None
+        # 多單：止盈在上、止損在下；空單相反
+        direction = 1 if trade.side == 'buy' else -1
+        gaps = [direction * (tp.price - last) for tp in trade.tp_orders]
+        if trade.sl_price:
+            gaps.append(direction * (last - trade.sl_price))
+        if not gaps:
+            return None
+        return max(min(gaps), 0.0) / last
+
+    def _interval(self, account: str, trade: TrackedTrade) -> float:
+        """下次檢查間隔：距離越近越頻繁，遠離價位時退避至 max_interval"""
+        distance = self._distance(account, trade)
+        interval = self.poll_interval if distance is None else distance / self.drift_per_second
+        if self._callbacks.get(account) is not None:
+            interval = max(interval, self.stream_poll_interval)
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _schedule(self, account: str, trade: TrackedTrade, delay: float = None) -> None:
+        """排入下次檢查 (舊的佇列項目留在堆中，取出時以 _due 比對略過)"""
+        due = time.monotonic() + (self._interval(account, trade) if delay is None else delay)
+        self._due[trade] = due
+        heapq.heappush(self._queue, (due, next(self._seq), trade))
+        if len(self._queue) > 4 * len(self._due) + 64:
+            # 過期項目過多時重建堆積，避免頻繁重新排程讓佇列無限增長
+            self._queue = [entry for entry in self._queue if self._due.get(entry[2]) == entry[0]]
+            heapq.heapify(self._queue)
+        if self._queue[0][2] is trade:
+            self._wakeup.set()
+
+    def _rescan(self) -> None:
+        """依最新價重算各交易的檢查間隔，比原到期時間更早者提前排程"""
+        now = time.monotonic()
+        if now - self._rescanned_at < self.RESCAN_INTERVAL:
+            return
+        self._rescanned_at = now
+        for trade, due in list(self._due.items()):
+            owner = self._owners.get(trade)
+            if owner is None:
+                continue
+            account = owner.exchange.exchange_id
+            interval = self._interval(account, trade)
+            if now + interval < due:
+                self._schedule(account, trade, delay=interval)
+
+    def _refill(self, now: float) -> None:
+        capacity = max(self.max_requests_per_second, self.SNAPSHOT_COST)
+        self._tokens = min(capacity, self._tokens + (now - self._refilled_at) * self.max_requests_per_second)
+        self._refilled_at = now
+
+    def _take_due(self) -> List[SymbolKey]:
+        """依到期順序取出需要檢查的 (帳戶, 交易對)，直到請求預算用完"""
+        now = time.monotonic()
+        self._refill(now)
+        selected: Dict[SymbolKey, None] = {}
+        while self._queue and self._queue[0][0] <= now:
+            due, seq, trade = self._queue[0]
+            owner = self._owners.get(trade)
+            if owner is None or self._due.get(trade) != due:
+                heapq.heappop(self._queue)
+                continue
+            key = (owner.exchange.exchange_id, trade.symbol)
+            if key not in selected:
+                if self._tokens < self.SNAPSHOT_COST:
+                    # 預算用完：保留原到期時間，下一輪優先處理
+                    self.deferred_checks += 1
+                    metrics.MONITOR_DEFERRED.inc(account=key[0])
+                    break
+                self._tokens -= self.SNAPSHOT_COST
+                selected[key] = None
+            # 同交易對的其他交易共用快照，對帳後重新排程
+            heapq.heappop(self._queue)
+        return list(selected)
+
+    def _wait_time(self) -> float:
+        """距佇列最早到期的時間；已到期但預算不足時等待令牌補足"""
+        if not self._queue:
+            return self.max_interval
+        wait = self._queue[0][0] - time.monotonic()
+        if wait <= 0:
+            wait = (self.SNAPSHOT_COST - self._tokens) / self.max_requests_per_second
+        return max(min(wait, self.RESCAN_INTERVAL), 0.01)
+
+    # ------------------------------------------------------------------
+    # 推送 / 對帳
+    # ------------------------------------------------------------------
+    async def _on_order_update(self, account: str, order: Dict[str, Any]) -> None:
+        """訂單推送回呼：只處理追蹤中的止盈單，交由擁有者推進交易狀態"""
+        entry = self._legs.get((account, order.get('id')))
+        if entry:
+            owner, trade, tp = entry
+            await owner._apply_tp_status(trade, tp, order.get('status'))
+            if trade in self._owners:
+                # 價位已推進 (下一階止盈 / 新止損)，依新距離重新排程
+                self._schedule(account, trade)
+
+    async def reconcile(self, accounts: Iterable[str] = None) -> None:
+        """
+        批次對帳：每個 (帳戶, 交易對) 只取一次掛單 / 近期已完成訂單快照，與追蹤中的止盈單比對。
+        每輪 REST 請求數隨交易對數量增長，而非隨策略實例或止盈單數量增長。
+        """
+        selected = None if accounts is None else set(accounts)
+        await self._reconcile_groups([key for key in self._by_symbol if selected is None or key[0] in selected])
+
+    async def _reconcile_groups(self, keys: List[SymbolKey]) -> None:
+        """對帳指定的 (帳戶, 交易對)，並依對帳後的價位重新排程仍在追蹤中的交易"""
+        groups = [(key, list(self._by_symbol[key])) for key in keys if key in self._by_symbol]
+        if not groups:
+            return
+
+        snapshots = await asyncio.gather(*(self._fetch_snapshot(key, trades) for key, trades in groups), return_exceptions=True)
+        for ((account, symbol), trades), snapshot in zip(groups, snapshots):
+            if isinstance(snapshot, Exception):
+                print(f"[OrderTracker Reconcile Error] {account} {symbol}: {snapshot}")
+                for trade in trades:
+                    if trade in self._owners:
+                        self._schedule(account, trade, delay=max(self.poll_interval, self._interval(account, trade)))
+                continue
+            for trade in trades:
+                await self._reconcile_trade(account, trade, snapshot)
+                if trade in self._owners:
+                    self._schedule(account, trade)
+
+    async def _fetch_snapshot(self, key: SymbolKey, trades: List[TrackedTrade]) -> Dict[str, Dict[str, Any]]:
+        """取得交易對的訂單快照 (訂單 ID -> 訂單)，起點為最早追蹤交易的建立時間"""
+        account, symbol = key
+        since = min(trade.opened_at for trade in trades) or None
+        orders = await self._exchanges[account].fetch_order_snapshot(symbol, since=since)
+        return {order['id']: order for order in orders if order.get('id')}
+
+    async def _reconcile_trade(self, account: str, trade: TrackedTrade, snapshot: Dict[str, Dict[str, Any]]) -> None:
+        """依快照推進單筆交易；快照中查無的止盈單 (超出回溯範圍) 才個別查詢"""
+        owner = self._owners.get(trade)
+        if owner is None:
+            return  # 同一輪中已被推送事件結束
+        for tp in trade.tp_orders[:]:
+            order_info = snapshot.get(tp.id)
+            if order_info is None:
+                try:
+                    order_info = await self._exchanges[account].get_order(tp.id, trade.symbol)
+                except Exception:
+                    # 某些交易所可能在訂單完成太快時查不到 (或是 ID 錯誤)
+                    continue
+            await owner._apply_tp_status(trade, tp, order_info.get('status'))
+
+        if not trade.tp_orders:
+            owner._untrack_trade(trade)
+
+    async def _monitor_loop(self) -> None:
+        """單一監控迴圈：重算距離、取出到期的交易合併對帳，之後睡到佇列最早到期 (或有更早的交易排入) 為止"""
+        while True:
+            try:
+                self._rescan()
+                keys = self._take_due()
+                if keys:
+                    started = time.perf_counter()
+                    await self._reconcile_groups(keys)
+                    elapsed = time.perf_counter() - started
+                    for account in {account for account, _ in keys}:
+                        metrics.MONITOR_CYCLE_SECONDS.observe(elapsed, strategy="OrderTracker", account=account)
+                    self._publish_metrics()
+                self._wakeup.clear()
+                # 不使用 wait_for：Python 3.12 以前，喚醒與取消同時發生時 wait_for 會吞掉取消，stop() 將永遠等不到迴圈結束
+                waiter = asyncio.ensure_future(self._wakeup.wait())
+                try:
+                    await asyncio.wait({waiter}, timeout=self._wait_time())
+                finally:
+                    waiter.cancel()
+            except asyncio.CancelledError:
+                break  # 正確響應取消請求
+            except Exception as e:
+                print(f"[OrderTracker Monitor Error] {e}")
+                await asyncio.sleep(10)
+
+    def _publish_metrics(self) -> None:
+        """以 (策略, 帳戶) 彙總追蹤中的交易數 (同策略多個綁定頻道的實例合併計算)"""
+        counts = Counter()
+        for owner, trades in self._by_owner.items():
+            counts[(owner.strategy_name, owner.exchange.exchange_id)] += len(trades)
+        # 已歸零的組合也需回報 0，避免儀表保留最後的數值
+        for strategy, account in self._reported | set(counts):
+            metrics.OPEN_TRADES.set(counts[(strategy, account)], strategy=strategy, account=account)
+        self._reported |= set(counts)
+
+    def stats(self) -> Dict[str, Any]:
+        """排程概況：追蹤數、最早到期秒數、預算與累計順延次數"""
+        upcoming = min(self._due.values(), default=None)
+        return {
+            "tracked": len(self._owners),
+            "next_due": None if upcoming is None else max(upcoming - time.monotonic(), 0.0),
+            "budget_rps": self.max_requests_per_second,
+            "deferred": self.deferred_checks,
+        }
+
+    async def stop(self) -> None:
+        """取消推送訂閱並停止監控迴圈"""
+        for account, callback in self._callbacks.items():
+            if callback:
+                self._exchanges[account].unsubscribe_orders(callback)
+        self._callbacks.clear()
+        self._exchanges.clear()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,66 @@
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Any, Optional
+from src.core.models import TradeSignal
+
+class SignalDeduplicator:
+    """
+    訊號冪等快取 (TTL + LRU)。
+    以正規化後的交易對 / 方向 / 進場 / 止損 / 止盈計算指紋，
+    視窗內重複出現的訊號 (轉貼、多來源同時轉發) 在任何交易所請求前以 O(1) 剔除。
+    """
+
+    def __init__(self, ttl: float = 600, max_size: int = 1000):
+        self.ttl = ttl
+        self.max_size = max_size
+        # 指紋 -> (首次出現時間, 訊號 ID)，依插入順序排列以便淘汰最舊項目
+        self._seen: "OrderedDict[str, tuple]" = OrderedDict()
+
+    @staticmethod
+    def _norm(value: Any) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, (int, float)):
+            return f"{float(value):.10g}"
+        return str(value).strip().upper()
+
+    @classmethod
+    def fingerprint(cls, signal: TradeSignal) -> str:
+        """同一筆交易意圖 (不論來源與原文格式) 產生相同指紋"""
+        parts = [
+            cls._norm(signal.symbol).replace(':USDT', ''),
+            cls._norm(signal.side),
+            cls._norm(signal.entry_min or signal.entry_price),
+            cls._norm(signal.entry_max or signal.entry_price),
+            cls._norm(signal.stop_loss),
+            ",".join(cls._norm(tp) for tp in signal.take_profits),
+        ]
+        return hashlib.sha1("|".join(parts).encode('utf-8')).hexdigest()
+
+    def admit(self, signal: TradeSignal, now: float = None) -> Optional[str]:
+        """
+        首次出現 (或已過期) 時記錄並回傳訊號 ID，重複時回傳 None。
+        訊號 ID = 指紋前 12 碼 + 首次出現秒數，可作為確定性的 clientOrderId 基底。
+        """
+        now = time.time() if now is None else now
+        fp = self.fingerprint(signal)
+        entry = self._seen.get(fp)
+        if entry and now - entry[0] <= self.ttl:
+            return None
+
+        signal_id = f"{fp[:12]}{int(now):x}"
+        self._seen[fp] = (now, signal_id)
+        self._seen.move_to_end(fp)
+        self._evict(now)
+        return signal_id
+
+    def _evict(self, now: float) -> None:
+        while self._seen:
+            fp, (seen_at, _) = next(iter(self._seen.items()))
+            if len(self._seen) <= self.max_size and now - seen_at <= self.ttl:
+                break
+            self._seen.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._seen)
@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import asyncio
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from src.infrastructure import metrics
+from src.core.models import TradeSignal
+
+# 佇列滿載時的處理策略
+DROP_NEWEST = "drop_newest"   # 丟棄新進項目
+DROP_OLDEST = "drop_oldest"   # 淘汰最舊項目，保留最新訊號
+SPILL = "spill"               # 寫入溢出檔 (JSONL) 供事後檢查 / 重播，不進入交易流程
+
+class SignalPipeline:
+    """
+    分段式訊號管線：接收佇列 -> 解析階段 -> 各帳戶的派發佇列 (固定數量工作者)。
+    1. 所有佇列皆有上限，滿載時依 overflow 策略丟棄或溢出，不會無限制建立任務。
+    2. 每個帳戶的下單並行數由 workers_per_account 限制，突發訊號不會同時壓向交易所。
+    3. 工作者皆為受追蹤的任務，停止時統一取消；in_flight 反映正在執行的下單流程數。
+    """
+
+    def __init__(self, engine, config: Dict[str, Any] = None):
+        config = config or {}
+        self.engine = engine
+        self.receive_size = config.get('receive_queue', 100)
+        self.dispatch_size = config.get('dispatch_queue', 20)
+        self.workers_per_account = config.get('workers_per_account', 2)
+        self.overflow = config.get('overflow', DROP_OLDEST)
+        self.spill_path = config.get('spill_path', os.path.join('cache', 'spilled_signals.jsonl'))
+        # 在派發佇列中等待超過此秒數的訊號視為過期 (價格已偏離)，不再下單
+        self.max_signal_age = config.get('max_signal_age', 30)
+
+        self._receive: asyncio.Queue = None
+        self._dispatch: Dict[str, asyncio.Queue] = {}
+        self._tasks = set()
+        self.counters = {"received": 0, "duplicates": 0, "dropped": 0, "spilled": 0, "expired": 0, "failed": 0}
+        self.in_flight: Dict[str, int] = {}
+
+    @property
+    def is_running(self) -> bool:
+        return self._receive is not None
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._receive = asyncio.Queue(self.receive_size)
+        self._spawn(self._parse_worker(), "parse")
+        for account in self.engine.accounts:
+            self._dispatch[account] = asyncio.Queue(self.dispatch_size)
+            self.in_flight[account] = 0
+            for i in range(self.workers_per_account):
+                self._spawn(self._dispatch_worker(account), f"{account}-{i}")
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._receive = None
+        self._dispatch = {}
+
+    async def drain(self) -> None:
+        """等待接收佇列與所有派發佇列處理完畢 (重播 / 測試使用)"""
+        if not self.is_running:
+            return
+        await self._receive.join()
+        await asyncio.gather(*(queue.join() for queue in self._dispatch.values()))
+
+    def _spawn(self, coro, name: str) -> None:
+        task = asyncio.create_task(coro, name=f"pipeline-{name}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def submit(self, source_name: str, raw_message: Any, trace=None) -> bool:
+        """接收階段入口 (非阻塞，可在 Telethon handler 內直接呼叫)，回傳是否成功排入"""
+        self.counters["received"] += 1
+        metrics.SIGNALS_RECEIVED.inc(source=source_name)
+        return self._offer(self._receive, (trace, source_name, raw_message, time.time()), "receive")
+
+    def _offer(self, queue: asyncio.Queue, item: Tuple, stage: str) -> bool:
+        if queue.full():
+            if self.overflow == DROP_OLDEST:
+                self._discard(queue.get_nowait(), stage)
+                queue.task_done()
+            else:
+                self._discard(item, stage)
+                return False
+        queue.put_nowait(item)
+        return True
+
+    def _discard(self, item: Tuple, stage: str) -> None:
+        metrics.SIGNALS_DROPPED.inc(stage=stage, reason=self.overflow)
+        if self.overflow == SPILL:
+            self._spill(item, stage)
+            return
+        self.counters["dropped"] += 1
+        print(f"[Pipeline] {stage} 佇列已滿，丟棄訊號: {self._describe(item)}")
+
+    def _spill(self, item: Tuple, stage: str) -> None:
+        source, payload, received_at = item[-3:]
+        if isinstance(payload, TradeSignal):
+            payload = payload.to_dict()
+        record = {
+            "stage": stage,
+            "source": source,
+            "received_at": received_at,
+            "payload": payload if isinstance(payload, (str, dict)) else str(payload),
+        }
+        try:
+            os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            self.counters["spilled"] += 1
+        except OSError as e:
+            self.counters["dropped"] += 1
+            print(f"[Pipeline] 溢出檔寫入失敗，訊號已丟棄: {e}")
+
+    @staticmethod
+    def _describe(item: Tuple) -> str:
+        payload = item[-2]
+        return payload.symbol if isinstance(payload, TradeSignal) else str(payload)[:40]
+
+    async def _parse_worker(self) -> None:
+        while True:
+            trace, source_name, raw_message, received_at = await self._receive.get()
+            try:
+                self._parse(source_name, raw_message, received_at, trace)
+            except Exception as e:
+                self.counters["failed"] += 1
+                print(f"[Pipeline] 訊號解析失敗 ({source_name}): {e}")
+            finally:
+                self._receive.task_done()
+
+    def _parse(self, source_name: str, raw_message: Any, received_at: float, trace=None) -> None:
+        engine = self.engine
+        parser = engine.parsers.get(source_name)
+        if not parser:
+            return
+
+        trade_signal = parser.parse(raw_message)
+        if trace:
+            trace.mark("parsed")
+
+        # 更新統計數據
+        engine.stats["total_signals"] += 1
+        now_time = datetime.now().strftime("%H:%M:%S")
+        engine.stats["last_signal_time"] = now_time
+
+        # 紀錄日誌 (僅保存最近 5 條)
+        log_entry = f"[{now_time}] {source_name}: {raw_message}"
+        engine.stats["message_logs"].insert(0, log_entry)
+        engine.stats["message_logs"] = engine.stats["message_logs"][:5]
+
+        if not trade_signal:
+            return
+        metrics.SIGNALS_PARSED.inc(source=source_name)
+
+        # 冪等檢查：轉貼 / 多來源重複的訊號在任何交易所請求前剔除
+        signal_id = engine.dedup.admit(trade_signal)
+        if not signal_id:
+            self.counters["duplicates"] += 1
+            metrics.SIGNALS_DUPLICATE.inc(source=source_name)
+            print(f"[Engine] 從 {source_name} 收到重複訊號 ({trade_signal.symbol})，已略過")
+            return
+
+        print(f"[Engine] 從 {source_name} 獲取到有效交易訊號，正在分發...")
+        engine.stats["executed_trades"] += 1
+        targets = [s for s in engine.active_strategies if s.accepts(source_name)]
+        dispatch_id = engine.dispatch.begin([s.exchange.exchange_id for s in targets])
+        for strategy in targets:
+            signal = trade_signal.bind(
+                dispatch_id=dispatch_id, signal_id=signal_id,
+                trace=trace.fork(strategy.exchange.exchange_id) if trace else None
+            )
+            queue = self._dispatch.get(strategy.exchange.exchange_id)
+            if queue is not None:
+                self._offer(queue, (strategy, source_name, signal, received_at), "dispatch")
+
+    async def _dispatch_worker(self, account: str) -> None:
+        queue = self._dispatch[account]
+        while True:
+            strategy, source_name, signal, received_at = await queue.get()
+            try:
+                if time.time() - received_at > self.max_signal_age:
+                    self.counters["expired"] += 1
+                    metrics.SIGNALS_DROPPED.inc(stage="dispatch", reason="expired")
+                    print(f"[Pipeline] {account} 訊號等待過久已略過: {signal.symbol}")
+                    continue
+                trace = signal.trace
+                if trace:
+                    trace.mark("dequeued")
+                self.in_flight[account] += 1
+                metrics.PIPELINE_IN_FLIGHT.inc(account=account)
+                try:
+                    await strategy.handle_signal(signal, source_name)
+                finally:
+                    self.in_flight[account] -= 1
+                    metrics.PIPELINE_IN_FLIGHT.dec(account=account)
+                    self.engine.tracer.finish(trace)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.counters["failed"] += 1
+                print(f"[Pipeline] {account} 訊號執行失敗: {e}")
+            finally:
+                queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        """各階段的佇列深度、執行中數量與丟棄 / 溢出計數"""
+        return {
+            "receive_depth": self._receive.qsize() if self._receive else 0,
+            "dispatch_depth": {account: q.qsize() for account, q in self._dispatch.items()},
+            "in_flight": dict(self.in_flight),
+            **self.counters,
+        }
@@ -1,19 +1,31 @@
 from abc import ABC, abstractmethod
 import asyncio
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, Optional, List, Union, Tuple
 from src.core.interfaces.strategy_abc import StrategyInterface
-from src.core.interfaces.exchange_abc import ExchangeInterface
+from src.core.interfaces.async_exchange_abc import AsyncExchangeInterface
+from src.core.interfaces.exchange_abc import is_duplicate_client_id
+from src.core.models import TradeSignal, TPLeg, TrackedTrade
+from src.core.order_tracker import OrderTracker
 
 class StrategyBase(StrategyInterface, ABC):
     """
     策略基類。
     提供通用的工具方法，如風險檢查、日誌封裝與下單代理。
     """
-    
-    def __init__(self, exchange: ExchangeInterface):
+
+
+    def __init__(self, exchange: AsyncExchangeInterface):
         self.exchange = exchange
         self.params: Dict[str, Any] = {}
         self.is_running = False
+        # 訂單追蹤服務 (由引擎注入共用實例；單獨使用策略時為自有實例)
+        self.tracker = OrderTracker()
+        self._stream_enabled = False
+        # 策略自行建立的背景任務 (停止時統一取消)
+        self._tasks = set()
+        # 持倉狀態庫 (由引擎注入；None 代表不持久化)
+        self.store = None
 
     def on_init(self, params: Dict[str, Any]) -> None:
         """預設的初始化邏輯，將傳入參數存入 self.params"""
@@ -24,23 +36,146 @@ class StrategyBase(StrategyInterface, ABC):
     async def stop(self) -> None:
         """優化關閉邏輯：停止策略運行並清理背景任務"""
         self.is_running = False
-        # 如果子類有背景監控任務，嘗試取消它
-        if hasattr(self, '_monitoring_task') and self._monitoring_task:
-            self._monitoring_task.cancel()
-            try:
-                await self._monitoring_task
-            except asyncio.CancelledError:
-                pass
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        # 共用的追蹤服務由引擎停止；自有實例隨策略一併停止
+        if not getattr(self, 'engine', None):
+            await self.tracker.stop()
         print(f"[Strategy: {self.strategy_name}] 已停止")
 
-    def execute_trade(self, symbol: str, side: str, amount: float, order_type: str = 'limit', price: float = None, params: Dict[str, Any] = {}) -> Dict[str, Any]:
-        """執行下單 (封裝底層交易所介面)"""
+    def accepts(self, source: str) -> bool:
+        """來源過濾：綁定頻道的實例只處理該頻道的訊號"""
+        target = getattr(self, 'target_source', None)
+        return not target or source == target
+
+    async def handle_signal(self, signal_data: TradeSignal, source: str) -> None:
+        """
+        由訊號管線的工作者 await 執行，完成時代表此帳戶的下單流程已結束。
+        預設委派給 on_signal；需要受控並行的策略應覆寫為完整的非同步執行流程。
+        """
+        self.on_signal(signal_data, source)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """建立受追蹤的背景任務"""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def execute_trade(self, symbol: str, side: str, amount: float, order_type: str = 'limit', price: float = None, params: Dict[str, Any] = {}) -> Dict[str, Any]:
+        """執行下單 (封裝底層交易所介面，非阻塞)"""
         try:
-            return self.exchange.create_order(symbol, order_type, side, amount, price, params)
+            return await self.exchange.create_order(symbol, order_type, side, amount, price, params)
         except Exception as e:
             print(f"[Trade Error] {symbol} {side} 下單失敗: {e}")
             return None
 
+    async def execute_batch(self, orders: List[Dict[str, Any]], retries: int = 1) -> List[Optional[Dict[str, Any]]]:
+        """
+        批次下單 (TP 階梯 + 止損一次送出)，失敗的單筆會重試 retries 次。
+        重試遇到重複 clientOrderId 時代表該腿先前已被接受，改以 clientOrderId 查回原訂單視為成功。
+        回傳與輸入順序一致的訂單列表，最終仍失敗者為 None。
+        """
+        placed: List[Optional[Dict[str, Any]]] = [None] * len(orders)
+        pending = list(range(len(orders)))
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            try:
+                results = await self.exchange.create_orders([orders[i] for i in pending])
+            except Exception as e:
+                print(f"[Trade Error] 批次下單失敗: {e}")
+                continue
+            failed, duplicates = [], []
+            for i, result in zip(pending, results):
+                if result['order']:
+                    placed[i] = result['order']
+                elif is_duplicate_client_id(result['error']):
+                    duplicates.append(i)
+                else:
+                    failed.append(i)
+                    o = orders[i]
+                    print(f"[Trade Error] {o['symbol']} {o['side']} 下單失敗 (第 {attempt + 1} 次): {result['error']}")
+            if duplicates:
+                recovered = await asyncio.gather(*(self._find_placed(orders[i]) for i in duplicates))
+                for i, order in zip(duplicates, recovered):
+                    if order:
+                        placed[i] = order
+                    else:
+                        failed.append(i)
+            pending = sorted(failed)
+        return placed
+
+    async def _find_placed(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """以 clientOrderId 查回先前已被接受的訂單 (查無或查詢失敗時回傳 None)"""
+        client_id = (request.get('params') or {}).get('clientOrderId')
+        if not client_id:
+            return None
+        try:
+            order = await self.exchange.find_order_by_client_id(request['symbol'], client_id)
+        except Exception as e:
+            print(f"[Trade Error] {request['symbol']} 查詢重複的 clientOrderId 失敗 ({client_id}): {e}")
+            return None
+        if not order:
+            print(f"[Trade Error] {request['symbol']} clientOrderId 重複但查無原訂單 ({client_id})")
+        return order
+
+    async def _move_stop(self, trade: TrackedTrade, stop_price: float, leg: str) -> None:
+        """
+        移動止損：由適配器以單次改單完成 (原止損在過程中持續有效)，
+        不支援改單時才撤單重掛 (重掛單使用 leg 產生的 clientOrderId)。
+        適配器回傳 None 代表舊止損已不存在 (已觸發或隨持倉歸零取消)，保留原 ID 不再重掛。
+        """
+        close_side = 'sell' if trade.side == 'buy' else 'buy'
+        try:
+            order = await self.exchange.amend_stop_order(
+                trade.sl_order_id, trade.symbol, close_side, trade.remaining_amount, stop_price,
+                params=self.with_client_id({'reduceOnly': True, 'positionIdx': 0}, trade, leg)
+            )
+            if order:
+                trade.sl_order_id = order['id']
+                trade.sl_price = stop_price
+        except Exception as e:
+            trade.sl_order_id = trade.sl_price = None
+            print(f"[{self.strategy_name} SL Error] {trade.symbol} 止損移動失敗: {e}")
+
+    @staticmethod
+    def _trace(signal_data: Optional[TradeSignal], stage: str) -> None:
+        """在訊號的延遲追蹤上記錄追蹤點 (未追蹤的訊號忽略)"""
+        trace = signal_data.trace if signal_data else None
+        if trace:
+            trace.mark(stage)
+
+    def _trace_batch(self, signal_data: Optional[TradeSignal], legs: List[str], placed: List[Optional[Dict[str, Any]]]) -> None:
+        """批次下單回報後，為每個成功的訂單腿記錄 '<leg>_ack'"""
+        for leg, order in zip(legs, placed):
+            if order:
+                self._trace(signal_data, f"{leg}_ack")
+
+    def _mark_dispatched(self, signal_data: TradeSignal) -> None:
+        """進場單送出前呼叫，供引擎統計多帳戶派發偏差"""
+        engine = getattr(self, 'engine', None)
+        if engine and signal_data.dispatch_id:
+            engine.dispatch.mark_sent(signal_data.dispatch_id, self.exchange.exchange_id)
+            engine.stats['dispatch'] = engine.dispatch.last
+
+    @staticmethod
+    def client_order_id(source: Union[TradeSignal, TrackedTrade, None], leg: str) -> Optional[str]:
+        """
+        由訊號 ID 與訂單腿 (E 進場 / TP1.. / SL / SL2..) 產生確定性的 clientOrderId。
+        重試送出同一腿時交易所會以重複 ID 拒絕，避免重複成交；無訊號 ID 時回傳 None。
+        """
+        signal_id = source.signal_id if source else None
+        return f"jz{signal_id}{leg}" if signal_id else None
+
+    @classmethod
+    def with_client_id(cls, params: Dict[str, Any], source: Union[TradeSignal, TrackedTrade, None], leg: str) -> Dict[str, Any]:
+        """回傳附帶 clientOrderId 的下單參數副本"""
+        client_id = cls.client_order_id(source, leg)
+        return {**params, 'clientOrderId': client_id} if client_id else dict(params)
+
     def calculate_order_amount(self, symbol: str, ticker_price: float, val: float, mode: str = 'USDT') -> float:
         """
         智慧數量計算器。
@@ -53,8 +188,96 @@ class StrategyBase(StrategyInterface, ABC):
         else:
             raw_amount = val
 
-        # 使用交易所精度處理
-        return float(self.exchange._exchange.amount_to_precision(symbol, raw_amount))
+        # 使用本地市場快取進行精度處理 (O(1)，不觸發網路請求)
+        amount = self.exchange.amount_to_precision(symbol, raw_amount)
+
+        market = self.exchange.get_market_info(symbol)
+        if market and market.get('min_qty') and amount < market['min_qty']:
+            print(f"[Strategy: {self.strategy_name}] 警告: {symbol} 下單量 {amount} 低於最小下單量 {market['min_qty']}")
+        return amount
+
+    # ------------------------------------------------------------------
+    # 持倉追蹤 (推送優先，輪詢為後備)
+    # ------------------------------------------------------------------
+    def _start_order_monitoring(self) -> None:
+        """將帳戶納入訂單追蹤服務 (由需要追蹤止盈的子類在 on_init 呼叫；推送與監控迴圈由服務統一管理)"""
+        self._stream_enabled = self.tracker.watch(self.exchange)
+
+    @property
+    def watched_trades(self) -> List[TrackedTrade]:
+        """本策略追蹤中的交易"""
+        return self.tracker.trades_of(self)
+
+    @property
+    def store_scope(self) -> str:
+        """持倉狀態庫中的範圍鍵：帳戶 / 策略 / 綁定頻道"""
+        return f"{self.exchange.exchange_id}/{self.strategy_name}/{getattr(self, 'target_source', None) or '*'}"
+
+    def _persist(self, trade: TrackedTrade, event: str = None) -> None:
+        if self.store:
+            self.store.save(self.store_scope, trade, event)
+
+    def _track_trade(self, trade: TrackedTrade, persist: bool = True) -> None:
+        # 建立時間 (毫秒) 作為對帳快照的回溯起點
+        if not trade.opened_at:
+            trade.opened_at = int(time.time() * 1000)
+        self.tracker.register(self, trade)
+        if persist:
+            self._persist(trade, "opened")
+
+    def _untrack_trade(self, trade: TrackedTrade) -> None:
+        if self.tracker.unregister(trade) and self.store:
+            self.store.remove(self.store_scope, trade)
+
+    async def restore_trades(self, reconcile: bool = True) -> int:
+        """
+        從持倉狀態庫還原上次運行中的交易，並以批次對帳補上停機期間的成交 / 取消
+        (期間成交的止盈照常觸發移動止損)。回傳還原的交易數。
+        由引擎統一還原時傳入 reconcile=False，所有策略還原完畢後再合併對帳一次。
+        """
+        if not self.store:
+            return 0
+        trades = self.store.load(self.store_scope)
+        for trade in trades:
+            self._track_trade(trade, persist=False)
+        if trades and reconcile:
+            await self.tracker.reconcile([self.exchange.exchange_id])
+        return len(trades)
+
+    async def _apply_tp_status(self, trade: TrackedTrade, tp: TPLeg, status: str) -> None:
+        """
+        依訂單狀態推進交易狀態 ('closed' 成交 / 'canceled' 取消)。
+        先同步移出索引再進行網路操作，確保推送與輪詢重複回報時只處理一次。
+        """
+        if status not in ('closed', 'canceled') or not self.tracker.claim(self.exchange.exchange_id, tp.id):
+            return
+
+        if status == 'closed':
+            await self._on_tp_filled(trade, tp)
+        else:
+            await self._on_tp_canceled(trade, tp)
+
+        if tp in trade.tp_orders:
+            trade.tp_orders.remove(tp)
+        # 止盈級別 / 止損單 ID / 剩餘量的變更一併寫入狀態庫
+        self._persist(trade, f"tp{tp.stage}_{status}")
+        if not trade.tp_orders:
+            self._untrack_trade(trade)
+
+    async def _on_tp_filled(self, trade: TrackedTrade, tp: TPLeg) -> None:
+        """止盈成交時的處理 (子類實作移動止損等邏輯)"""
+        pass
+
+    async def _on_tp_canceled(self, trade: TrackedTrade, tp: TPLeg) -> None:
+        print(f"[{self.strategy_name}] 警告: TP{tp.stage} 訂單被取消，停止追蹤該止盈點。")
+
+    @property
+    def candle_subscriptions(self) -> List[Tuple[str, str, int]]:
+        """
+        主動型策略需要的已收盤 K 線 [(交易對, 週期, 暖機根數)]。
+        引擎啟動時據此建立 K 線輪詢，每根收盤 K 線經 run_tick 交給 on_tick；訊號型策略回傳空列表。
+        """
+        return []
 
     @property
     def strategy_name(self) -> str:
@@ -65,7 +288,7 @@ class StrategyBase(StrategyInterface, ABC):
         pass
 
     @abstractmethod
-    def on_signal(self, signal_data: Dict[str, Any]) -> None:
+    def on_signal(self, signal_data: TradeSignal) -> None:
         pass
 
     @property
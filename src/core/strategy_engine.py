@@ -1,17 +1,54 @@
 from typing import Dict, Any, List
 import asyncio
-from src.core.interfaces.exchange_abc import ExchangeInterface
+from src.core.interfaces.async_exchange_abc import AsyncExchangeInterface
 from src.core.interfaces.strategy_abc import StrategyInterface
+from src.core.dispatch_tracker import DispatchTracker
+from src.core.order_tracker import OrderTracker
+from src.core.signal_pipeline import SignalPipeline
+from src.core.signal_dedup import SignalDeduplicator
+from src.core.models import TrackedTrade
+from src.infrastructure.latency_tracer import LatencyTracer
+from src.infrastructure.trade_store import TradeStore
+from src.infrastructure.candle_feed import CandleFeed
 from src.infrastructure.message_parsers.parser_factory import ParserFactory
 
 class StrategyEngine:
     """
     策略引擎 (核心調度器)。
     負責協調交易所、策略與多個訊號來源。
+    可同時持有多個帳戶 (子帳戶或不同交易所)，同一筆訊號會並行扇出至所有帳戶的策略實例。
     """
 
-    def __init__(self, exchange: ExchangeInterface):
-        self.exchange = exchange
+    def __init__(self, exchange: AsyncExchangeInterface, accounts: Dict[str, AsyncExchangeInterface] = None, pipeline_config: Dict[str, Any] = None, tracing_config: Dict[str, Any] = None, store_config: Dict[str, Any] = None, monitor_config: Dict[str, Any] = None):
+        self.exchange = exchange  # 主要帳戶 (自主策略模式使用)
+        self.accounts: Dict[str, AsyncExchangeInterface] = accounts or {exchange.exchange_id: exchange}
+        self.dispatch = DispatchTracker()
+        # 所有策略實例共用的訂單追蹤服務 (單一監控迴圈 / 每帳戶一個推送訂閱 / 依價位距離排程)
+        monitor_config = monitor_config or {}
+        self.tracker = OrderTracker(
+            poll_interval=monitor_config.get('poll_interval', 5),
+            stream_poll_interval=monitor_config.get('stream_poll_interval', 60),
+            min_interval=monitor_config.get('min_interval', 0.5),
+            max_interval=monitor_config.get('max_interval', 300),
+            drift_per_second=monitor_config.get('drift_per_second', 0.001),
+            max_requests_per_second=monitor_config.get('max_requests_per_second', 4.0)
+        )
+        self.pipeline = SignalPipeline(self, pipeline_config)
+        pipeline_config = pipeline_config or {}
+        self.dedup = SignalDeduplicator(ttl=pipeline_config.get('dedup_ttl', 600), max_size=pipeline_config.get('dedup_max_size', 1000))
+        tracing_config = tracing_config or {}
+        self.tracer = LatencyTracer(
+            path=tracing_config.get('path', 'logs/signal_traces.jsonl'),
+            window=tracing_config.get('window', 500)
+        )
+        store_config = store_config or {}
+        # 持倉狀態庫：重啟後還原止盈追蹤與移動止損 (enabled: false 時僅保存在記憶體)
+        self.store = TradeStore(
+            path=store_config.get('path', 'cache/trades.db'),
+            flush_interval=store_config.get('flush_interval', 0.5)
+        ) if store_config.get('enabled', True) else None
+        # 主動型策略的已收盤 K 線輪詢 (依策略宣告的 candle_subscriptions 建立)
+        self.candles = CandleFeed(self.run_tick, name="Engine CandleFeed")
         self.active_strategies: List[StrategyInterface] = []
         self.parsers: Dict[str, Any] = {} 
         self.is_running = False
@@ -24,12 +61,15 @@ class StrategyEngine:
             "investment_mode": "N/A",  # 下單模式 (USDT/UNITS)
             "investment_value": "N/A", # 下單數值
             "message_logs": [],   # 存儲最近 5 則訊息內容
-            "active_trades": []   # 存儲當前執行的策略持倉狀態
+            "dispatch": None,     # 最近一筆訊號的多帳戶派發偏差
+            "pipeline": {}        # 訊號管線佇列深度 / 執行中數量 / 丟棄計數
         }
 
     def add_strategy(self, strategy: StrategyInterface, params: Dict[str, Any]):
         """註冊並初始化策略"""
         strategy.engine = self  # 注入引擎實例以便策略更新數據
+        strategy.store = self.store
+        strategy.tracker = self.tracker
         strategy.on_init(params)
         self.active_strategies.append(strategy)
         
@@ -39,12 +79,58 @@ class StrategyEngine:
         if 'investment_value' in params:
             self.stats["investment_value"] = params['investment_value']
 
+    @property
+    def active_trades(self) -> List[TrackedTrade]:
+        """所有策略實例追蹤中的持倉 (由追蹤服務合併，供 UI 顯示)"""
+        return self.tracker.active_trades
+
+    def start(self):
+        """啟動訊號管線的解析與派發工作者，以及主動型策略的 K 線輪詢 (需在事件迴圈內呼叫)"""
+        self.is_running = True
+        self.pipeline.start()
+        if self.store:
+            self.store.start()
+        for strategy in self.active_strategies:
+            for symbol, timeframe, warmup in getattr(strategy, 'candle_subscriptions', ()):
+                self.candles.subscribe(strategy.exchange, symbol, timeframe, warmup)
+        self.candles.start()
+
+    async def restore_trades(self) -> int:
+        """
+        還原所有策略上次運行中的交易 (啟動時呼叫，需在策略綁定頻道之後)。
+        所有策略還原後由追蹤服務合併對帳一次，每個帳戶每個交易對只取一次訂單快照。
+        """
+        if not self.store:
+            return 0
+        results = await asyncio.gather(*(s.restore_trades(reconcile=False) for s in self.active_strategies if hasattr(s, 'restore_trades')), return_exceptions=True)
+        restored = 0
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"[Engine] 還原持倉時發生錯誤: {result}")
+            else:
+                restored += result
+        if restored:
+            await self.tracker.reconcile()
+            print(f"[Engine] 已還原 {restored} 筆追蹤中的持倉")
+        return restored
+
     async def stop(self):
         """集中停止所有運行的策略與引擎狀態"""
         self.is_running = False
+        await self.candles.stop()
+        await self.pipeline.stop()
+        self.tracer.close()
         tasks = [strat.stop() for strat in self.active_strategies]
         if tasks:
             await asyncio.gather(*tasks)
+        await self.tracker.stop()
+        if self.store:
+            await self.store.close()
+        # 關閉所有帳戶的非同步連線 (aiohttp Session)
+        results = await asyncio.gather(*(ex.close() for ex in self.accounts.values()), return_exceptions=True)
+        for account, result in zip(self.accounts, results):
+            if isinstance(result, Exception):
+                print(f"[Engine] 關閉交易所連線時發生錯誤 ({account}): {result}")
         print("[Engine] 所有策略已安全停止")
 
     def setup_signal_sources(self, signal_config: Dict[str, Any]):
@@ -67,34 +153,18 @@ class StrategyEngine:
         
         self.stats["active_channels"] = ", ".join(active_names) if active_names else "None"
 
-    def process_incoming_message(self, source_name: str, raw_message: Any):
+    def process_incoming_message(self, source_name: str, raw_message: Any, trace=None):
         """
         處理傳入的原始訊息 (由 SignalReceiver 呼叫)。
+        僅排入管線接收佇列後立即返回，解析與下單由管線工作者執行。
+        trace 為接收端建立的延遲追蹤 (未提供時於此建立)。
         """
-        parser = self.parsers.get(source_name)
-        if not parser:
-            return
-
-        trade_signal = parser.parse(raw_message)
-        
-        # 更新統計數據
-        self.stats["total_signals"] += 1
-        from datetime import datetime
-        now_time = datetime.now().strftime("%H:%M:%S")
-        self.stats["last_signal_time"] = now_time
-        
-        # 紀錄日誌 (僅保存最近 5 條)
-        log_entry = f"[{now_time}] {source_name}: {raw_message}"
-        self.stats["message_logs"].insert(0, log_entry)
-        self.stats["message_logs"] = self.stats["message_logs"][:5]
-
-        if trade_signal:
-            print(f"[Engine] 從 {source_name} 獲取到有效交易訊號，正在分發...")
-            self.stats["executed_trades"] += 1
-            for strategy in self.active_strategies:
-                strategy.on_signal(trade_signal, source_name)
+        if not self.pipeline.is_running:
+            self.pipeline.start()
+        self.pipeline.submit(source_name, raw_message, trace or self.tracer.start(source_name))
+        self.stats["pipeline"] = self.pipeline.stats()
 
     def run_tick(self, market_data: Dict[str, Any]):
-        """驅動主動型策略"""
+        """驅動主動型策略 (由 K 線輪詢以每根已收盤 K 線呼叫)"""
         for strategy in self.active_strategies:
             strategy.on_tick(market_data)
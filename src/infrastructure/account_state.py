@@ -0,0 +1,96 @@
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
+
+# 交易所回應「設定未變更」的錯誤碼 (代表目前狀態已是目標值，可直接寫入快取)
+NOT_MODIFIED_CODES = {
+    "leverage": ("110043", "leverage not modified"),
+    "margin_mode": ("110026", "margin mode is not modified"),
+    "hedged": ("110025", "position mode is not modified"),
+}
+
+class AccountStateCache:
+    """
+    帳戶設定快取 (以 (交易所, 交易對) 為鍵)。
+    記錄保證金模式、持倉模式與槓桿，讓每筆訊號只送出真正需要變更的設定請求。
+    啟動時由持倉資訊預熱，之後每次成功變更即同步更新。
+    """
+
+    FIELDS = ("margin_mode", "hedged", "leverage")
+
+    def __init__(self, exchange_id: str):
+        self.exchange_id = exchange_id
+        self._states: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # 交易所不支援的設定 (例如統一帳戶無法逐幣切換保證金模式)，避免每筆訊號重試
+        self._unsupported: Dict[Tuple[str, str], set] = {}
+
+    def _key(self, symbol: str) -> Tuple[str, str]:
+        return (self.exchange_id, symbol)
+
+    def get(self, symbol: str) -> Dict[str, Any]:
+        return self._states.get(self._key(symbol), {})
+
+    def update(self, symbol: str, **fields) -> None:
+        state = self._states.setdefault(self._key(symbol), {})
+        state.update({k: v for k, v in fields.items() if v is not None})
+
+    def mark_unsupported(self, symbol: str, field: str) -> None:
+        self._unsupported.setdefault(self._key(symbol), set()).add(field)
+
+    def pending_changes(self, symbol: str, margin_mode: str, hedged: bool, leverage: int) -> Dict[str, Any]:
+        """比對快取與目標值，只回傳需要送出的設定"""
+        state = self.get(symbol)
+        skipped = self._unsupported.get(self._key(symbol), set())
+        target = {"margin_mode": margin_mode, "hedged": hedged, "leverage": leverage}
+        return {
+            field: value for field, value in target.items()
+            if value is not None and field not in skipped and state.get(field) != value
+        }
+
+    def warm_from_positions(self, positions: List[Dict[str, Any]]) -> int:
+        """以 CCXT 統一格式的持倉資訊預熱快取，回傳寫入的交易對數量"""
+        count = 0
+        for pos in positions or []:
+            symbol = pos.get('symbol')
+            if not symbol:
+                continue
+            leverage = pos.get('leverage')
+            self.update(
+                symbol,
+                margin_mode=pos.get('marginMode'),
+                hedged=pos.get('hedged'),
+                leverage=int(float(leverage)) if leverage else None
+            )
+            count += 1
+        return count
+
+    async def ensure(self, exchange, symbol: str, leverage: int, margin_mode: str = 'cross', hedged: bool = False) -> None:
+        """
+        確保交易對的帳戶設定符合目標值 (各適配器 ensure_account_setup 的共用實作)。
+        只送出快取中不一致的設定，且彼此並行執行 (exchange 為提供 set_* 方法的適配器)；成功或「未變更」錯誤皆寫回快取。
+        """
+        changes = self.pending_changes(symbol, margin_mode, hedged, leverage)
+        if not changes:
+            return
+
+        calls = {
+            "margin_mode": lambda v: exchange.set_margin_mode(v, symbol),
+            "hedged": lambda v: exchange.set_position_mode(v, symbol),
+            "leverage": lambda v: exchange.set_leverage(v, symbol),
+        }
+        fields = list(changes.keys())
+        results = await asyncio.gather(*(calls[f](changes[f]) for f in fields), return_exceptions=True)
+
+        for field, result in zip(fields, results):
+            if not isinstance(result, Exception) or self.is_not_modified(field, result):
+                self.update(symbol, **{field: changes[field]})
+            elif field == 'leverage':
+                print(f"[Exchange Leverage Warning] {symbol}: {result}")
+            else:
+                # 保證金 / 持倉模式切換失敗 (常見於統一帳戶或已有持倉)，本次執行期間不再重試
+                self.mark_unsupported(symbol, field)
+
+    @staticmethod
+    def is_not_modified(field: str, error: Exception) -> bool:
+        """判斷錯誤是否為「設定未變更」(等同成功)"""
+        err_msg = str(error).lower()
+        return any(token in err_msg for token in NOT_MODIFIED_CODES.get(field, ()))
@@ -0,0 +1,102 @@
+import time
+import asyncio
+from typing import Dict, Any, List, Callable, Tuple
+
+CandleCallback = Callable[[Dict[str, Any]], None]
+
+_TIMEFRAME_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def timeframe_seconds(timeframe: str) -> int:
+    """K 線週期字串 ('1m' / '15m' / '4h' / '1d') 轉為秒數 (與 CCXT parse_timeframe 相同)"""
+    unit = _TIMEFRAME_UNITS.get(timeframe[-1:])
+    if unit is None or not timeframe[:-1].isdigit():
+        raise ValueError(f"無法辨識的 K 線週期: {timeframe}")
+    return int(timeframe[:-1]) * unit
+
+
+class CandleFeed:
+    """
+    已收盤 K 線輪詢器 (主動型策略的行情來源)。
+    1. 每個 (交易對, 週期) 一個輪詢任務，於每根 K 線收盤後 grace 秒以 fetch_ohlcv 取回最近的 K 線。
+    2. 只交付開盤時間 + 週期 <= 目前時間的 K 線 (形成中的最後一根不交付)，且每根只交付一次。
+    3. 首次輪詢交付 warmup 根歷史 K 線並標記 'warmup': True，供策略暖機指標而不據此下單。
+    """
+
+    # 單次補抓的 K 線上限 (斷線較久時只補最近的部分)
+    MAX_BARS = 1000
+
+    def __init__(self, callback: CandleCallback, grace: float = 2.0, name: str = "candle_feed"):
+        self.callback = callback
+        self.grace = grace
+        self.name = name
+        # (symbol, timeframe) -> (交易所適配器, 暖機根數)
+        self._subscriptions: Dict[Tuple[str, str], Tuple[Any, int]] = {}
+        self._tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    def subscribe(self, exchange, symbol: str, timeframe: str, warmup: int = 0) -> None:
+        """加入訂閱 (同一交易對與週期只輪詢一次，暖機根數取最大值)；已啟動時立即開始輪詢"""
+        timeframe_seconds(timeframe)
+        key = (symbol, timeframe)
+        current = self._subscriptions.get(key)
+        self._subscriptions[key] = (current[0] if current else exchange, max(warmup, current[1] if current else 0))
+        if self._tasks and key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._run(key))
+
+    def start(self) -> None:
+        for key in self._subscriptions:
+            if key not in self._tasks:
+                self._tasks[key] = asyncio.create_task(self._run(key))
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def _emit(self, symbol: str, timeframe: str, bar: List[float], warmup: bool) -> None:
+        timestamp, open_, high, low, close, volume = (list(bar) + [None] * 6)[:6]
+        try:
+            self.callback({
+                "symbol": symbol, "timeframe": timeframe, "timestamp": int(timestamp),
+                "open": open_, "high": high, "low": low, "close": close, "volume": volume,
+                "warmup": warmup,
+            })
+        except Exception as e:
+            print(f"[{self.name}] K 線處理失敗 ({symbol} {timeframe}): {e}")
+
+    async def _run(self, key: Tuple[str, str]) -> None:
+        symbol, timeframe = key
+        step = timeframe_seconds(timeframe) * 1000
+        last_ts = None
+        backoff = 1
+        while True:
+            try:
+                exchange, warmup = self._subscriptions[key]
+                now = time.time() * 1000
+                if last_ts is None:
+                    limit = warmup + 2
+                else:
+                    limit = int((now - last_ts) // step) + 2
+                bars = await exchange.fetch_ohlcv(symbol, timeframe, limit=min(limit, self.MAX_BARS))
+                now = time.time() * 1000
+                closed = [bar for bar in bars or [] if bar[0] + step <= now and (last_ts is None or bar[0] > last_ts)]
+                for bar in closed:
+                    self._emit(symbol, timeframe, bar, warmup=last_ts is None)
+                if closed:
+                    last_ts = closed[-1][0]
+                elif last_ts is None:
+                    # 尚無任何已收盤 K 線：以目前這根的開盤時間為基準，之後的 K 線視為即時
+                    last_ts = now // step * step - step
+                backoff = 1
+
+                next_close = (now // step + 1) * step
+                await asyncio.sleep((next_close - time.time() * 1000) / 1000 + self.grace)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[{self.name}] K 線輪詢失敗 ({symbol} {timeframe})，{backoff}s 後重試: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
@@ -0,0 +1,110 @@
+import time
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+from src.infrastructure.request_scheduler import ScheduledRequest, unscheduled
+
+class ConnectionKeeper:
+    """
+    連線保溫器。
+    1. 閒置超過 interval 秒時送出一次輕量請求 (伺服器時間)，讓 HTTP 連線池、DNS 快取與 TLS Session 維持熱狀態。
+    2. 以 measure() 記錄實際請求延遲，依請求前的閒置時間分為「冷」(> cold_after) 與「熱」兩組統計。
+    3. 閒置時間以同一 Session 上的所有請求 (含價格輪詢等未量測的請求) 計算，由 wrap() 包裝請求時自動刷新。
+    保溫啟用時連線不會閒置超過 interval，冷組應為空；停用保溫 (interval 為 0) 可觀察冷連線的實際延遲。
+    """
+
+    def __init__(self, client, interval: float = 10.0, cold_after: float = 15.0, samples: int = 100, name: str = "keep_warm", request: ScheduledRequest = None):
+        self.client = client
+        # 保溫請求同樣經由排程器 (背景通道) 送出，計入限速額度
+        self.request = request or unscheduled
+        self.interval = interval
+        # aiohttp 預設 keep-alive 為 15 秒，超過後連線會被關閉，下一個請求需重新握手
+        self.cold_after = cold_after
+        self.name = name
+        self.last_activity: float = 0.0
+        self.last_ping_ms: Optional[float] = None
+        self._latency = {"warm": deque(maxlen=samples), "cold": deque(maxlen=samples)}
+        self._task: asyncio.Task = None
+
+    def touch(self) -> None:
+        """記錄一次連線活動 (刷新閒置計時)"""
+        self.last_activity = time.monotonic()
+
+    def wrap(self, factory, measure: bool = False):
+        """
+        包裝請求 factory：在實際送出時才開始計時 (不含排程器的排隊等待)，完成後刷新閒置計時。
+        measure 為 False 的請求不計入冷 / 熱統計，但同樣算作連線活動。
+        """
+        async def run():
+            if measure:
+                with self.measure():
+                    return await factory()
+            try:
+                return await factory()
+            finally:
+                self.touch()
+        return run
+
+    @contextmanager
+    def measure(self):
+        """量測一次請求的往返延遲 (毫秒) 並依閒置時間歸類"""
+        started = time.perf_counter()
+        cold = (time.monotonic() - self.last_activity) > self.cold_after
+        try:
+            yield
+        finally:
+            self._latency["cold" if cold else "warm"].append((time.perf_counter() - started) * 1000)
+            self.last_activity = time.monotonic()
+
+    def report(self) -> Dict[str, Any]:
+        """回傳冷 / 熱請求的筆數、平均與最近一次延遲 (毫秒)"""
+        result = {"ping_ms": self.last_ping_ms}
+        for kind, samples in self._latency.items():
+            result[kind] = {
+                "count": len(samples),
+                "avg_ms": sum(samples) / len(samples) if samples else None,
+                "last_ms": samples[-1] if samples else None,
+            }
+        return result
+
+    def start(self) -> None:
+        if self.interval and not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def ping(self) -> None:
+        """送出一次輕量請求 (不計入冷 / 熱下單統計，只刷新閒置計時；延遲只計 HTTP 往返)"""
+        if self.client.has.get('fetchTime'):
+            endpoint, call = "market/time", self.client.fetch_time
+        else:
+            endpoint, call = "system/status", self.client.fetch_status
+
+        async def timed():
+            started = time.perf_counter()
+            try:
+                return await call()
+            finally:
+                self.last_ping_ms = (time.perf_counter() - started) * 1000
+                self.touch()
+
+        await self.request(endpoint, timed)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                idle = time.monotonic() - self.last_activity
+                if idle >= self.interval:
+                    await self.ping()
+                    idle = 0
+                await asyncio.sleep(self.interval - idle)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[{self.name}] 連線保溫請求失敗: {e}")
+                await asyncio.sleep(self.interval)
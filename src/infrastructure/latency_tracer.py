@@ -0,0 +1,123 @@
+import os
+import math
+import json
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+# 追蹤點的顯示順序 (未列出的追蹤點排在最後)
+STAGE_ORDER = [
+    "received", "prefilter", "parsed", "dequeued", "account_setup", "ticker",
+    "entry_ack", "tp1_ack", "tp2_ack", "tp3_ack", "tp4_ack", "sl_ack", "done",
+]
+
+class SignalTrace:
+    """
+    單筆訊號的延遲追蹤。
+    所有追蹤點皆以高精度計時器記錄，報表中的數值為「距離 Telethon 收到訊息」的累計毫秒數。
+    """
+
+    __slots__ = ("source", "account", "started", "wall_time", "marks")
+
+    def __init__(self, source: str, account: str = None, started: float = None, wall_time: float = None):
+        self.source = source
+        self.account = account
+        self.started = time.perf_counter() if started is None else started
+        self.wall_time = time.time() if wall_time is None else wall_time
+        self.marks: List[Tuple[str, float]] = [("received", self.started)]
+
+    def mark(self, stage: str) -> None:
+        self.marks.append((stage, time.perf_counter()))
+
+    def fork(self, account: str) -> "SignalTrace":
+        """扇出到帳戶時複製目前的追蹤點，之後各帳戶獨立記錄"""
+        child = SignalTrace(self.source, account, self.started, self.wall_time)
+        child.marks = list(self.marks)
+        return child
+
+    def offsets(self) -> Dict[str, float]:
+        """各追蹤點距離收到訊息的毫秒數 (同名追蹤點取第一次)"""
+        result = {}
+        for stage, t in self.marks:
+            result.setdefault(stage, (t - self.started) * 1000)
+        return result
+
+    def to_record(self) -> Dict[str, Any]:
+        return {
+            "time": self.wall_time,
+            "source": self.source,
+            "account": self.account,
+            "stages_ms": {k: round(v, 3) for k, v in self.offsets().items()},
+        }
+
+
+class LatencyTracer:
+    """
+    訊號延遲彙總器。
+    以滾動視窗保存每個 (來源, 追蹤點) 的最近 window 筆樣本並計算 p50 / p95 / p99，
+    完成的追蹤同時以 JSONL 寫入本地檔案供離線分析。
+    """
+
+    def __init__(self, path: Optional[str] = os.path.join("logs", "signal_traces.jsonl"), window: int = 500):
+        self.path = path
+        self.window = window
+        self._samples: Dict[Tuple[str, str], deque] = {}
+        self._file = None
+
+    def start(self, source: str, started: float = None) -> SignalTrace:
+        """started 為收到訊息時的 perf_counter (接收端先過濾再建立追蹤時使用)"""
+        return SignalTrace(source, started=started)
+
+    def finish(self, trace: Optional[SignalTrace]) -> None:
+        """追蹤結束：寫入滾動視窗與本地檔案"""
+        if trace is None:
+            return
+        trace.mark("done")
+        for stage, offset in trace.offsets().items():
+            for source in (trace.source, "*"):
+                key = (source, stage)
+                if key not in self._samples:
+                    self._samples[key] = deque(maxlen=self.window)
+                self._samples[key].append(offset)
+        self._write(trace.to_record())
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if not self.path:
+            return
+        try:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+        except OSError as e:
+            print(f"[LatencyTracer] 追蹤檔寫入失敗: {e}")
+
+    @staticmethod
+    def _percentile(sorted_values: List[float], pct: float) -> float:
+        # nearest-rank
+        rank = math.ceil(pct / 100 * len(sorted_values))
+        return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+    def percentiles(self, source: str = "*") -> Dict[str, Dict[str, float]]:
+        """回傳指定來源 ('*' 為全部) 各追蹤點的 {'count', 'p50', 'p95', 'p99'} (毫秒)"""
+        result = {}
+        stages = [stage for (src, stage) in self._samples if src == source]
+        stages.sort(key=lambda s: STAGE_ORDER.index(s) if s in STAGE_ORDER else len(STAGE_ORDER))
+        for stage in stages:
+            values = sorted(self._samples[(source, stage)])
+            result[stage] = {
+                "count": len(values),
+                "p50": self._percentile(values, 50),
+                "p95": self._percentile(values, 95),
+                "p99": self._percentile(values, 99),
+            }
+        return result
+
+    def sources(self) -> List[str]:
+        return sorted({src for (src, _) in self._samples if src != "*"})
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import asyncio
+import tempfile
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
+from typing import Dict, Any, Optional
+from src.infrastructure.request_scheduler import ScheduledRequest, unscheduled
+
+# CCXT 精度模式常數 (對應 ccxt.base.decimal_to_precision)
+DECIMAL_PLACES = 2
+TICK_SIZE = 4
+
+class MarketCache:
+    """
+    市場資訊快取 (精度 / 最小下單量 / 最小跳動價)。
+    1. 啟動時從本地快照 (JSON) 秒速載入，不需等待 load_markets()。
+    2. 快照超過 TTL 時由背景任務刷新並回寫磁碟。
+    3. 以扁平索引提供 O(1) 查詢，下單熱路徑不觸發任何網路請求。
+    4. 同一交易所的多個子帳戶以 shared() 共用同一實例，快照只下載 / 寫入一次。
+    """
+
+    # 快照路徑 -> 共用實例
+    _shared: Dict[str, 'MarketCache'] = {}
+
+    @classmethod
+    def shared(cls, exchange_id: str, cache_dir: str = "cache", ttl: float = 86400) -> 'MarketCache':
+        """取得同一快照路徑的共用實例 (多帳戶時避免重複下載與並行寫入同一檔案)"""
+        path = os.path.join(cache_dir, f"markets_{exchange_id}.json")
+        if path not in cls._shared:
+            cls._shared[path] = cls(exchange_id, cache_dir, ttl)
+        return cls._shared[path]
+
+    def __init__(self, exchange_id: str, cache_dir: str = "cache", ttl: float = 86400):
+        self.exchange_id = exchange_id
+        self.ttl = ttl
+        self.path = os.path.join(cache_dir, f"markets_{exchange_id}.json")
+        self.updated_at: float = 0.0
+        self.markets: Dict[str, Any] = {}
+        self.precision_mode: int = TICK_SIZE
+        # symbol -> 精簡後的精度資訊 (避免每次查詢都走 CCXT 巢狀字典)
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._refresh_lock = asyncio.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return bool(self._index)
+
+    @property
+    def is_stale(self) -> bool:
+        return (time.time() - self.updated_at) > self.ttl
+
+    def load_snapshot(self) -> Optional[Dict[str, Any]]:
+        """讀取本地快照 (共用實例已載入時直接沿用)，若不存在或格式錯誤則回傳 None"""
+        if self.is_loaded:
+            return self.markets
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            self.update(snapshot['markets'], snapshot.get('precision_mode', TICK_SIZE), snapshot.get('updated_at', 0.0))
+            print(f"[MarketCache] 已從快照載入 {len(self._index)} 個市場 ({self.path})")
+            return self.markets
+        except Exception as e:
+            print(f"[MarketCache] 快照讀取失敗，將重新下載: {e}")
+            return None
+
+    def save_snapshot(self) -> None:
+        """將目前的市場資訊寫入本地快照"""
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # 先寫同目錄下的唯一暫存檔再取代，避免中途崩潰留下半份快照，也避免多個寫入者共用同一暫存檔
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, suffix='.tmp', delete=False) as f:
+            json.dump({
+                "updated_at": self.updated_at,
+                "precision_mode": self.precision_mode,
+                "markets": self.markets
+            }, f)
+        try:
+            os.replace(f.name, self.path)
+        except OSError:
+            os.remove(f.name)
+            raise
+
+    def update(self, markets: Dict[str, Any], precision_mode: int = TICK_SIZE, updated_at: float = None) -> None:
+        """以 CCXT markets 結構重建索引"""
+        self.markets = markets
+        self.precision_mode = precision_mode
+        self.updated_at = updated_at if updated_at is not None else time.time()
+
+        self._index = {symbol: self._index_entry(market) for symbol, market in markets.items()}
+
+    def add(self, symbol: str, market: Dict[str, Any]) -> None:
+        """加入單一市場 (不重建整份索引，供模擬交易所動態上架交易對)"""
+        self.markets[symbol] = market
+        self._index[symbol] = self._index_entry(market)
+
+    def _index_entry(self, market: Dict[str, Any]) -> Dict[str, Any]:
+        precision = market.get('precision') or {}
+        limits = market.get('limits') or {}
+        return {
+            "amount_step": self._to_step(precision.get('amount')),
+            "price_step": self._to_step(precision.get('price')),
+            "min_qty": (limits.get('amount') or {}).get('min'),
+            "max_qty": (limits.get('amount') or {}).get('max'),
+            "min_cost": (limits.get('cost') or {}).get('min'),
+            "contract_size": market.get('contractSize'),
+        }
+
+    def _to_step(self, precision: Any) -> Optional[Decimal]:
+        """將 CCXT 的精度值轉為最小步進 (TICK_SIZE 直接使用，DECIMAL_PLACES 轉成 10^-n)"""
+        if precision is None:
+            return None
+        if self.precision_mode == DECIMAL_PLACES:
+            return Decimal(1).scaleb(-int(precision))
+        if self.precision_mode == TICK_SIZE:
+            return Decimal(str(precision))
+        # SIGNIFICANT_DIGITS 等模式無法以固定步進表示，交由 CCXT 處理
+        return None
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """O(1) 查詢交易對的精度與限制資訊"""
+        return self._index.get(symbol)
+
+    def amount_to_precision(self, symbol: str, amount: float) -> Optional[float]:
+        """數量向下截斷至最小步進 (與 CCXT TRUNCATE 行為一致)，查無資料時回傳 None"""
+        info = self._index.get(symbol)
+        if not info or info['amount_step'] is None:
+            return None
+        step = info['amount_step']
+        return float((Decimal(str(amount)) / step).to_integral_value(ROUND_DOWN) * step)
+
+    def price_to_precision(self, symbol: str, price: float) -> Optional[float]:
+        """價格四捨五入至最小跳動價，查無資料時回傳 None"""
+        info = self._index.get(symbol)
+        if not info or info['price_step'] is None:
+            return None
+        step = info['price_step']
+        return float((Decimal(str(price)) / step).to_integral_value(ROUND_HALF_UP) * step)
+
+    async def refresh(self, client, request: ScheduledRequest = unscheduled) -> None:
+        """
+        從交易所重新下載市場資訊並回寫快照 (client 為 CCXT 非同步實例，request 為排程請求函式)。
+        共用實例同時只有一個刷新者；等待期間已由其他帳戶刷新 (不再過期) 時只將結果同步到 client。
+        """
+        async with self._refresh_lock:
+            if self.is_loaded and not self.is_stale:
+                client.set_markets(self.markets)
+                return
+            markets = await request("market/instruments-info", lambda: client.load_markets(reload=True))
+            self.update(markets, client.precisionMode)
+            # 檔案寫入丟到執行緒，避免數 MB 的 JSON 序列化卡住事件迴圈
+            await asyncio.to_thread(self.save_snapshot)
+        print(f"[MarketCache] 市場資訊已刷新 ({len(self._index)} 個市場)")
@@ -1,6 +1,7 @@
 import re
 from typing import Dict, Any, Optional
 from src.core.interfaces.parser_abc import ParserInterface
+from src.core.models import TradeSignal
 
 class DemoTGParser(ParserInterface):
     """
@@ -8,7 +9,7 @@ class DemoTGParser(ParserInterface):
     範例格式: "Long BTCUSDT entry 95000 sl 92000"
     """
 
-    def parse(self, raw_message: str) -> Optional[Dict[str, Any]]:
+    def parse(self, raw_message: str) -> Optional[TradeSignal]:
         if not isinstance(raw_message, str):
             return None
 
@@ -18,15 +19,19 @@ class DemoTGParser(ParserInterface):
 
         if match:
             side_raw = match.group(1).lower()
-            return {
-                "symbol": f"{match.group(2).upper()}/USDT",
-                "side": "buy" if side_raw in ["buy", "long"] else "sell",
-                "entry_price": float(match.group(3)),
-                "raw_source": raw_message
-            }
+            return TradeSignal(
+                symbol=f"{match.group(2).upper()}/USDT",
+                side="buy" if side_raw in ["buy", "long"] else "sell",
+                entry_price=float(match.group(3)),
+                raw_text=raw_message
+            )
         
         return None
 
+    @property
+    def prefilter(self) -> Optional[Dict[str, Any]]:
+        return {"all": ["entry"], "any": ["buy", "sell", "long", "short"]}
+
     @property
     def source_name(self) -> str:
         return "demo_telegram_parser"
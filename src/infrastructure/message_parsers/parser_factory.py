@@ -1,27 +1,34 @@
-from typing import Dict, Any, Optional, Type
+import os
+from typing import Optional
 from src.core.interfaces.parser_abc import ParserInterface
 from src.infrastructure.message_parsers.demo_tg_parser import DemoTGParser
-from src.infrastructure.message_parsers.adtrack_parser import AdTrackParser
-from src.infrastructure.message_parsers.italy_parser import ItalyParser
+from src.infrastructure.message_parsers.signal_grammar import GrammarParser, FORMATS_DIR
 
 class ParserFactory:
     """
     解析器工廠。
     根據名稱動態產生對應的解析器實例。
+    未註冊的名稱會在 formats/ 目錄尋找同名的 YAML 格式檔 (也可直接傳入 .yaml 路徑)。
     """
-    
+
     # 註冊表：將配置字串映射到具體類別
     _REGISTERED_PARSERS = {
         "demo_tg_parser": DemoTGParser,
-        "adtrack_parser": AdTrackParser,
-        "italy_parser": ItalyParser,
     }
 
     @classmethod
     def create_parser(cls, parser_name: str) -> Optional[ParserInterface]:
         """建立解析器實例"""
         parser_class = cls._REGISTERED_PARSERS.get(parser_name)
-        if not parser_class:
+        if parser_class:
+            return parser_class()
+
+        path = parser_name if parser_name.endswith(('.yaml', '.yml')) else os.path.join(FORMATS_DIR, f"{parser_name}.yaml")
+        if not os.path.exists(path):
             print(f"[Warning] 找不到名稱為 '{parser_name}' 的解析器，將無法處理該來源訊號")
             return None
-        return parser_class()
+        try:
+            return GrammarParser.from_file(path)
+        except Exception as e:
+            print(f"[Warning] 訊號格式 '{parser_name}' 載入失敗: {e}")
+            return None
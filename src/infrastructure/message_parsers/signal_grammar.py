@@ -0,0 +1,174 @@
+import os
+import re
+import yaml
+from dataclasses import fields as dataclass_fields
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from src.core.interfaces.parser_abc import ParserInterface
+from src.core.models import TradeSignal, SignalValidationError
+
+FORMATS_DIR = os.path.join(os.path.dirname(__file__), "formats")
+
+def _side(value: str) -> str:
+    side = value.strip().lower()
+    if side in ('long', 'buy'):
+        return 'buy'
+    if side in ('short', 'sell'):
+        return 'sell'
+    raise SignalValidationError(f"無法辨識的方向: {value!r}")
+
+# 欄位正規化函式 (YAML 中以名稱引用)
+NORMALIZERS: Dict[str, Callable[[str], Any]] = {
+    "float": float,
+    "int": int,
+    "str": str.strip,
+    "upper": lambda v: v.strip().upper(),
+    "lower": lambda v: v.strip().lower(),
+    "side": _side,
+}
+
+
+class _Field:
+    """編譯後的單一欄位：樣式中的具名群組即為輸出的訊號欄位"""
+
+    __slots__ = ("name", "many", "normalize", "outputs", "regex", "required")
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        self.name = name
+        self.many = bool(spec.get('many', False))
+        normalize = spec.get('normalize', 'str')
+        if normalize not in NORMALIZERS:
+            raise ValueError(f"欄位 {name} 使用未知的正規化函式: {normalize}")
+        self.normalize = NORMALIZERS[normalize]
+
+        flags = spec.get('flags', '')
+        # 載入時編譯一次；以文字開頭的樣式可使用 re 的前綴快速掃描
+        self.regex = re.compile(f"(?{flags}:{spec['pattern']})" if flags else spec['pattern'])
+        self.outputs: List[str] = list(self.regex.groupindex)
+        if not self.outputs:
+            raise ValueError(f"欄位 {name} 的樣式缺少具名群組 (?P<欄位>...)")
+        self.required = False
+
+    def extract(self, match: "re.Match") -> Dict[str, Any]:
+        normalize = self.normalize
+        try:
+            if len(self.outputs) == 1:
+                return {self.outputs[0]: normalize(match.group(self.outputs[0]))}
+            return {output: normalize(raw) for output, raw in match.groupdict().items() if raw is not None}
+        except (TypeError, ValueError) as e:
+            raise SignalValidationError(f"欄位 {self.name} 無法解析 ({match.group(0)!r}): {e}")
+
+
+class SignalGrammar:
+    """
+    宣告式訊號格式 (YAML)，載入時編譯所有欄位樣式。
+    1. 含必要欄位的樣式排在最前面，非此格式的訊息在第一次比對失敗時即退出。
+    2. 單一值欄位取第一次出現；many 欄位收集全部 (如止盈目標)。
+    3. 各欄位獨立編譯而非合併成單一交替式：CPython re 對以文字開頭的樣式會做前綴快速掃描，
+       合併後每個位置都要逐一嘗試所有分支，實測反而較慢。
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.name = spec['name']
+        self.description = spec.get('description', '')
+        clean = spec.get('clean')
+        self.clean = re.compile(clean) if clean else None
+        self.required: Tuple[str, ...] = tuple(spec.get('required', ('symbol',)))
+        self.defaults: Dict[str, Any] = dict(spec.get('defaults') or {})
+        self.constants: Dict[str, Any] = dict(spec.get('constants') or {})
+        self.prefilter: Optional[Dict[str, Any]] = spec.get('prefilter')
+
+        symbol = spec.get('symbol') or {}
+        self.symbol_strip = symbol.get('strip', '')
+        self.symbol_quotes: Tuple[str, ...] = tuple(symbol.get('quotes', ()))
+        self.symbol_template = symbol.get('template', '{raw}')
+        # 原始代號 -> CCXT 格式 (頻道會反覆出現相同幣種)
+        self._symbols: Dict[str, str] = {}
+
+        fields = [_Field(name, f) for name, f in spec['fields'].items()]
+        self._owners = {output: f for f in fields for output in f.outputs}
+        for f in fields:
+            f.required = any(o in self.required for o in f.outputs)
+        # 必要欄位優先 (穩定排序，其餘維持宣告順序)
+        self.fields: List[_Field] = sorted(fields, key=lambda f: not f.required)
+
+        known = {f.name for f in dataclass_fields(TradeSignal)}
+        unknown = (set(self._owners) | set(self.defaults) | set(self.constants)) - known
+        if unknown:
+            raise ValueError(f"格式 {self.name} 含有 TradeSignal 不支援的欄位: {sorted(unknown)}")
+        missing = set(self.required) - set(self._owners)
+        if missing:
+            raise ValueError(f"格式 {self.name} 的必要欄位沒有對應樣式: {sorted(missing)}")
+
+    @classmethod
+    def load(cls, path: str) -> "SignalGrammar":
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(yaml.safe_load(f))
+
+    def _symbol(self, raw: str) -> str:
+        """交易所代號轉為 CCXT 格式 (例如 DAMUSDT -> DAM/USDT:USDT)"""
+        symbol = self._symbols.get(raw)
+        if symbol is None:
+            symbol = code = raw
+            for ch in self.symbol_strip:
+                code = code.replace(ch, '')
+            for quote in self.symbol_quotes:
+                if code.endswith(quote) and len(code) > len(quote):
+                    symbol = self.symbol_template.format(base=code[:-len(quote)], quote=quote, raw=code)
+                    break
+            if len(self._symbols) >= 1000:
+                self._symbols.clear()
+            self._symbols[raw] = symbol
+        return symbol
+
+    def match(self, text: str) -> Optional[Dict[str, Any]]:
+        """回傳欄位字典；缺少必要欄位 (非此格式的訊息) 時回傳 None"""
+        if self.clean:
+            text = self.clean.sub('', text)
+
+        values: Dict[str, Any] = {}
+        for field in self.fields:
+            if field.many:
+                for m in field.regex.finditer(text):
+                    for output, value in field.extract(m).items():
+                        values.setdefault(output, []).append(value)
+                if field.required and not any(output in values for output in field.outputs):
+                    return None
+                continue
+
+            m = field.regex.search(text)
+            if m is None:
+                if field.required:
+                    return None
+                continue
+            values.update(field.extract(m))
+
+        if 'symbol' in values:
+            values['symbol'] = self._symbol(values['symbol'])
+        return {**self.defaults, **values, **self.constants}
+
+
+class GrammarParser(ParserInterface):
+    """以 SignalGrammar 驅動的解析器 (新增頻道格式只需新增 YAML 檔)"""
+
+    def __init__(self, grammar: SignalGrammar):
+        self.grammar = grammar
+
+    @classmethod
+    def from_file(cls, path: str) -> "GrammarParser":
+        return cls(SignalGrammar.load(path))
+
+    def parse(self, raw_message: Any) -> Optional[TradeSignal]:
+        if not isinstance(raw_message, str):
+            return None
+        values = self.grammar.match(raw_message)
+        if values is None:
+            return None
+        return TradeSignal(raw_text=raw_message, **values)
+
+    @property
+    def prefilter(self) -> Optional[Dict[str, Any]]:
+        return self.grammar.prefilter
+
+    @property
+    def source_name(self) -> str:
+        return self.grammar.name
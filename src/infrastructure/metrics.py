@@ -0,0 +1,182 @@
+import re
+import bisect
+from typing import Dict, Any, List, Tuple, Sequence
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """
+    指標基類。所有更新皆發生在事件迴圈所在的單一執行緒，
+    以普通字典累加即可，不需要鎖 (熱路徑只做一次字典查詢與加法)。
+    """
+
+    TYPE = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple, Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple:
+        return tuple(labels.get(n, "") for n in self.label_names)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        for key, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    TYPE = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    TYPE = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    TYPE = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            # [各區間計數 (非累計), 總和, 筆數]
+            state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float('inf'),), counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """指標註冊表：同名指標只建立一次，render() 輸出 Prometheus 文字格式"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, *args, **kwargs)
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labels)
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labels)
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labels, buckets)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def error_code(error: Exception) -> str:
+    """從交易所例外擷取錯誤碼 (Bybit retCode)，無法辨識時使用例外類別名稱"""
+    match = re.search(r'"ret_?[cC]ode"\s*:\s*(\d+)', str(error))
+    return match.group(1) if match else type(error).__name__
+
+
+# 全域註冊表與系統指標 (各模組直接匯入使用)
+REGISTRY = MetricsRegistry()
+
+SIGNALS_RECEIVED = REGISTRY.counter("jz_signals_received_total", "Raw messages accepted by the signal pipeline", ["source"])
+SIGNALS_PARSED = REGISTRY.counter("jz_signals_parsed_total", "Messages parsed into a trade signal", ["source"])
+SIGNALS_DUPLICATE = REGISTRY.counter("jz_signals_duplicate_total", "Trade signals dropped by the idempotency cache", ["source"])
+SIGNALS_DROPPED = REGISTRY.counter("jz_signals_dropped_total", "Signals dropped, spilled or expired by the pipeline", ["stage", "reason"])
+ORDERS_SENT = REGISTRY.counter("jz_orders_sent_total", "Orders acknowledged by the exchange", ["account", "type"])
+ORDER_ERRORS = REGISTRY.counter("jz_order_errors_total", "Order submissions rejected by the exchange", ["account", "code"])
+PIPELINE_IN_FLIGHT = REGISTRY.gauge("jz_pipeline_in_flight", "Signal executions currently running", ["account"])
+OPEN_TRADES = REGISTRY.gauge("jz_open_trades", "Trades with TP orders still being tracked", ["strategy", "account"])
+MONITOR_CYCLE_SECONDS = REGISTRY.histogram("jz_monitor_cycle_seconds", "Duration of one order-monitor reconciliation cycle", ["strategy", "account"])
+MONITOR_DEFERRED = REGISTRY.counter("jz_monitor_deferred_total", "Order-monitor cycles that hit the request budget with checks still due", ["account"])
+STOP_AMEND_SECONDS = REGISTRY.histogram("jz_stop_amend_seconds", "Latency of one trailing-stop update", ["account", "method"])
+
+
+class MetricsServer:
+    """本地 HTTP 抓取端點 (GET /metrics，Prometheus 文字格式)"""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, host: str = "127.0.0.1", port: int = 9108):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    async def start(self) -> None:
+        from aiohttp import web
+
+        async def handler(request):
+            return web.Response(
+                body=self.registry.render().encode('utf-8'),
+                headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+            )
+
+        app = web.Application()
+        app.router.add_get('/metrics', handler)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        print(f"[Metrics] 指標端點已啟動: http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,128 @@
+import json
+import asyncio
+from typing import Dict, Any, List, Callable, Awaitable
+
+OrderCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# 本地訂單串流 (LocalOrderFeed) 的預設埠號；多個帳戶啟用時由 ExchangeManager 依序遞增分配
+LOCAL_FEED_PORT = 8765
+
+class OrderStream:
+    """
+    私有訂單 / 成交事件串流分發器。
+    持續呼叫來源的 watch_orders() (ccxt.pro 或 LocalOrderFeed)，
+    並將每筆訂單更新推送給所有訂閱者，斷線時以指數退避自動重連。
+    """
+
+    def __init__(self, source, name: str = "order_stream"):
+        self.source = source
+        self.name = name
+        self.is_connected = False
+        self._callbacks: List[OrderCallback] = []
+        self._task: asyncio.Task = None
+        self._dispatch_tasks = set()
+
+    def subscribe(self, callback: OrderCallback) -> None:
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
+
+    def unsubscribe(self, callback: OrderCallback) -> None:
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def start(self) -> None:
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = [t for t in [self._task, *self._dispatch_tasks] if t]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self.is_connected = False
+
+    async def _run(self) -> None:
+        backoff = 1
+        while True:
+            try:
+                orders = await self.source.watch_orders()
+                self.is_connected = True
+                backoff = 1
+                for order in orders:
+                    self._dispatch(order)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.is_connected = False
+                print(f"[{self.name}] 訂單串流中斷，{backoff}s 後重連: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+    def _dispatch(self, order: Dict[str, Any]) -> None:
+        # 每個回呼獨立成任務，避免移動止損等網路操作卡住串流接收
+        for callback in self._callbacks:
+            task = asyncio.create_task(self._safe_call(callback, order))
+            self._dispatch_tasks.add(task)
+            task.add_done_callback(self._dispatch_tasks.discard)
+
+    async def _safe_call(self, callback: OrderCallback, order: Dict[str, Any]) -> None:
+        try:
+            await callback(order)
+        except Exception as e:
+            print(f"[{self.name}] 訂單事件處理失敗 ({order.get('id')}): {e}")
+
+
+class LocalOrderFeed:
+    """
+    本地 WebSocket 替身 (離線測試用)。
+    提供與 ccxt.pro 相同的 watch_orders() 介面；訂單更新可直接呼叫 push()，
+    或透過 serve() 開啟的本地 WebSocket 以 JSON (單筆或陣列) 送入。
+    """
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._runner = None
+
+    def push(self, order: Dict[str, Any]) -> None:
+        self._queue.put_nowait(order)
+
+    async def watch_orders(self) -> List[Dict[str, Any]]:
+        """阻塞直到有新事件，並一次取出所有已累積的更新 (與 ccxt.pro newUpdates 行為一致)"""
+        orders = [await self._queue.get()]
+        while not self._queue.empty():
+            orders.append(self._queue.get_nowait())
+        return orders
+
+    async def serve(self, host: str = "127.0.0.1", port: int = LOCAL_FEED_PORT) -> None:
+        """啟動本地 WebSocket 伺服器 (ws://host:port/orders)"""
+        from aiohttp import web, WSMsgType
+
+        async def handler(request):
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    payload = json.loads(msg.data)
+                except ValueError:
+                    await ws.send_str('{"success": false, "ret_msg": "invalid json"}')
+                    continue
+                for order in payload if isinstance(payload, list) else [payload]:
+                    self.push(order)
+                await ws.send_str('{"success": true}')
+            return ws
+
+        app = web.Application()
+        app.router.add_get('/orders', handler)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        print(f"[LocalOrderFeed] 本地訂單串流已啟動: ws://{host}:{port}/orders")
+
+    async def close(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
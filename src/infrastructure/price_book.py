@@ -0,0 +1,127 @@
+import time
+import asyncio
+from typing import Dict, Any, Optional, Set
+from src.infrastructure.request_scheduler import ScheduledRequest, unscheduled
+
+class PriceBook:
+    """
+    即時價格簿 (last / bid / ask / mark)。
+    1. 'ccxt' 模式以 ccxt.pro watch_tickers() 訂閱行情推送；'poll' 模式定期以單次 fetch_tickers() 批次刷新。
+    2. 每筆價格附帶本地接收時間，讀取端可依最大容許延遲判斷是否過期。
+    3. 策略熱路徑以同步字典查詢取得價格，不觸發任何網路請求。
+    4. 輪詢請求經由 request (適配器綁定背景通道的排程函式) 送出，與下單共用限速額度。
+    5. 超過 idle_expiry 秒未被讀取的交易對自動移出追蹤清單 (例如最後一筆交易已結束)，啟動時預先訂閱的交易對除外。
+    """
+
+    def __init__(self, client, mode: str = "poll", poll_interval: float = 1.0, max_age: float = 3.0, name: str = "price_book", request: ScheduledRequest = None, idle_expiry: float = 300.0):
+        self.client = client
+        self.request = request or unscheduled
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.max_age = max_age
+        self.name = name
+        self.idle_expiry = idle_expiry
+        # symbol -> {'last', 'bid', 'ask', 'mark', 'updated_at'}
+        self._prices: Dict[str, Dict[str, Any]] = {}
+        self._symbols: Set[str] = set()
+        # symbol -> 最近一次 watch() 的時間 (monotonic)；_pinned 為不因閒置移除的交易對
+        self._last_used: Dict[str, float] = {}
+        self._pinned: Set[str] = set()
+        self._symbols_changed = asyncio.Event()
+        self._task: asyncio.Task = None
+
+    def watch(self, symbol: str, pin: bool = False) -> None:
+        """加入追蹤清單 (下一輪推送 / 輪詢起生效) 並刷新閒置計時；pin 為 True 者不因閒置移除"""
+        self._last_used[symbol] = time.monotonic()
+        if pin:
+            self._pinned.add(symbol)
+        if symbol not in self._symbols:
+            self._symbols.add(symbol)
+            self._symbols_changed.set()
+
+    def unwatch(self, symbol: str) -> None:
+        """移出追蹤清單並丟棄價格"""
+        self._symbols.discard(symbol)
+        self._pinned.discard(symbol)
+        self._last_used.pop(symbol, None)
+        self._prices.pop(symbol, None)
+
+    def _prune(self) -> None:
+        """移除超過 idle_expiry 秒未被讀取的交易對 (0 或 None 代表不移除)"""
+        if not self.idle_expiry:
+            return
+        cutoff = time.monotonic() - self.idle_expiry
+        for symbol in [s for s in self._symbols if s not in self._pinned and self._last_used.get(s, 0.0) < cutoff]:
+            self.unwatch(symbol)
+
+    def update(self, ticker: Dict[str, Any]) -> None:
+        """以 CCXT 統一 ticker 格式寫入價格"""
+        symbol = ticker.get('symbol')
+        if not symbol:
+            return
+        info = ticker.get('info') or {}
+        self._prices[symbol] = {
+            "last": ticker.get('last'),
+            "bid": ticker.get('bid'),
+            "ask": ticker.get('ask'),
+            "mark": ticker.get('markPrice') or (float(info['markPrice']) if isinstance(info, dict) and info.get('markPrice') else None),
+            "updated_at": time.time(),
+        }
+
+    def get(self, symbol: str, max_age: float = None) -> Optional[Dict[str, Any]]:
+        """
+        O(1) 讀取價格；超過 max_age 秒 (預設為建構時設定) 未更新或不存在時回傳 None。
+        """
+        price = self._prices.get(symbol)
+        limit = self.max_age if max_age is None else max_age
+        if not price or price['last'] is None or (time.time() - price['updated_at']) > limit:
+            return None
+        return price
+
+    def age(self, symbol: str) -> Optional[float]:
+        """距離最近一次更新的秒數 (查無資料時為 None)"""
+        price = self._prices.get(symbol)
+        return time.time() - price['updated_at'] if price else None
+
+    def start(self) -> None:
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        backoff = 1
+        while True:
+            try:
+                self._prune()
+                if not self._symbols:
+                    self._symbols_changed.clear()
+                    await self._symbols_changed.wait()
+                    continue
+
+                self._symbols_changed.clear()
+                symbols = list(self._symbols)
+                if self.mode == "ccxt":
+                    tickers = await self.client.watch_tickers(symbols)
+                else:
+                    tickers = await self.request("market/tickers", lambda: self.client.fetch_tickers(symbols))
+                for ticker in tickers.values():
+                    self.update(ticker)
+                backoff = 1
+
+                if self.mode != "ccxt":
+                    # 輪詢間隔內若有新交易對加入則提前刷新
+                    try:
+                        await asyncio.wait_for(self._symbols_changed.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[{self.name}] 行情更新失敗，{backoff}s 後重試: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
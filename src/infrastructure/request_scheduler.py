@@ -0,0 +1,236 @@
+import time
+import heapq
+import asyncio
+import itertools
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, Any, Callable, Awaitable, Optional
+
+class Priority:
+    """請求優先通道 (數字越小越優先)"""
+    CRITICAL = 0    # 進場單、止損變更、撤單、下單前的帳戶設定
+    ORDERS = 1      # 止盈階梯掛單
+    BACKGROUND = 2  # 輪詢、對帳、餘額等非即時查詢
+
+    NAMES = {CRITICAL: "critical", ORDERS: "orders", BACKGROUND: "background"}
+
+# Bybit v5 各端點每秒請求上限 (以 UID 計，合約類別)；實際值會依回應標頭 X-Bapi-Limit 校正
+BYBIT_ENDPOINT_LIMITS = {
+    "order/create": 10,
+    "order/create-batch": 10,
+    "order/amend": 10,
+    "order/cancel": 10,
+    "order/realtime": 50,
+    "order/history": 50,
+    "position/list": 50,
+    "position/set-leverage": 10,
+    "position/switch-mode": 10,
+    "position/trading-stop": 10,
+    "account/set-margin-mode": 5,
+    "account/wallet-balance": 50,
+}
+# Bybit IP 層級上限：每 5 秒 600 次
+BYBIT_IP_RATE = 120
+
+# 已綁定優先通道的請求函式 request(endpoint, factory)，由適配器傳給價格簿 / 連線保溫 / 市場快取等輔助元件
+ScheduledRequest = Callable[[str, Callable[[], Awaitable[Any]]], Awaitable[Any]]
+
+
+# 以主機為鍵的共用 IP 層級權杖桶 (同一行程內的多個子帳戶共用同一個 IP 額度)
+_ip_buckets: Dict[str, 'TokenBucket'] = {}
+
+
+def shared_bucket(key: str, rate: float) -> 'TokenBucket':
+    """取得 key (交易所主機) 的共用權杖桶，不存在時以 rate 建立"""
+    if key not in _ip_buckets:
+        _ip_buckets[key] = TokenBucket(rate)
+    return _ip_buckets[key]
+
+
+# 目前請求的 HTTP 回應標頭。ContextVar 以 task 為單位隔離：
+# 所有通道共用同一個 ccxt 實例，last_response_headers 可能已被同時完成的其他請求覆寫
+_response_headers: ContextVar[Optional[Dict[str, Any]]] = ContextVar("response_headers", default=None)
+
+
+def record_response_headers(client) -> None:
+    """
+    包裝 ccxt 客戶端的 on_rest_response (每個 HTTP 回應都會同步呼叫一次)，
+    將該回應的標頭寫入發出請求的 task，供 with_response_headers 取回。
+    """
+    original = getattr(client, 'on_rest_response', None)
+    if original is None:
+        return
+
+    def on_rest_response(code, reason, url, method, response_headers, *args, **kwargs):
+        _response_headers.set(response_headers)
+        return original(code, reason, url, method, response_headers, *args, **kwargs)
+
+    client.on_rest_response = on_rest_response
+
+
+def with_response_headers(factory: Callable[[], Awaitable[Any]]) -> Callable[[], Awaitable[Any]]:
+    """包裝請求 factory：回傳 (結果, 這次請求本身的回應標頭)；沒有送出 HTTP 請求時標頭為 None"""
+    async def run():
+        _response_headers.set(None)
+        result = await factory()
+        return result, _response_headers.get()
+    return run
+
+
+async def unscheduled(endpoint: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+    """未啟用排程器時的請求函式：直接送出"""
+    return await factory()
+
+
+class TokenBucket:
+    """權杖桶：rate 為每秒補充量，capacity 為瞬間可用的最大權杖數"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """距離可取得一個權杖的秒數 (0 代表立即可用)"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def block(self, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = min(self.tokens, 0)
+
+
+class RequestScheduler:
+    """
+    客戶端優先權限速排程器 (取代 ccxt 單一 FIFO 的 enableRateLimit)。
+    1. 每個請求帶有優先通道與端點名稱，分派器依通道順序放行，同一端點內高優先者永遠先取得權杖。
+    2. 端點權杖桶依交易所公告上限建立，並以回應標頭 (剩餘次數 / 重置時間) 即時校正。
+    3. 提供各通道的排隊深度與等待時間統計。
+    全域 (IP 層級) 權杖桶可由 global_bucket 傳入共用實例，讓多個帳戶的排程器共享同一額度。
+    """
+
+    def __init__(self, endpoint_limits: Dict[str, float] = None, default_rate: float = 10.0, global_rate: float = None, samples: int = 100, name: str = "scheduler", global_bucket: 'TokenBucket' = None):
+        self.endpoint_limits = endpoint_limits or {}
+        self.default_rate = default_rate
+        self.name = name
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._global = global_bucket or (TokenBucket(global_rate) if global_rate else None)
+        self._queue = []
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task = None
+        self._depth = {lane: 0 for lane in Priority.NAMES}
+        self._waits = {lane: deque(maxlen=samples) for lane in Priority.NAMES}
+
+    def bucket(self, endpoint: str) -> TokenBucket:
+        if endpoint not in self._buckets:
+            self._buckets[endpoint] = TokenBucket(self.endpoint_limits.get(endpoint, self.default_rate))
+        return self._buckets[endpoint]
+
+    async def submit(self, lane: int, endpoint: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """排隊等待放行後執行 factory() (每次重新建立協程，避免未放行時先送出請求)"""
+        if not self._task:
+            self._task = asyncio.create_task(self._dispatch())
+
+        grant = asyncio.get_running_loop().create_future()
+        enqueued = time.monotonic()
+        heapq.heappush(self._queue, (lane, next(self._seq), endpoint, grant))
+        self._depth[lane] += 1
+        self._wake.set()
+        try:
+            await grant
+        finally:
+            self._depth[lane] -= 1
+        self._waits[lane].append((time.monotonic() - enqueued) * 1000)
+        return await factory()
+
+    def observe(self, endpoint: str, headers: Optional[Dict[str, Any]]) -> None:
+        """依回應標頭校正端點權杖桶 (Bybit: X-Bapi-Limit / X-Bapi-Limit-Status / X-Bapi-Limit-Reset-Timestamp)"""
+        if not headers:
+            return
+        headers = {str(k).lower(): v for k, v in headers.items()}
+        bucket = self.bucket(endpoint)
+        try:
+            limit = float(headers.get('x-bapi-limit') or 0)
+            if limit > 0:
+                # 缺少或為 0 的上限不可寫入 (rate 為 0 會讓等待時間計算除以零)
+                bucket.rate = bucket.capacity = limit
+            remaining = headers.get('x-bapi-limit-status')
+            if remaining is not None:
+                remaining = float(remaining)
+                if remaining <= 0:
+                    reset_at = float(headers.get('x-bapi-limit-reset-timestamp') or 0) / 1000
+                    bucket.block(max(reset_at - time.time(), 1.0 / bucket.rate))
+                else:
+                    bucket.tokens = min(bucket.tokens, remaining)
+        except (TypeError, ValueError):
+            pass
+
+    def penalize(self, endpoint: str, seconds: float = 1.0) -> None:
+        """交易所回報超限時暫停該端點"""
+        self.bucket(endpoint).block(seconds)
+        self._wake.set()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """各通道的排隊深度、平均與最大等待時間 (毫秒)"""
+        result = {}
+        for lane, name in Priority.NAMES.items():
+            waits = self._waits[lane]
+            result[name] = {
+                "depth": self._depth[lane],
+                "avg_wait_ms": sum(waits) / len(waits) if waits else 0.0,
+                "max_wait_ms": max(waits) if waits else 0.0,
+            }
+        return result
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _dispatch(self) -> None:
+        while True:
+            self._wake.clear()
+            now = time.monotonic()
+            next_delay = None
+            waiting = []
+            blocked_endpoints = set()
+            while self._queue:
+                item = heapq.heappop(self._queue)
+                lane, _, endpoint, grant = item
+                if grant.done():
+                    continue  # 呼叫端已取消
+                if endpoint in blocked_endpoints:
+                    # 同端點已有更高優先者在等待，不允許插隊
+                    waiting.append(item)
+                    continue
+                delay = max(self._global.delay(now) if self._global else 0.0, self.bucket(endpoint).delay(now))
+                if delay > 0:
+                    blocked_endpoints.add(endpoint)
+                    waiting.append(item)
+                    next_delay = delay if next_delay is None else min(next_delay, delay)
+                    continue
+                self.bucket(endpoint).take(now)
+                if self._global:
+                    self._global.take(now)
+                grant.set_result(None)
+            for item in waiting:
+                heapq.heappush(self._queue, item)
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), next_delay)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,58 @@
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+class SignalPrefilter:
+    """
+    訊號來源的快速前置過濾 (在任何解析樣式之前執行)。
+    各解析器宣告 {'all': [...], 'any': [...], 'prefix': [...]}：
+    - all: 關鍵字必須全部出現；any: 至少出現一個；prefix: 訊息開頭 (忽略前置空白)
+    所有來源的關鍵字合併成單一多樣式比對器 (Aho-Corasick 式，以 re 的純文字交替式實作)，每則訊息只掃描一次，
+    找到的關鍵字以位元遮罩累計，條件一滿足即提前結束；比對不分大小寫。
+    """
+
+    def __init__(self, rules: Dict[str, Optional[Dict[str, Any]]]):
+        keywords: List[str] = []
+        for rule in rules.values():
+            for kw in (rule or {}).get('all', []) + (rule or {}).get('any', []):
+                if kw.lower() not in keywords:
+                    keywords.append(kw.lower())
+
+        # 關鍵字 -> 位元；較長的關鍵字若包含較短者，一併點亮較短者的位元 (單次掃描不重疊比對)
+        bits = {kw: 1 << i for i, kw in enumerate(keywords)}
+        self._bits: Dict[str, int] = {kw: sum(bits[o] for o in keywords if o in kw) for kw in keywords}
+
+        # 不使用捕獲群組：純文字交替式可讓 re 以首字元集合快速跳過不相關的位置
+        # 長的優先，避免被其前綴搶先比對
+        ordered = sorted(keywords, key=len, reverse=True)
+        self._matcher = re.compile("|".join(map(re.escape, ordered))) if keywords else None
+
+        self._rules: Dict[str, Tuple[int, int, Tuple[str, ...], int]] = {}
+        for source, rule in rules.items():
+            if not rule:
+                continue
+            all_mask = sum(bits[kw] for kw in {k.lower() for k in rule.get('all', [])})
+            any_mask = sum(bits[kw] for kw in {k.lower() for k in rule.get('any', [])})
+            prefixes = tuple(p.lower() for p in rule.get('prefix', []))
+            self._rules[source] = (all_mask, any_mask, prefixes, max(map(len, prefixes), default=0))
+
+    def accepts(self, source: str, text: str) -> bool:
+        """此來源的訊息是否可能是交易訊號 (未宣告過濾條件的來源一律通過)"""
+        rule = self._rules.get(source)
+        if rule is None:
+            return True
+        all_mask, any_mask, prefixes, prefix_len = rule
+
+        if prefixes:
+            head = text.lstrip()[:prefix_len].lower()
+            if not head.startswith(prefixes):
+                return False
+        if not all_mask and not any_mask:
+            return True
+
+        # 先整段轉小寫再以區分大小寫的樣式比對 (re.I 的交替式明顯較慢)
+        found = 0
+        for m in self._matcher.finditer(text.lower()):
+            found |= self._bits[m.group()]
+            if found & all_mask == all_mask and (not any_mask or found & any_mask):
+                return True
+        return False
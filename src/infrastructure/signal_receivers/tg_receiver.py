@@ -1,7 +1,10 @@
 from telethon import TelegramClient, events
 import asyncio
+import time
 from typing import Dict, Any
 from rich.console import Console
+from src.infrastructure.signal_receivers.prefilter import SignalPrefilter
+from src.infrastructure.signal_recorder import SignalRecorder
 
 console = Console()
 
@@ -14,6 +17,10 @@ class TGSignalReceiver:
         self.client = None
         self._is_running = False
         self.channel_map = {}
+        self.prefilter: SignalPrefilter = None
+        # 選配：記錄所有原始訊息 (前置過濾之前) 供重播調校
+        recorder_cfg = config.get('recorder') or {}
+        self.recorder = SignalRecorder(recorder_cfg.get('path', 'logs/signal_record.jsonl')) if recorder_cfg.get('enabled', False) else None
 
     async def connect_and_auth(self):
         """第一階段：建立連線並處理互動式驗證"""
@@ -59,20 +66,26 @@ class TGSignalReceiver:
 
     def _register_handlers(self, valid_entities):
         """註冊訊息攔截規則"""
+        # 各來源解析器宣告的前置過濾條件合併為單一比對器 (每則訊息只掃描一次)
+        self.prefilter = SignalPrefilter({name: parser.prefilter for name, parser in self.engine.parsers.items()})
+
         @self.client.on(events.NewMessage(chats=valid_entities))
         async def handler(event):
+            received = time.perf_counter()
             source_name = self.channel_map.get(event.chat_id)
             if not source_name: return
 
             raw_text = event.message.message or ""
+            if self.recorder:
+                self.recorder.record(source_name, raw_text)
             
-            # --- 超精確過濾：必須同時包含『預言機』與『交易對』關鍵欄位 ---
-            if "預言機" in raw_text and "交易對" in raw_text:
-                # 只有符合格式的才推送給引擎
-                self.engine.process_incoming_message(source_name, raw_text)
-            else:
-                # 忽略其他 Topic 的訊息
-                pass
+            # --- 前置過濾：只有符合該來源格式關鍵字的訊息才推送給引擎，其他 Topic / 聊天直接忽略 ---
+            if not self.prefilter.accepts(source_name, raw_text):
+                return
+
+            trace = self.engine.tracer.start(source_name, started=received)
+            trace.mark("prefilter")
+            self.engine.process_incoming_message(source_name, raw_text, trace=trace)
 
     async def run_forever(self):
         """第二階段：開始無限期監聽"""
@@ -95,6 +108,8 @@ class TGSignalReceiver:
 
     async def stop(self):
         """停止接收器"""
+        if self.recorder:
+            self.recorder.close()
         if self.client:
             await self.client.disconnect()
             self._is_running = False
@@ -0,0 +1,45 @@
+import os
+import json
+import time
+from typing import Dict, Any, Iterator, Optional
+
+class SignalRecorder:
+    """
+    原始訊息記錄器 (僅追加的 JSONL)。
+    每行一則訊息：{"t": 收到時間 (epoch 秒), "s": 來源名稱, "m": 原始內容}，
+    在前置過濾之前記錄，重播時可完整重現當天的頻道流量 (含雜訊)。
+    """
+
+    def __init__(self, path: str = os.path.join("logs", "signal_record.jsonl")):
+        self.path = path
+        self._file = None
+        self.count = 0
+
+    def record(self, source: str, raw_message: Any, received_at: float = None) -> None:
+        entry = {"t": round(time.time() if received_at is None else received_at, 6), "s": source, "m": raw_message}
+        try:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':'), default=str) + "\n")
+            self._file.flush()
+            self.count += 1
+        except OSError as e:
+            print(f"[SignalRecorder] 記錄檔寫入失敗: {e}")
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def read_records(path: str, source: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """依序讀取記錄檔 (可只取指定來源)，略過損毀的行"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if source is None or entry.get('s') == source:
+                yield entry
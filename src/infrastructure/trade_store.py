@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+from src.core.models import TrackedTrade
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    scope TEXT NOT NULL,
+    trade_key TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (scope, trade_key)
+);
+CREATE TABLE IF NOT EXISTS trade_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scope TEXT NOT NULL,
+    trade_key TEXT NOT NULL,
+    event TEXT NOT NULL,
+    stage INTEGER NOT NULL,
+    at REAL NOT NULL
+);
+"""
+
+class TradeStore:
+    """
+    本地持倉狀態庫 (SQLite，WAL 模式)。
+    1. 策略的追蹤中交易 (止盈腿、止損單 ID、止盈級別) 以 (scope, trade_key) 為鍵保存，
+       scope 區分帳戶 / 策略 / 綁定頻道。
+    2. save / remove 只更新記憶體中的待寫入表 (同一交易多次變更只保留最後狀態)，
+       由背景任務每 flush_interval 秒以單一交易 (transaction) 批次寫入，不阻塞事件迴圈。
+    3. 止盈成交 / 取消等狀態轉換另記於 trade_events (僅追加)，供事後檢查。
+    """
+
+    def __init__(self, path: str = os.path.join("cache", "trades.db"), flush_interval: float = 0.5):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        # (scope, trade_key) -> (交易對, JSON) 或 None (刪除)
+        self._pending: Dict[Tuple[str, str], Optional[Tuple[str, str]]] = {}
+        self._events: List[Tuple[str, str, str, int, float]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def open(self) -> None:
+        if self._conn:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # 寫入在工作執行緒進行 (同一時間只有一個寫入者，由 _lock 保證)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def start(self) -> None:
+        """開啟資料庫並啟動批次寫入任務 (需在事件迴圈內呼叫)"""
+        self.open()
+        if not self._task:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    def load(self, scope: str) -> List[TrackedTrade]:
+        """讀取指定範圍內所有未結束的交易 (啟動時呼叫)"""
+        self.open()
+        rows = self._conn.execute("SELECT data FROM trades WHERE scope = ?", (scope,)).fetchall()
+        trades = []
+        for (data,) in rows:
+            try:
+                trades.append(TrackedTrade.from_record(json.loads(data)))
+            except (TypeError, ValueError) as e:
+                print(f"[TradeStore] 略過無法還原的交易紀錄 ({scope}): {e}")
+        return trades
+
+    def save(self, scope: str, trade: TrackedTrade, event: str = None) -> None:
+        self._pending[(scope, trade.key)] = (trade.symbol, json.dumps(trade.to_record(), separators=(',', ':')))
+        if event:
+            self._events.append((scope, trade.key, event, trade.current_tp_stage, time.time()))
+
+    def remove(self, scope: str, trade: TrackedTrade, event: str = "closed") -> None:
+        self._pending[(scope, trade.key)] = None
+        if event:
+            self._events.append((scope, trade.key, event, trade.current_tp_stage, time.time()))
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"[TradeStore] 批次寫入失敗: {e}")
+
+    async def flush(self) -> None:
+        """將待寫入的變更以單一交易寫入資料庫"""
+        if not self._pending and not self._events:
+            return
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            events, self._events = self._events, []
+            try:
+                await asyncio.to_thread(self._write, pending, events)
+            except Exception:
+                # 寫入失敗時放回 (期間的新變更優先)，下一輪重試
+                self._pending = {**pending, **self._pending}
+                self._events = events + self._events
+                raise
+
+    def _write(self, pending: Dict[Tuple[str, str], Optional[Tuple[str, str]]], events: List[Tuple]) -> None:
+        now = time.time()
+        upserts = [(scope, key, value[0], value[1], now) for (scope, key), value in pending.items() if value]
+        deletes = [(scope, key) for (scope, key), value in pending.items() if value is None]
+        with self._conn:
+            if upserts:
+                self._conn.executemany(
+                    "INSERT INTO trades (scope, trade_key, symbol, data, updated_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (scope, trade_key) DO UPDATE SET symbol = excluded.symbol, data = excluded.data, updated_at = excluded.updated_at",
+                    upserts
+                )
+            if deletes:
+                self._conn.executemany("DELETE FROM trades WHERE scope = ? AND trade_key = ?", deletes)
+            if events:
+                self._conn.executemany("INSERT INTO trade_events (scope, trade_key, event, stage, at) VALUES (?, ?, ?, ?, ?)", events)
+
+    async def close(self) -> None:
+        """停止背景任務並寫入剩餘變更"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._conn:
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[TradeStore] 關閉前寫入失敗: {e}")
+            self._conn.close()
+            self._conn = None
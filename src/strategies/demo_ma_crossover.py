@@ -1,18 +1,71 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from src.core.strategy_base import StrategyBase
+from src.core.models import TradeSignal
+from src.core.indicators import SMA, EMA, Crossover
 
 class DemoMACrossover(StrategyBase):
     """
     示範策略：均線交叉。
     這是一個主動式策略，用於展示如何宣告參數需求。
+    引擎依 candle_subscriptions 輪詢已收盤的 K 線，經 StrategyEngine.run_tick 餵入 ({'symbol', 'timeframe', 'close', ...})；
+    快 / 慢均線以串流指標逐根 O(1) 更新，暖機 K 線只更新指標不下單。
+    黃金交叉做多、死亡交叉做空，持有反向倉位時以兩倍數量市價反手。
     """
 
+    def on_init(self, params: Dict[str, Any]) -> None:
+        super().on_init(params)
+        # CLI 輸入的參數為字串，於此轉換型別
+        self.symbol = params.get('symbol')
+        self.timeframe = str(params.get('timeframe') or '1m')
+        fast_period = int(params.get('fast_period', 10))
+        slow_period = int(params.get('slow_period', 20))
+        if fast_period >= slow_period:
+            print(f"[Strategy: {self.strategy_name}] 警告: 快線週期 ({fast_period}) 應小於慢線週期 ({slow_period})")
+        ma = SMA if str(params.get('ma_type', 'EMA')).upper() == 'SMA' else EMA
+        self.fast = ma(fast_period)
+        self.slow = ma(slow_period)
+        self.cross = Crossover()
+        self.warmup = slow_period * 3
+        self.amount = float(params.get('amount', 0.001))
+        self.leverage = int(params.get('leverage', 1))
+        # 目前方向：1 多 / -1 空 / 0 空手
+        self.position = 0
+        self._account_ready = False
+
     def on_tick(self, data: Dict[str, Any]) -> None:
-        """主動輪詢行情時觸發"""
-        # 這裡會放置指標計算與買賣邏輯
-        pass
+        """主動輪詢行情時觸發 (每根已收盤 K 線一次)"""
+        if not self.is_running or data.get('symbol') != self.symbol or data.get('close') is None:
+            return
+        if data.get('timeframe', self.timeframe) != self.timeframe:
+            return
+        close = float(data['close'])
+        direction = self.cross.update(self.fast.update(close), self.slow.update(close))
+        if direction and direction != self.position and not data.get('warmup'):
+            # 先同步更新方向，避免下單完成前的下一根 K 線重複觸發
+            amount = self.amount * (2 if self.position else 1)
+            previous, self.position = self.position, direction
+            self._spawn(self._rebalance(direction, amount, previous))
+
+    async def _rebalance(self, direction: int, amount: float, previous: int) -> None:
+        side = 'buy' if direction == 1 else 'sell'
+        if not self._account_ready:
+            try:
+                await self.exchange.ensure_account_setup(self.symbol, self.leverage, margin_mode='cross', hedged=False)
+                self._account_ready = True
+            except Exception as e:
+                print(f"[Strategy: {self.strategy_name}] 帳戶設定失敗: {e}")
+        print(f"[Strategy: {self.strategy_name}] {'黃金' if direction == 1 else '死亡'}交叉 "
+              f"(快 {self.fast.value:.6g} / 慢 {self.slow.value:.6g}) -> {side} {amount}")
+        order = await self.execute_trade(self.symbol, side, amount, order_type='market', params={'positionIdx': 0})
+        if order is None and self.position == direction:
+            self.position = previous  # 下單失敗：恢復原方向，等待下一次交叉
+
+    @property
+    def candle_subscriptions(self) -> List[Tuple[str, str, int]]:
+        """以慢線週期的三倍 K 線暖機 (EMA 起始值的影響在此之後可忽略)"""
+        return [(self.symbol, self.timeframe, self.warmup)] if self.symbol else []
 
-    def on_signal(self, signal_data: Dict[str, Any]) -> None:
+    def on_signal(self, signal_data: TradeSignal, source: str = None) -> None:
         """此策略為主動型，通常不處理外部訊號"""
         pass
 
@@ -23,8 +76,11 @@ class DemoMACrossover(StrategyBase):
         """
         return {
             "symbol": {"type": "string", "description": "交易對 (如 BTC/USDT)", "required": True},
+            "timeframe": {"type": "string", "description": "K 線週期 (如 1m / 15m / 1h)", "default": "1m"},
             "fast_period": {"type": "int", "description": "快線週期", "default": 10},
             "slow_period": {"type": "int", "description": "慢線週期", "default": 20},
+            "ma_type": {"type": "list", "description": "均線類型", "default": "EMA", "choices": ["EMA", "SMA"]},
+            "amount": {"type": "float", "description": "每次下單數量 (幣)", "default": 0.001},
             "leverage": {"type": "int", "description": "槓桿倍數", "default": 1}
         }
 
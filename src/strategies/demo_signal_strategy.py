@@ -1,5 +1,7 @@
+import asyncio
 from typing import Dict, Any
 from src.core.strategy_base import StrategyBase
+from src.core.models import TradeSignal
 
 class DemoSignalStrategy(StrategyBase):
     """
@@ -11,16 +13,20 @@ class DemoSignalStrategy(StrategyBase):
         """訊號策略通常不主動跑指標"""
         pass
 
-    def on_signal(self, signal_data: Dict[str, Any]) -> None:
-        """接收到解析後的訊號，執行交易"""
-        symbol = signal_data.get("symbol")
-        side = signal_data.get("side")
-        price = signal_data.get("entry_price")
+    def on_signal(self, signal_data: TradeSignal, source: str = None) -> None:
+        """接收到解析後的訊號 (直接呼叫時以受追蹤的背景任務執行)"""
+        self._spawn(self.handle_signal(signal_data, source))
+
+    async def handle_signal(self, signal_data: TradeSignal, source: str = None) -> None:
+        """由訊號管線工作者呼叫，執行交易"""
+        symbol = signal_data.symbol
+        side = signal_data.side
+        price = signal_data.entry_price
         
         print(f"[Strategy: {self.strategy_name}] 接收到解析訊號，準備執行...")
         
-        # 調用 StrategyBase 封裝的下單方法
-        self.execute_trade(
+        # 調用 StrategyBase 封裝的下單方法 (非同步，不阻塞事件迴圈)
+        await self.execute_trade(
             symbol=symbol,
             side=side,
             amount=0.01, # 這裡未來應由風控模組計算
@@ -4,6 +4,7 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 from src.core.strategy_base import StrategyBase
+from src.core.models import TradeSignal, TPLeg, TrackedTrade
 
 console = Console()
 
@@ -16,91 +17,78 @@ class ItalyStrategy(StrategyBase):
     3. 移動止損保護。
     """
 
-    def __init__(self, exchange):
-        super().__init__(exchange)
-        self.watched_trades = []
-        self._is_running = False
-        self._monitoring_task = None
-
     def on_init(self, params: Dict[str, Any]) -> None:
         super().on_init(params)
-        if not self._monitoring_task:
-            self._is_running = True
-            self._monitoring_task = asyncio.create_task(self._monitor_loop())
+        # 優先使用訂單推送，無推送時退回 5 秒輪詢
+        self._start_order_monitoring()
+
+    def on_signal(self, signal_data: TradeSignal, source: str) -> None:
+        # 未經訊號管線直接呼叫時，以受追蹤的背景任務執行
+        if self.accepts(source):
+            self._spawn(self.handle_signal(signal_data, source))
 
-    def on_signal(self, signal_data: Dict[str, Any], source: str) -> None:
+    async def handle_signal(self, signal_data: TradeSignal, source: str) -> None:
         # --- 來源過濾邏輯：確保此實例只處理其綁定頻道的訊號 ---
-        if hasattr(self, 'target_source') and self.target_source and source != self.target_source:
+        if not self.accepts(source):
             return
             
         # 只處理來自 Italy_Channel 的訊號 (或是相關解析器的訊號)
         # 如果是混合模式，這可以確保不會誤吃中文訊號
         table = Table(show_header=False, box=None)
-        table.add_row("交易對", f"[bold cyan]{signal_data['symbol']}[/bold cyan]")
-        table.add_row("方向", f"[bold {'green' if signal_data['side']=='buy' else 'red'}]{signal_data['side'].upper()}[/bold {'green' if signal_data['side']=='buy' else 'red'}]")
+        table.add_row("交易對", f"[bold cyan]{signal_data.symbol}[/bold cyan]")
+        table.add_row("方向", f"[bold {'green' if signal_data.side=='buy' else 'red'}]{signal_data.side.upper()}[/bold {'green' if signal_data.side=='buy' else 'red'}]")
         table.add_row("來源", f"[dim]{source}[/dim]")
         
         console.print(Panel(table, title="[bold magenta]🇮🇹 Italy 訊號觸發 - 市價執行[/bold magenta]", border_style="magenta", expand=False))
         
-        asyncio.create_task(self._process_execution(signal_data))
+        await self._process_execution(signal_data)
 
-    async def _process_execution(self, signal):
-        symbol = signal['symbol']
-        side = signal['side']
-        leverage = signal['leverage']
-        target_tps = signal['take_profits']
-        sl_price = signal['stop_loss']
+    async def _process_execution(self, signal: TradeSignal):
+        symbol = signal.symbol
+        side = signal.side
+        leverage = signal.leverage
+        target_tps = signal.take_profits
+        sl_price = signal.stop_loss
 
         try:
-            # 1. 環境設置 (全倉、單向持倉、槓桿)
-            try:
-                # True 代表全倉, False 代表逐倉
-                self.exchange._exchange.set_margin_mode('cross', symbol)
-            except: pass
-
-            try:
-                # False 代表單向, True 代表雙向
-                self.exchange._exchange.set_position_mode(False, symbol)
-            except: pass
-
-            try:
-                self.exchange._exchange.set_leverage(leverage, symbol)
-            except Exception as lev_e:
-                err_msg = str(lev_e).lower()
-                if "110043" in err_msg or "leverage not modified" in err_msg:
-                    print(f"[Italy Strategy] 提示：{symbol} 槓桿數已為 {leverage} 倍，不進行調整。")
-                else:
-                    print(f"[Italy Strategy Leverage Warning] {lev_e}")
+            # 1. 環境設置 (全倉、單向持倉、槓桿；已符合的設定由快取略過)
+            await self.exchange.ensure_account_setup(symbol, leverage, margin_mode='cross', hedged=False)
+            self._trace(signal, "account_setup")
             
             # 2. 計算數量
-            ticker = self.exchange.get_ticker(symbol)
-            current_price = ticker['last']
+            # 價格簿命中時不觸發網路請求，過期才退回 REST
+            price = await self.exchange.get_price(symbol)
+            self._trace(signal, "ticker")
+            current_price = price['last']
             
             mode = self.params.get("investment_mode", "USDT")
             val = self.params.get("investment_value", 100.0)
             amount = self.calculate_order_amount(symbol, current_price, val, mode=mode)
 
             # 3. 直下市價單 (Italy 策略核心)
-            main_order = self.execute_trade(
+            self._mark_dispatched(signal)
+            main_order = await self.execute_trade(
                 symbol=symbol, side=side, amount=amount, order_type='market',
-                params={'positionIdx': 0} # 強制單向持倉
+                params=self.with_client_id({'positionIdx': 0}, signal, 'E') # 強制單向持倉；確定性 ID 防止重試重複成交
             )
 
             if main_order:
+                self._trace(signal, "entry_ack")
                 # 4. 設置 TP/SL (假設平均分配給 TP1, TP2)
                 # 這裡可以根據需要調整 TP 的數量分配
                 # 如果只有 2 個 TP，則各 50%
                 from datetime import datetime
                 now_str = datetime.now().strftime("%H:%M:%S")
                 
-                tp_info, sl_id = await self._set_tp_sl(symbol, side, amount, sl_price, target_tps)
+                tp_info, sl_id = await self._set_tp_sl(symbol, side, amount, sl_price, target_tps, signal)
                 
-                self.watched_trades.append({
-                    "symbol": symbol, "side": side, "entry_price": current_price,
-                    "tp_orders": tp_info, "sl_order_id": sl_id,
-                    "tp_history": target_tps, "current_tp_stage": 0,
-                    "remaining_amount": amount, "timestamp": now_str
-                })
+                self._track_trade(TrackedTrade(
+                    signal_id=signal.signal_id,
+                    symbol=symbol, side=side, entry_price=current_price,
+                    tp_orders=tp_info, sl_order_id=sl_id, sl_price=sl_price if sl_id else None,
+                    tp_history=target_tps, current_tp_stage=0,
+                    remaining_amount=amount, timestamp=now_str
+                ))
 
         except Exception as e:
             err_msg = str(e)
@@ -110,76 +98,42 @@ class ItalyStrategy(StrategyBase):
             else:
                 print(f"[Italy Strategy Error] {e}")
 
-    async def _set_tp_sl(self, symbol, side, total_amount, sl_price, tps):
+    async def _set_tp_sl(self, symbol, side, total_amount, sl_price, tps, signal=None):
         close_side = 'sell' if side == 'buy' else 'buy'
-        tp_infos = []
         
         if not tps: return [], None
 
-        # 比例分配：如果有 2 個 TP，各 50%
+        # 比例分配：如果有 2 個 TP，各 50%；TP 與 SL 以單一批次送出
         qty_per_tp = total_amount / len(tps)
-        
-        for i, price in enumerate(tps):
-            try:
-                order = self.execute_trade(
-                    symbol=symbol, side=close_side, amount=qty_per_tp,
-                    order_type='limit', price=price, params={'reduceOnly': True, 'positionIdx': 0}
-                )
-                if order:
-                    tp_infos.append({"id": order['id'], "price": price, "stage": i+1})
-            except: pass
-
-        sl_id = None
+        orders = [
+            {"symbol": symbol, "type": 'limit', "side": close_side, "amount": qty_per_tp,
+             "price": price, "params": self.with_client_id({'reduceOnly': True, 'positionIdx': 0}, signal, f"TP{i+1}")}
+            for i, price in enumerate(tps)
+        ]
         if sl_price:
-            try:
-                sl_order = self.execute_trade(
-                    symbol=symbol, side=close_side, amount=total_amount,
-                    order_type='market', params={'stopPrice': sl_price, 'reduceOnly': True, 'positionIdx': 0}
-                )
-                sl_id = sl_order['id'] if sl_order else None
-            except: pass
-            
+            orders.append({
+                "symbol": symbol, "type": 'market', "side": close_side, "amount": total_amount,
+                "price": None, "params": self.with_client_id({'stopPrice': sl_price, 'reduceOnly': True, 'positionIdx': 0}, signal, 'SL')
+            })
+        placed = await self.execute_batch(orders)
+        self._trace_batch(signal, [f"tp{i+1}" for i in range(len(tps))] + (["sl"] if sl_price else []), placed)
+
+        tp_infos = [
+            TPLeg(id=order['id'], price=price, stage=i+1)
+            for i, (price, order) in enumerate(zip(tps, placed)) if order
+        ]
+        sl_id = placed[-1]['id'] if sl_price and placed[-1] else None
         return tp_infos, sl_id
 
-    async def _monitor_loop(self):
-        while self._is_running:
-            if hasattr(self, 'engine'):
-                self.engine.stats['active_trades'] = self.watched_trades
-            
-            for trade in self.watched_trades[:]:
-                await self._check_update(trade)
-            await asyncio.sleep(5)
-
-    async def _check_update(self, trade):
-        symbol = trade['symbol']
-        for tp in trade['tp_orders'][:]:
-            try:
-                info = self.exchange.get_order(tp['id'], symbol)
-                if info.get('status') == 'closed':
-                    trade['current_tp_stage'] = tp['stage']
-                    trade['remaining_amount'] -= (trade['remaining_amount'] / (len(trade['tp_orders']))) # 簡易估計
-                    # 移動止損 (Italy 邏輯：TP1 達成後 SL 移至開倉價)
-                    if tp['stage'] == 1:
-                        await self._move_sl(trade, trade['entry_price'])
-                    trade['tp_orders'].remove(tp)
-            except Exception: pass
-        
-        if not trade['tp_orders']:
-            self.watched_trades.remove(trade)
+    async def _on_tp_filled(self, trade, tp):
+        trade.current_tp_stage = tp.stage
+        trade.remaining_amount -= (trade.remaining_amount / (len(trade.tp_orders))) # 簡易估計
+        # 移動止損 (Italy 邏輯：TP1 達成後 SL 移至開倉價)
+        if tp.stage == 1:
+            await self._move_sl(trade, trade.entry_price)
 
     async def _move_sl(self, trade, new_price):
-        symbol = trade['symbol']
-        side = trade['side']
-        close_side = 'sell' if side == 'buy' else 'buy'
-        if trade.get('sl_order_id'):
-            try: self.exchange.cancel_order(trade['sl_order_id'], symbol)
-            except: pass
-        
-        new_sl = self.execute_trade(
-            symbol=symbol, side=close_side, amount=trade['remaining_amount'],
-            order_type='market', params={'stopPrice': new_price, 'reduceOnly': True, 'positionIdx': 0}
-        )
-        trade['sl_order_id'] = new_sl['id'] if new_sl else None
+        await self._move_stop(trade, new_price, f"SL{trade.current_tp_stage}")
 
     def on_tick(self, data: Dict[str, Any]) -> None: pass
 
@@ -10,8 +10,9 @@ class Dashboard:
         layout = Layout()
         layout.split_column(
             Layout(name="header", size=3),
-            Layout(name="upper", size=9),  # 統計數據
+            Layout(name="upper", size=13), # 統計數據
             Layout(name="middle", size=9), # 持倉狀態
+            Layout(name="latency", size=12), # 訊號延遲百分位
             Layout(name="lower", size=10), # 訊息日誌 (擴大以佔滿底部)
         )
         return layout
@@ -32,8 +33,36 @@ class Dashboard:
         table.add_row("已接收訊號:", str(stats['total_signals']))
         table.add_row("已執行下單:", str(stats['executed_trades']))
         table.add_row("最後訊號時間:", str(stats['last_signal_time']))
+        table.add_row("下單延遲 熱/冷:", Dashboard._format_latency(stats.get('order_latency')))
+        table.add_row("帳戶派發偏差:", Dashboard._format_dispatch(stats.get('dispatch')))
+        table.add_row("訊號管線:", Dashboard._format_pipeline(stats.get('pipeline')))
         return Panel(table, title="[bold white]核心統計[/bold white]", border_style="cyan")
 
+    @staticmethod
+    def _format_latency(report):
+        if not report:
+            return "[dim]N/A[/dim]"
+        def fmt(entry):
+            return f"{entry['avg_ms']:.0f}ms ({entry['count']})" if entry and entry['avg_ms'] is not None else "-"
+        return f"[green]{fmt(report.get('warm'))}[/green] / [red]{fmt(report.get('cold'))}[/red]"
+
+    @staticmethod
+    def _format_dispatch(dispatch):
+        if not dispatch:
+            return "[dim]N/A[/dim]"
+        offsets = " ".join(f"{acct}+{ms:.0f}" for acct, ms in sorted(dispatch['offsets_ms'].items(), key=lambda x: x[1]))
+        pending = f" [yellow]待送 {len(dispatch['pending'])}[/yellow]" if dispatch['pending'] else ""
+        return f"[cyan]{dispatch['skew_ms']:.0f}ms[/cyan] [dim]({offsets})[/dim]{pending}"
+
+    @staticmethod
+    def _format_pipeline(pipeline):
+        if not pipeline:
+            return "[dim]N/A[/dim]"
+        queued = pipeline['receive_depth'] + sum(pipeline['dispatch_depth'].values())
+        running = sum(pipeline['in_flight'].values())
+        lost = pipeline['dropped'] + pipeline['spilled'] + pipeline['expired']
+        return f"排隊 {queued} / 執行中 {running}" + (f" [red]捨棄 {lost}[/red]" if lost else "")
+
     @staticmethod
     def get_trades_panel(active_trades):
         table = Table(expand=True)
@@ -48,17 +77,44 @@ class Dashboard:
             return Panel("[dim]目前無活動持倉[/dim]", title="[bold white]活動持倉監控[/bold white]", border_style="green")
 
         for t in active_trades:
-            side_style = "red" if t['side'] == 'sell' else "blue"
+            # 持倉狀態未變時重用已格式化的字串 (每次刷新不重新組字串)
+            timestamp, symbol, side, entry_price, stage, remaining = t.display_row()
+            side_style = "red" if side == 'sell' else "blue"
             table.add_row(
-                t.get('timestamp', 'N/A'),
-                t['symbol'], 
-                f"[{side_style}]{t['side'].upper()}[/{side_style}]",
-                str(t['entry_price']),
-                f"TP級別: {t['current_tp_stage']}",
-                str(t['remaining_amount'])
+                timestamp,
+                symbol, 
+                f"[{side_style}]{side.upper()}[/{side_style}]",
+                entry_price,
+                f"TP級別: {stage}",
+                remaining
             )
         return Panel(table, title="[bold white]活動持倉監控[/bold white]", border_style="green")
 
+    @staticmethod
+    def get_latency_panel(tracer):
+        """各來源 / 追蹤點的滾動 p50 / p95 / p99 (距離收到訊息的累計毫秒)"""
+        table = Table(expand=True)
+        table.add_column("來源", style="magenta")
+        table.add_column("追蹤點", style="cyan")
+        table.add_column("筆數", justify="right", style="dim")
+        table.add_column("p50", justify="right", style="green")
+        table.add_column("p95", justify="right", style="yellow")
+        table.add_column("p99", justify="right", style="red")
+
+        sources = tracer.sources()
+        if not sources:
+            return Panel("[dim]尚無完成的訊號追蹤[/dim]", title="[bold white]訊號延遲 (ms)[/bold white]", border_style="magenta")
+
+        for source in (["*"] + sources if len(sources) > 1 else sources):
+            for stage, pct in tracer.percentiles(source).items():
+                if stage == "received":
+                    continue
+                table.add_row(
+                    "全部" if source == "*" else source, stage, str(pct['count']),
+                    f"{pct['p50']:.1f}", f"{pct['p95']:.1f}", f"{pct['p99']:.1f}"
+                )
+        return Panel(table, title="[bold white]訊號延遲 (ms)[/bold white]", border_style="magenta")
+
     @staticmethod
     def get_logs_panel(logs):
         content = "\n".join(logs) if logs else "[dim]尚無訊息紀錄...[/dim]"
@@ -0,0 +1,66 @@
+import time
+import asyncio
+from src.adapters.sim_adapter import SimulatedExchange
+from src.core.strategy_base import StrategyBase
+
+SYMBOL = "BTC/USDT:USDT"
+LATENCY_MS = 200
+
+
+class IdleStrategy(StrategyBase):
+    """只使用 execute_trade 的最小策略"""
+
+    def on_tick(self, data):
+        pass
+
+    def on_signal(self, signal_data, source: str = None):
+        pass
+
+    @property
+    def requirements(self):
+        return {}
+
+
+def make_strategy(**sim_config) -> IdleStrategy:
+    exchange = SimulatedExchange()
+    config = {"type": "sim", "prices": {SYMBOL: 100.0}, "order_stream": False, "latency_ms": LATENCY_MS, **sim_config}
+    exchange.initialize({"active": "sim", "sim": config})
+    return IdleStrategy(exchange)
+
+
+def test_concurrent_trades_overlap_their_round_trips():
+    async def run():
+        strategy = make_strategy()
+        started = time.perf_counter()
+        orders = await asyncio.gather(*(strategy.execute_trade(SYMBOL, "buy", 1.0, "market") for _ in range(3)))
+        return orders, time.perf_counter() - started
+
+    orders, elapsed = asyncio.run(run())
+    assert all(order and order["id"] for order in orders)
+    assert len({order["id"] for order in orders}) == 3
+    # 依序排隊至少需要 3 倍延遲；並行時約等於單次延遲
+    assert elapsed < 2 * LATENCY_MS / 1000
+
+
+def test_event_loop_keeps_running_while_orders_are_in_flight():
+    async def run():
+        strategy = make_strategy()
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.create_task(heartbeat())
+        await strategy.execute_trade(SYMBOL, "buy", 1.0, "market")
+        beat.cancel()
+        return ticks
+
+    assert asyncio.run(run()) >= 10
+
+
+def test_rejected_trade_returns_none():
+    strategy = make_strategy(latency_ms=0, errors=[{"endpoint": "order/create", "code": 10001, "rate": 1.0}])
+    assert asyncio.run(strategy.execute_trade(SYMBOL, "buy", 1.0, "market")) is None
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+from src.core.backtester import LadderParams, PRESETS, EXIT_STATUSES, _stop_levels, simulate_signal
+from src.core.models import TradeSignal
+
+SYMBOL = "BTC/USDT:USDT"
+NO_FEES = dict(maker_fee=0.0, taker_fee=0.0)
+FLAT = (100, 101, 99, 100)
+
+
+def candles(*bars):
+    """逐根 (open, high, low, close)，每分鐘一根，第一根開盤時間為 0"""
+    o, h, l, c = (np.array(col, dtype=np.float64) for col in zip(*bars))
+    return np.arange(len(bars), dtype=np.int64) * 60_000, o, h, l, c
+
+
+def long_signal(**fields):
+    values = dict(symbol=SYMBOL, side="buy", leverage=5, entry_min=99.0, entry_max=101.0,
+                  stop_loss=95.0, take_profits=(105.0, 110.0, 115.0, 120.0), signal_id="s1")
+    values.update(fields)
+    return TradeSignal(**values)
+
+
+def short_signal(**fields):
+    values = dict(symbol=SYMBOL, side="sell", leverage=5, entry_min=99.0, entry_max=101.0,
+                  stop_loss=105.0, take_profits=(95.0, 90.0), signal_id="s2")
+    values.update(fields)
+    return TradeSignal(**values)
+
+
+# (名稱, 訊號, K 線, 參數覆寫, 預期 (status, tp_filled, entry_price, exit_price))
+# status 為 trail 代表已成交至少一階止盈後剩餘倉位被止損 (不論止損是否移動過)
+CASES = [
+    ("all_tps", long_signal(), [FLAT, (100, 106, 100, 105), (105, 111, 104, 110), (110, 116, 109, 115), (115, 121, 114, 120)],
+     {}, ("tp", 4, 100.0, 120.0)),
+    ("stop_loss", long_signal(), [FLAT, (100, 100, 94, 95)], {}, ("sl", 0, 100.0, 95.0)),
+    ("gap_through_stop_fills_at_open", long_signal(), [FLAT, (90, 92, 88, 91)], {}, ("sl", 0, 100.0, 90.0)),
+    ("same_bar_tp_and_stop_counts_as_stop", long_signal(), [(100, 106, 94, 100)], {}, ("sl", 0, 100.0, 95.0)),
+    ("trail_to_entry_after_tp1", long_signal(), [FLAT, (100, 106, 100, 105), (105, 105, 99, 99)], {}, ("trail", 1, 100.0, 100.0)),
+    ("trail_to_tp1_after_tp2", long_signal(), [FLAT, (100, 106, 100, 105), (105, 111, 104, 110), (110, 110, 104, 104)],
+     {}, ("trail", 2, 100.0, 105.0)),
+    ("breakeven_stays_at_entry", long_signal(), [FLAT, (100, 106, 100, 105), (105, 111, 104, 110), (110, 110, 99, 99)],
+     {"trail": "breakeven"}, ("trail", 2, 100.0, 100.0)),
+    ("no_trail_keeps_initial_stop", long_signal(), [FLAT, (100, 106, 100, 105), (105, 105, 96, 97), (97, 97, 94, 95)],
+     {"trail": "none"}, ("trail", 1, 100.0, 95.0)),
+    ("still_open_exits_at_last_close", long_signal(), [FLAT, (100, 102, 98, 101)], {}, ("open", 0, 100.0, 101.0)),
+    ("limit_never_touched", long_signal(entry_min=90.0, entry_max=92.0), [FLAT, FLAT, FLAT], {}, ("not_filled", 0, None, None)),
+    ("limit_expires_before_touch", long_signal(entry_min=96.0, entry_max=98.0), [FLAT, FLAT, (99, 99, 97, 98)],
+     {"limit_expiry_bars": 2}, ("not_filled", 0, None, None)),
+    ("limit_fills_within_expiry", long_signal(entry_min=96.0, entry_max=98.0), [FLAT, FLAT, (99, 99, 97, 98), (98, 106, 98, 105)],
+     {"limit_expiry_bars": 3}, ("open", 1, 98.0, 105.0)),
+    ("market_entry_ignores_zone", long_signal(entry_min=90.0, entry_max=92.0), [FLAT, (100, 100, 94, 95)],
+     {"entry": "market"}, ("sl", 0, 100.0, 95.0)),
+    ("max_tps_limits_the_ladder", long_signal(), [FLAT, (100, 106, 100, 105), (105, 111, 104, 110)],
+     {"max_tps": 2, "leg_fraction": None}, ("tp", 2, 100.0, 110.0)),
+    ("short_all_tps", short_signal(), [FLAT, (100, 100, 94, 95), (95, 96, 89, 90)], {}, ("open", 2, 100.0, 90.0)),
+    ("short_gap_through_stop", short_signal(), [FLAT, (110, 112, 108, 111)], {}, ("sl", 0, 100.0, 110.0)),
+    ("short_trail_to_entry", short_signal(), [FLAT, (100, 100, 94, 95), (95, 101, 95, 101)], {}, ("trail", 1, 100.0, 100.0)),
+]
+
+
+def outcome(result):
+    entered = result["status"] in EXIT_STATUSES
+    return (result["status"], result["tp_filled"],
+            result["entry_price"] if entered else None, result["exit_price"] if entered else None)
+
+
+@pytest.mark.parametrize("name, signal, bars, overrides, expected", CASES, ids=[case[0] for case in CASES])
+def test_simulate_signal(name, signal, bars, overrides, expected):
+    params = LadderParams(**{**NO_FEES, **overrides})
+    assert outcome(simulate_signal(0, signal, candles(*bars), params)) == expected
+
+
+def test_every_status_is_covered():
+    assert {case[-1][0] for case in CASES} == {*EXIT_STATUSES, "not_filled"}
+
+
+def test_no_candles_after_signal_is_no_data():
+    result = simulate_signal(10 * 60_000, long_signal(), candles(FLAT, FLAT), LadderParams())
+    assert result["status"] == "no_data"
+
+
+def test_returns_are_proportional_to_notional():
+    bars = [FLAT, (100, 106, 100, 105), (105, 111, 104, 110), (110, 116, 109, 115), (115, 121, 114, 120)]
+    tp = simulate_signal(0, long_signal(), candles(*bars), LadderParams(**NO_FEES))
+    sl = simulate_signal(0, long_signal(), candles(FLAT, (100, 100, 94, 95)), LadderParams(**NO_FEES))
+    # 四階各 25%：(5 + 10 + 15 + 20) / 100 / 4
+    assert tp["pnl"] == pytest.approx(0.125)
+    assert tp["roe"] == pytest.approx(0.125 * 5)
+    assert sl["pnl"] == pytest.approx(-0.05)
+    assert sl["r"] == pytest.approx(-1.0)
+
+
+def test_fees_use_maker_for_tps_and_taker_for_market_legs():
+    params = LadderParams(maker_fee=0.001, taker_fee=0.002, max_tps=1, leg_fraction=1.0)
+    result = simulate_signal(0, long_signal(), candles(FLAT, (100, 106, 100, 105)), params)
+    # 市價進場吃單費 0.002 + 止盈掛單費 0.001 * 105 / 100
+    assert result["status"] == "tp"
+    assert result["pnl"] == pytest.approx(0.05 - 0.002 - 0.00105)
+
+
+# (trail, 方向, 止損, 預期各階止損價)
+STOP_LEVEL_CASES = [
+    ("ladder", 1, 95.0, [95.0, 100.0, 105.0, 110.0, 115.0]),
+    ("breakeven", 1, 95.0, [95.0, 100.0, 100.0, 100.0, 100.0]),
+    ("none", 1, 95.0, [95.0] * 5),
+    ("ladder", 1, None, [-np.inf, 100.0, 105.0, 110.0, 115.0]),
+    ("none", -1, None, [np.inf] * 5),
+    ("ladder", -1, 105.0, [105.0, 100.0, 95.0, 90.0, 85.0]),
+]
+
+
+@pytest.mark.parametrize("trail, direction, stop_loss, expected", STOP_LEVEL_CASES)
+def test_stop_levels(trail, direction, stop_loss, expected):
+    tps = np.array([105.0, 110.0, 115.0, 120.0]) if direction == 1 else np.array([95.0, 90.0, 85.0, 80.0])
+    levels = _stop_levels(LadderParams(trail=trail), stop_loss, 100.0, tps, direction)
+    assert levels.tolist() == expected
+
+
+def test_presets_follow_live_strategies():
+    assert PRESETS["AdTrack"].trail == "ladder" and PRESETS["AdTrack"].entry == "zone"
+    assert PRESETS["ItalyStrategy"].trail == "breakeven" and PRESETS["ItalyStrategy"].entry == "market"
@@ -0,0 +1,92 @@
+import pytest
+
+ccxt = pytest.importorskip("ccxt")
+
+from src.adapters.ccxt_adapter import CCXTAdapter
+
+SYMBOL = "BTC/USDT:USDT"
+
+
+class FakeExchange:
+    """同步 ccxt 交易所替身：記錄每筆實際成立的訂單，plan 依序決定各批次的結果"""
+
+    id = "bybit"
+
+    def __init__(self, plan):
+        self.has = {"createOrders": True, "fetchCanceledAndClosedOrders": True}
+        self.plan = list(plan)
+        self.placed = []
+
+    def _place(self, symbol, params):
+        client_id = (params or {}).get("clientOrderId")
+        if client_id and any(o["clientOrderId"] == client_id for o in self.placed):
+            raise ccxt.InvalidOrder('bybit {"retCode":110072,"retMsg":"OrderLinkedID is duplicate"}')
+        order = {"id": str(len(self.placed) + 1), "clientOrderId": client_id, "symbol": symbol, "status": "open"}
+        self.placed.append(order)
+        return order
+
+    def create_orders(self, chunk):
+        mode = self.plan.pop(0) if self.plan else "ok"
+        if mode == "reject":
+            raise ccxt.InvalidOrder("batch rejected")
+        results = []
+        for i, o in enumerate(chunk):
+            results.append(self._place(o["symbol"], o.get("params")))
+            if mode == "timeout_after_first":
+                raise ccxt.RequestTimeout("timed out")
+        return results
+
+    def create_order(self, symbol, type, side, amount, price=None, params={}):
+        return self._place(symbol, params)
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params={}):
+        client_id = params.get("orderLinkId")
+        return [o for o in self.placed if o["clientOrderId"] == client_id]
+
+    def fetch_canceled_and_closed_orders(self, symbol=None, since=None, limit=None, params={}):
+        return []
+
+
+def make_adapter(plan) -> CCXTAdapter:
+    adapter = CCXTAdapter()
+    adapter._exchange = FakeExchange(plan)
+    adapter._exchange_name = "bybit"
+    return adapter
+
+
+def ladder(n, with_client_id=True):
+    return [{"symbol": SYMBOL, "type": "limit", "side": "sell", "amount": 0.1, "price": 100.0 + i,
+             "params": {"reduceOnly": True, **({"clientOrderId": f"jz1TP{i}"} if with_client_id else {})}}
+            for i in range(n)]
+
+
+def client_ids(adapter):
+    return [o["clientOrderId"] for o in adapter._exchange.placed]
+
+
+def test_rejected_second_chunk_is_resent_alone():
+    adapter = make_adapter(["ok", "reject"])
+    orders = ladder(14)
+    reports = adapter.create_orders(orders)
+    assert all(r["order"] for r in reports)
+    # 第一批的 10 筆不可重送
+    assert sorted(client_ids(adapter)) == sorted(o["params"]["clientOrderId"] for o in orders)
+    assert [r["request"] for r in reports] == orders
+
+
+def test_ambiguous_chunk_looks_up_client_ids_before_resending():
+    adapter = make_adapter(["ok", "timeout_after_first"])
+    orders = ladder(14)
+    reports = adapter.create_orders(orders)
+    assert all(r["order"] for r in reports)
+    assert len(client_ids(adapter)) == len(set(client_ids(adapter))) == 14
+    # 逾時前已成立的那一筆以查詢結果回報
+    assert reports[10]["order"]["id"] == adapter._exchange.placed[10]["id"]
+
+
+def test_ambiguous_chunk_without_client_ids_is_not_resent():
+    adapter = make_adapter(["timeout_after_first"])
+    reports = adapter.create_orders(ladder(3, with_client_id=False))
+    assert len(adapter._exchange.placed) == 1
+    assert [r["order"] for r in reports] == [None, None, None]
+    assert "timed out" in reports[0]["error"]
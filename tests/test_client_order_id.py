@@ -0,0 +1,94 @@
+import asyncio
+from src.adapters.sim_adapter import SimulatedExchange
+from src.core.strategy_base import StrategyBase
+from src.core.models import TradeSignal
+
+SYMBOL = "BTC/USDT:USDT"
+
+
+class BatchStrategy(StrategyBase):
+    """只使用 StrategyBase 下單工具的最小策略"""
+
+    def on_tick(self, data):
+        pass
+
+    def on_signal(self, signal_data, source: str = None):
+        pass
+
+    @property
+    def requirements(self):
+        return {}
+
+
+def make_exchange(**sim_config) -> SimulatedExchange:
+    exchange = SimulatedExchange()
+    exchange.initialize({"active": "sim", "sim": {"prices": {SYMBOL: 100.0}, "order_stream": False, **sim_config}})
+    return exchange
+
+
+def ladder(signal: TradeSignal):
+    """一筆 TP 限價單 + 一筆止損條件單，附帶確定性的 clientOrderId"""
+    strategy = BatchStrategy
+    return [
+        {"symbol": SYMBOL, "type": "limit", "side": "sell", "amount": 0.5, "price": 110.0,
+         "params": strategy.with_client_id({"reduceOnly": True}, signal, "TP1")},
+        {"symbol": SYMBOL, "type": "market", "side": "sell", "amount": 1.0, "price": None,
+         "params": strategy.with_client_id({"reduceOnly": True, "stopPrice": 90.0}, signal, "SL")},
+    ]
+
+
+async def open_position(exchange: SimulatedExchange) -> None:
+    await exchange.create_order(SYMBOL, "market", "buy", 1.0)
+
+
+def test_client_order_id_is_deterministic():
+    signal = TradeSignal(symbol=SYMBOL, side="buy", signal_id="42")
+    assert StrategyBase.client_order_id(signal, "TP1") == "jz42TP1"
+    assert StrategyBase.client_order_id(TradeSignal(symbol=SYMBOL, side="buy"), "TP1") is None
+    assert "clientOrderId" not in StrategyBase.with_client_id({}, None, "SL")
+
+
+def test_retry_after_accepted_leg_recovers_the_existing_order():
+    async def run():
+        exchange = make_exchange()
+        await open_position(exchange)
+        orders = ladder(TradeSignal(symbol=SYMBOL, side="buy", signal_id="7"))
+        # 上一次送出時止損已被接受 (例如回應逾時)，重送時交易所以 110072 拒絕
+        accepted = await exchange.create_orders(orders[1:])
+        placed = await BatchStrategy(exchange).execute_batch(orders)
+        return exchange, accepted[0]["order"], placed
+
+    exchange, accepted, placed = asyncio.run(run())
+    assert all(placed)
+    assert placed[1]["id"] == accepted["id"]
+    assert placed[1]["clientOrderId"] == "jz7SL"
+    # 沒有產生第二張止損單
+    assert exchange.stats()["open_orders"] == 2
+
+
+def test_transient_error_is_retried_without_duplicates():
+    async def run():
+        # 第 2 次 order/create (開倉之後的第一腿) 注入一次限頻錯誤
+        exchange = make_exchange(errors=[{"endpoint": "order/create", "code": 10006, "every": 2, "times": 1}])
+        await open_position(exchange)
+        placed = await BatchStrategy(exchange).execute_batch(ladder(TradeSignal(symbol=SYMBOL, side="buy", signal_id="8")), retries=1)
+        return exchange, placed
+
+    exchange, placed = asyncio.run(run())
+    assert [o["clientOrderId"] for o in placed] == ["jz8TP1", "jz8SL"]
+    assert exchange.stats()["open_orders"] == 2
+    assert exchange.stats()["rejects"] == 1
+
+
+def test_duplicate_without_matching_order_stays_failed():
+    async def run():
+        exchange = make_exchange(prices={SYMBOL: 100.0, "ETH/USDT:USDT": 10.0})
+        await open_position(exchange)
+        signal = TradeSignal(symbol=SYMBOL, side="buy", signal_id="9")
+        # 同一 clientOrderId 已被其他交易對占用：查無此交易對的原訂單，不可視為成功
+        await exchange.create_order("ETH/USDT:USDT", "limit", "buy", 1.0, 5.0, {"clientOrderId": "jz9TP1"})
+        return await BatchStrategy(exchange).execute_batch(ladder(signal), retries=1)
+
+    placed = asyncio.run(run())
+    assert placed[0] is None
+    assert placed[1]["clientOrderId"] == "jz9SL"
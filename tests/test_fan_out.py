@@ -0,0 +1,94 @@
+import asyncio
+from src.adapters.sim_adapter import SimulatedExchange
+from src.core.strategy_base import StrategyBase
+from src.core.strategy_engine import StrategyEngine
+from src.infrastructure.message_parsers.demo_tg_parser import DemoTGParser
+
+SOURCE = "demo"
+SYMBOL = "BTC/USDT"
+
+
+class EntryStrategy(StrategyBase):
+    """收到訊號即市價進場 (下單失敗時例外向上拋出，交由管線計數)"""
+
+    def __init__(self, exchange):
+        super().__init__(exchange)
+        self.orders = []
+
+    def on_tick(self, data):
+        pass
+
+    def on_signal(self, signal_data, source: str = None):
+        pass
+
+    async def handle_signal(self, signal_data, source: str) -> None:
+        self._mark_dispatched(signal_data)
+        order = await self.exchange.create_order(signal_data.symbol, "market", signal_data.side, 1.0)
+        self.orders.append(order)
+
+    @property
+    def requirements(self):
+        return {}
+
+
+def make_account(name: str, **sim_config) -> SimulatedExchange:
+    exchange = SimulatedExchange()
+    exchange.initialize({"active": name, name: {"type": "sim", "prices": {SYMBOL: 100.0}, "order_stream": False, **sim_config}})
+    return exchange
+
+
+def fan_out(accounts, messages, strategy_class=EntryStrategy):
+    async def run():
+        engine = StrategyEngine(next(iter(accounts.values())), accounts=accounts,
+                                tracing_config={"path": None}, store_config={"enabled": False})
+        engine.parsers[SOURCE] = DemoTGParser()
+        strategies = {}
+        for name, exchange in accounts.items():
+            strategies[name] = strategy_class(exchange)
+            engine.add_strategy(strategies[name], {})
+        engine.pipeline.start()
+        for message in messages:
+            engine.pipeline.submit(SOURCE, message)
+        await engine.pipeline.drain()
+        await engine.pipeline.stop()
+        return engine, strategies
+
+    return asyncio.run(run())
+
+
+def test_signal_reaches_every_account():
+    accounts = {name: make_account(name) for name in ("main", "sub1", "sub2")}
+    engine, strategies = fan_out(accounts, ["Long BTC entry 100"])
+    assert {name: len(s.orders) for name, s in strategies.items()} == {"main": 1, "sub1": 1, "sub2": 1}
+    assert sorted(engine.dispatch.last["offsets_ms"]) == ["main", "sub1", "sub2"]
+    assert engine.dispatch.last["pending"] == []
+
+
+def test_one_failing_account_does_not_block_the_others():
+    accounts = {
+        "main": make_account("main"),
+        "broken": make_account("broken", errors=[{"endpoint": "order/create", "code": 10001}]),
+        "sub1": make_account("sub1"),
+    }
+    engine, strategies = fan_out(accounts, ["Long BTC entry 100", "Short BTC entry 101"])
+    assert {name: len(s.orders) for name, s in strategies.items()} == {"main": 2, "broken": 0, "sub1": 2}
+    assert engine.pipeline.counters["failed"] == 2
+    assert accounts["main"].stats()["orders"] == accounts["sub1"].stats()["orders"] == 2
+    # 失敗的帳戶在派發前已標記，偏差統計仍涵蓋所有帳戶
+    assert engine.dispatch.last["pending"] == []
+
+
+def test_signals_are_bound_per_account_with_one_dispatch_id():
+    accounts = {name: make_account(name) for name in ("main", "sub1")}
+    captured = {}
+
+    class Capturing(EntryStrategy):
+        async def handle_signal(self, signal_data, source: str) -> None:
+            captured[self.exchange.exchange_id] = signal_data
+            await super().handle_signal(signal_data, source)
+
+    fan_out(accounts, ["Long BTC entry 100"], Capturing)
+    main, sub1 = captured["main"], captured["sub1"]
+    assert main is not sub1
+    assert main.dispatch_id == sub1.dispatch_id
+    assert main.signal_id == sub1.signal_id
@@ -0,0 +1,157 @@
+import asyncio
+import numpy as np
+import pandas as pd
+import pytest
+from src.adapters.sim_adapter import SimulatedExchange
+from src.core.indicators import RingBuffer, SMA, EMA, ATR, RSI, Crossover
+from src.strategies.demo_ma_crossover import DemoMACrossover
+
+PERIOD = 7
+
+
+def random_walk(n: int = 200, seed: int = 0):
+    """隨機漫步 K 線 (high / low / close)，與 bench_indicators.py 相同的產生方式"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    spread = np.abs(rng.normal(0, 0.005, n)) * close
+    return close + spread, close - spread, close
+
+
+def stream(indicator, *series):
+    """逐筆餵入串流指標，未就緒處為 NaN"""
+    values = [indicator.update(*point) for point in zip(*series)]
+    return np.array([np.nan if v is None else v for v in values])
+
+
+def seeded(x: np.ndarray, period: int, **ewm):
+    """以前 period 筆平均為起始值的 ewm 參考值 (adjust=False)，前 period - 1 筆為 NaN"""
+    smoothed = pd.Series(np.r_[x[:period].mean(), x[period:]]).ewm(adjust=False, **ewm).mean().to_numpy()
+    return np.r_[np.full(period - 1, np.nan), smoothed]
+
+
+def test_ring_buffer_orders_oldest_to_newest():
+    buffer = RingBuffer(3)
+    evicted = [buffer.append(v) for v in (1.0, 2.0, 3.0, 4.0, 5.0)]
+    assert evicted == [None, None, None, 1.0, 2.0]
+    assert list(buffer) == [3.0, 4.0, 5.0]
+    assert (buffer[0], buffer[-1], buffer.last) == (3.0, 5.0, 5.0)
+    with pytest.raises(IndexError):
+        buffer[3]
+
+
+def test_sma_matches_pandas_rolling_over_many_wraps():
+    _, _, close = random_walk()
+    expected = pd.Series(close).rolling(PERIOD).mean().to_numpy()
+    np.testing.assert_allclose(stream(SMA(PERIOD), close), expected, rtol=1e-12, equal_nan=True)
+
+
+def test_sma_recomputes_sum_when_window_wraps():
+    # 1e16 + 1 在浮點下等於 1e16：只靠滾動加減時，擠出 1e16 後總和會變成 0
+    sma = SMA(3)
+    for price in (1e16, 1.0, 1.0):
+        sma.update(price)
+    values = [sma.update(1.0) for _ in range(3)]
+    assert values[-1] == 1.0
+
+
+def test_ema_is_seeded_with_sma():
+    _, _, close = random_walk()
+    values = stream(EMA(PERIOD), close)
+    assert np.isnan(values[:PERIOD - 1]).all()
+    assert values[PERIOD - 1] == pytest.approx(close[:PERIOD].mean())
+    np.testing.assert_allclose(values, seeded(close, PERIOD, span=PERIOD), rtol=1e-12, equal_nan=True)
+
+
+def test_atr_matches_wilder_reference():
+    high, low, close = random_walk()
+    prev = pd.Series(close).shift()
+    tr = pd.concat([pd.Series(high - low), (pd.Series(high) - prev).abs(), (pd.Series(low) - prev).abs()], axis=1).max(axis=1)
+    expected = seeded(tr.to_numpy(), PERIOD, alpha=1 / PERIOD)
+    np.testing.assert_allclose(stream(ATR(PERIOD), high, low, close), expected, rtol=1e-12, equal_nan=True)
+
+
+def test_rsi_matches_wilder_reference():
+    _, _, close = random_walk()
+    delta = np.diff(close)
+    gain = seeded(np.clip(delta, 0, None), PERIOD, alpha=1 / PERIOD)
+    loss = seeded(np.clip(-delta, 0, None), PERIOD, alpha=1 / PERIOD)
+    # 第一筆價格只作為比較基準
+    expected = np.r_[np.nan, 100 - 100 / (1 + gain / loss)]
+    np.testing.assert_allclose(stream(RSI(PERIOD), close), expected, rtol=1e-10, equal_nan=True)
+
+
+def test_rsi_is_neutral_without_moves_and_maximal_without_losses():
+    flat, rising = RSI(3), RSI(3)
+    for i in range(5):
+        flat.update(100.0)
+        rising.update(100.0 + i)
+    assert (flat.value, rising.value) == (50.0, 100.0)
+
+
+# (快線, 慢線) 序列 -> 每步的回傳值
+CROSSOVER_CASES = [
+    ([(None, 1.0), (1.0, None), (1.0, 2.0), (3.0, 2.0)], [0, 0, 0, 1]),
+    ([(3.0, 2.0), (1.0, 2.0), (3.0, 2.0)], [0, -1, 1]),
+    # 兩線相等不算穿越，也不改變比較基準
+    ([(1.0, 2.0), (2.0, 2.0), (1.0, 2.0), (2.0, 2.0), (3.0, 2.0)], [0, 0, 0, 0, 1]),
+    ([(3.0, 2.0), (4.0, 2.0), (5.0, 2.0)], [0, 0, 0]),
+]
+
+
+@pytest.mark.parametrize("pairs, expected", CROSSOVER_CASES)
+def test_crossover(pairs, expected):
+    cross = Crossover()
+    assert [cross.update(fast, slow) for fast, slow in pairs] == expected
+
+
+def test_crossover_matches_sign_flips_of_ema_spread():
+    _, _, close = random_walk(500)
+    fast, slow, cross = EMA(5), EMA(12), Crossover()
+    signals = np.array([cross.update(fast.update(c), slow.update(c)) for c in close])
+    spread = seeded(close, 5, span=5) - seeded(close, 12, span=12)
+    sign = np.sign(spread[~np.isnan(spread)])
+    flips = np.flatnonzero(np.diff(sign)) + 1 + np.isnan(spread).sum()
+    assert np.flatnonzero(signals).tolist() == flips.tolist()
+    assert (signals[flips] == np.sign(spread[flips])).all()
+
+
+def test_demo_ma_crossover_trades_on_synthetic_crosses():
+    symbol = "BTC/USDT:USDT"
+    # 下跌段暖機，反轉上漲產生黃金交叉，再下跌產生死亡交叉
+    falling, rising = [100.0 - i for i in range(10)], [91.0 + 2 * i for i in range(8)]
+    closes = falling + rising + [rising[-1] - 3 * i for i in range(1, 8)]
+
+    async def run():
+        exchange = SimulatedExchange()
+        exchange.initialize({"active": "sim", "sim": {"type": "sim", "prices": {symbol: 100.0}, "order_stream": False}})
+        strategy = DemoMACrossover(exchange)
+        strategy.on_init({"symbol": symbol, "timeframe": "1m", "fast_period": "2", "slow_period": "4",
+                          "ma_type": "SMA", "amount": "1"})
+        positions = []
+        for i, close in enumerate(closes):
+            exchange.set_price(symbol, close)
+            strategy.on_tick({"symbol": symbol, "timeframe": "1m", "close": close, "warmup": i < len(falling)})
+            await asyncio.gather(*strategy._tasks)
+            positions.append((strategy.position, exchange._positions.get(symbol, [0.0])[0]))
+        await strategy.stop()
+        return positions
+
+    positions = asyncio.run(run())
+    assert all(p == (0, 0.0) for p in positions[:len(falling)])
+    # 黃金交叉開多 1，死亡交叉以兩倍數量反手為空 1
+    assert (1, 1.0) in positions
+    assert positions[-1] == (-1, -1.0)
+    changes = [b for a, b in zip(positions, positions[1:]) if a != b]
+    assert changes == [(1, 1.0), (-1, -1.0)]
+
+
+def test_demo_ma_crossover_ignores_other_symbols_and_warmup():
+    exchange = SimulatedExchange()
+    exchange.initialize({"active": "sim", "sim": {"type": "sim", "order_stream": False}})
+    strategy = DemoMACrossover(exchange)
+    strategy.on_init({"symbol": "BTC/USDT:USDT", "fast_period": 2, "slow_period": 3})
+    for close in (10.0, 9.0, 8.0, 7.0, 12.0, 15.0):
+        strategy.on_tick({"symbol": "ETH/USDT:USDT", "close": close})
+        strategy.on_tick({"symbol": "BTC/USDT:USDT", "close": close, "warmup": True})
+    assert strategy.position == 0 and not strategy._tasks
+    assert strategy.fast.ready and strategy.slow.ready
@@ -0,0 +1,87 @@
+import time
+import asyncio
+from src.infrastructure.keep_warm import ConnectionKeeper
+from src.infrastructure.request_scheduler import RequestScheduler, Priority
+
+
+class FakeClient:
+    """只提供伺服器時間請求的假客戶端 (每次往返 rtt 秒)"""
+
+    def __init__(self, rtt: float = 0.01):
+        self.rtt = rtt
+        self.has = {'fetchTime': True}
+        self.pings = 0
+
+    async def fetch_time(self):
+        self.pings += 1
+        await asyncio.sleep(self.rtt)
+        return int(time.time() * 1000)
+
+
+async def request(keeper: ConnectionKeeper, rtt: float = 0.01, measure: bool = True):
+    await keeper.wrap(lambda: asyncio.sleep(rtt), measure)()
+
+
+def test_cold_requests_are_split_out_when_keep_warm_is_disabled():
+    async def run():
+        keeper = ConnectionKeeper(FakeClient(), interval=0, cold_after=0.1)
+        keeper.start()
+        await request(keeper)           # 啟動後第一筆：從未有連線活動
+        await request(keeper)           # 緊接著：熱連線
+        await asyncio.sleep(0.15)       # 閒置超過 cold_after 且未保溫
+        await request(keeper)
+        return keeper.report()
+
+    report = asyncio.run(run())
+    assert report["cold"]["count"] == 2
+    assert report["warm"]["count"] == 1
+
+
+def test_keep_warm_pings_keep_requests_warm():
+    async def run():
+        keeper = ConnectionKeeper(FakeClient(), interval=0.05, cold_after=0.1)
+        await request(keeper)
+        keeper.start()
+        await asyncio.sleep(0.3)
+        await request(keeper)
+        await keeper.stop()
+        return keeper
+
+    keeper = asyncio.run(run())
+    assert keeper.client.pings >= 2
+    assert keeper.last_ping_ms is not None
+    assert keeper.report()["cold"]["count"] == 1
+    assert keeper.report()["warm"]["count"] == 1
+
+
+def test_unmeasured_traffic_counts_as_activity():
+    async def run():
+        keeper = ConnectionKeeper(FakeClient(), interval=0, cold_after=0.1)
+        await request(keeper)
+        for _ in range(3):
+            await asyncio.sleep(0.05)
+            await request(keeper, measure=False)  # 例如價格簿輪詢
+        await request(keeper)
+        return keeper.report()
+
+    report = asyncio.run(run())
+    assert report["cold"]["count"] == 1
+    assert report["warm"]["count"] == 1
+
+
+def test_scheduler_queue_wait_is_not_measured():
+    async def run():
+        keeper = ConnectionKeeper(FakeClient(), interval=0, cold_after=10)
+        scheduler = RequestScheduler(default_rate=100)
+        scheduler.penalize("order/create", 0.2)
+        keeper.touch()
+        started = time.perf_counter()
+        await scheduler.submit(Priority.CRITICAL, "order/create", keeper.wrap(lambda: asyncio.sleep(0.01), True))
+        elapsed = time.perf_counter() - started
+        await scheduler.stop()
+        return elapsed, keeper.report()
+
+    elapsed, report = asyncio.run(run())
+    assert elapsed >= 0.2
+    assert report["warm"]["count"] == 1
+    assert report["warm"]["last_ms"] < 100
@@ -0,0 +1,258 @@
+import asyncio
+import pytest
+from src.adapters.sim_adapter import SimulatedExchange
+from src.core.strategy_base import StrategyBase
+from src.core.order_tracker import OrderTracker
+from src.core.models import TrackedTrade, TPLeg
+
+SYMBOL = "BTC/USDT:USDT"
+
+
+class LadderStrategy(StrategyBase):
+    """記錄止盈成交 / 取消回呼的最小策略"""
+
+    def __init__(self, exchange, tracker: OrderTracker):
+        super().__init__(exchange)
+        self.tracker = tracker
+        self.filled, self.canceled = [], []
+
+    def on_tick(self, data):
+        pass
+
+    def on_signal(self, signal_data, source: str = None):
+        pass
+
+    async def _on_tp_filled(self, trade, tp):
+        self.filled.append(tp.stage)
+
+    async def _on_tp_canceled(self, trade, tp):
+        self.canceled.append(tp.stage)
+
+    @property
+    def requirements(self):
+        return {}
+
+
+def make_exchange(name: str = "sim", **sim_config) -> SimulatedExchange:
+    exchange = SimulatedExchange()
+    config = {"type": "sim", "prices": {SYMBOL: 100.0}, "order_stream": False, **sim_config}
+    exchange.initialize({"active": name, name: config})
+    return exchange
+
+
+def idle_tracker() -> OrderTracker:
+    """監控迴圈不會在測試期間自行到期 (對帳只由測試觸發)"""
+    return OrderTracker(poll_interval=600, min_interval=600, max_interval=600)
+
+
+def count_snapshots(exchange: SimulatedExchange):
+    calls = []
+    original = exchange.fetch_order_snapshot
+
+    async def fetch_order_snapshot(symbol, since=None, limit=100):
+        calls.append(symbol)
+        return await original(symbol, since=since, limit=limit)
+
+    exchange.fetch_order_snapshot = fetch_order_snapshot
+    return calls
+
+
+async def open_ladder(exchange: SimulatedExchange, prices, amount: float = 1.0) -> TrackedTrade:
+    """市價開多並掛出止盈階梯，回傳對應的追蹤交易"""
+    await exchange.create_order(SYMBOL, "market", "buy", amount)
+    legs = []
+    for stage, price in enumerate(prices, 1):
+        order = await exchange.create_order(SYMBOL, "limit", "sell", amount / len(prices), price, {"reduceOnly": True})
+        legs.append(TPLeg(order["id"], price, stage))
+    return TrackedTrade(symbol=SYMBOL, side="buy", entry_price=100.0, remaining_amount=amount, tp_orders=legs)
+
+
+def test_reconcile_applies_fills_and_cancels_from_one_snapshot():
+    async def run():
+        exchange = make_exchange()
+        tracker = idle_tracker()
+        strategy = LadderStrategy(exchange, tracker)
+        trade = await open_ladder(exchange, [110.0, 120.0, 130.0])
+        strategy._track_trade(trade)
+        exchange.set_price(SYMBOL, 111.0)
+        await exchange.cancel_order(trade.tp_orders[1].id, SYMBOL)
+
+        snapshots = count_snapshots(exchange)
+        await tracker.reconcile()
+        remaining = [tp.stage for tp in trade.tp_orders]
+        await tracker.stop()
+        return strategy, snapshots, remaining
+
+    strategy, snapshots, remaining = asyncio.run(run())
+    assert strategy.filled == [1]
+    assert strategy.canceled == [2]
+    assert remaining == [3]
+    assert snapshots == [SYMBOL]
+
+
+def test_trades_on_one_symbol_share_a_snapshot():
+    async def run():
+        exchange = make_exchange()
+        tracker = idle_tracker()
+        strategy = LadderStrategy(exchange, tracker)
+        for prices in ([110.0, 120.0], [115.0, 125.0], [118.0, 128.0]):
+            strategy._track_trade(await open_ladder(exchange, prices))
+        exchange.set_price(SYMBOL, 119.0)
+
+        snapshots = count_snapshots(exchange)
+        await tracker.reconcile()
+        await tracker.stop()
+        return strategy, snapshots
+
+    strategy, snapshots = asyncio.run(run())
+    assert sorted(strategy.filled) == [1, 1, 1]
+    assert snapshots == [SYMBOL]
+
+
+def test_completed_trade_is_untracked():
+    async def run():
+        exchange = make_exchange()
+        tracker = idle_tracker()
+        strategy = LadderStrategy(exchange, tracker)
+        strategy._track_trade(await open_ladder(exchange, [110.0, 120.0]))
+        exchange.set_price(SYMBOL, 121.0)
+        await tracker.reconcile()
+        result = strategy.watched_trades, tracker.stats()["tracked"]
+        await tracker.stop()
+        return strategy, result
+
+    strategy, (watched, tracked) = asyncio.run(run())
+    assert strategy.filled == [1, 2]
+    assert watched == []
+    assert tracked == 0
+
+
+def test_strategy_instances_share_one_tracker_and_snapshot():
+    async def run():
+        exchange = make_exchange()
+        tracker = idle_tracker()
+        # 同一帳戶的兩個綁定頻道實例
+        first, second = LadderStrategy(exchange, tracker), LadderStrategy(exchange, tracker)
+        first._track_trade(await open_ladder(exchange, [110.0, 130.0]))
+        second._track_trade(await open_ladder(exchange, [120.0, 130.0]))
+        merged = len(tracker.active_trades)
+        exchange.set_price(SYMBOL, 121.0)
+
+        snapshots = count_snapshots(exchange)
+        await tracker.reconcile()
+        await tracker.stop()
+        return first, second, merged, snapshots
+
+    first, second, merged, snapshots = asyncio.run(run())
+    assert merged == 2
+    assert first.filled == [1] and second.filled == [1]
+    assert snapshots == [SYMBOL]
+
+
+def test_reconcile_can_be_limited_to_one_account():
+    async def run():
+        main, sub = make_exchange("main"), make_exchange("sub")
+        tracker = idle_tracker()
+        on_main, on_sub = LadderStrategy(main, tracker), LadderStrategy(sub, tracker)
+        on_main._track_trade(await open_ladder(main, [110.0, 120.0]))
+        on_sub._track_trade(await open_ladder(sub, [110.0, 120.0]))
+        main.set_price(SYMBOL, 111.0)
+        sub.set_price(SYMBOL, 111.0)
+
+        main_snapshots, sub_snapshots = count_snapshots(main), count_snapshots(sub)
+        await tracker.reconcile(["sub"])
+        await tracker.stop()
+        return on_main, on_sub, main_snapshots, sub_snapshots
+
+    on_main, on_sub, main_snapshots, sub_snapshots = asyncio.run(run())
+    assert on_main.filled == [] and on_sub.filled == [1]
+    assert main_snapshots == [] and sub_snapshots == [SYMBOL]
+
+
+def test_fill_is_applied_once_when_reported_twice():
+    async def run():
+        exchange = make_exchange()
+        tracker = idle_tracker()
+        strategy = LadderStrategy(exchange, tracker)
+        trade = await open_ladder(exchange, [110.0, 120.0])
+        strategy._track_trade(trade)
+        exchange.set_price(SYMBOL, 111.0)
+        # 推送與輪詢各回報一次同一筆成交
+        await tracker._on_order_update(exchange.exchange_id, {"id": trade.tp_orders[0].id, "status": "closed"})
+        await tracker.reconcile()
+        await tracker.stop()
+        return strategy
+
+    strategy = asyncio.run(run())
+    assert strategy.filled == [1]
+
+
+# 價格固定在 100；(止盈價位, 止損價, 預期間隔)，drift_per_second=0.001 時距離 1% 對應 10 秒
+CADENCE_CASES = [
+    ((100.01,), None, 0.5),          # 貼近止盈：限制在 min_interval
+    ((99.0,), None, 0.5),            # 已越過止盈：距離視為 0
+    ((101.0, 105.0), None, 10.0),    # 取最近的止盈
+    ((200.0,), 99.8, 2.0),           # 止損比止盈近
+    ((200.0,), None, 300.0),         # 遠離所有價位：退避至 max_interval
+]
+
+
+def cadence_trade(tp_prices, sl_price=None, symbol: str = SYMBOL) -> TrackedTrade:
+    legs = [TPLeg(f"tp{stage}", price, stage) for stage, price in enumerate(tp_prices, 1)]
+    return TrackedTrade(symbol=symbol, side="buy", entry_price=100.0, remaining_amount=1.0,
+                        tp_orders=legs, sl_price=sl_price)
+
+
+async def interval_of(exchange: SimulatedExchange, trade: TrackedTrade) -> float:
+    tracker = OrderTracker(poll_interval=5, stream_poll_interval=60, min_interval=0.5,
+                           max_interval=300, drift_per_second=0.001)
+    tracker.watch(exchange)
+    interval = tracker._interval(exchange.exchange_id, trade)
+    await tracker.stop()
+    return interval
+
+
+@pytest.mark.parametrize("tp_prices, sl_price, expected", CADENCE_CASES)
+def test_interval_follows_distance_to_nearest_level(tp_prices, sl_price, expected):
+    trade = cadence_trade(tp_prices, sl_price)
+    assert asyncio.run(interval_of(make_exchange(), trade)) == pytest.approx(expected)
+
+
+def test_interval_for_short_follows_levels_below_price():
+    trade = cadence_trade((99.0,), 150.0)
+    trade.side = "sell"
+    assert asyncio.run(interval_of(make_exchange(), trade)) == pytest.approx(10.0)
+
+
+def test_interval_without_price_uses_poll_interval():
+    trade = cadence_trade((100.01,), symbol="ETH/USDT:USDT")
+    assert asyncio.run(interval_of(make_exchange(), trade)) == 5
+
+
+def test_pushed_account_polls_no_faster_than_stream_interval():
+    async def run():
+        exchange = make_exchange(order_stream=True)
+        await exchange.warm_up()
+        near = await interval_of(exchange, cadence_trade((100.01,)))
+        far = await interval_of(exchange, cadence_trade((200.0,)))
+        await exchange.close()
+        return near, far
+
+    assert asyncio.run(run()) == (60, 300)
+
+
+def test_near_trade_is_checked_before_far_trade():
+    async def run():
+        exchange = make_exchange()
+        tracker = OrderTracker(poll_interval=5, min_interval=0.5, max_interval=300, drift_per_second=0.001)
+        strategy = LadderStrategy(exchange, tracker)
+        far = await open_ladder(exchange, [200.0])
+        near = await open_ladder(exchange, [100.05])
+        strategy._track_trade(far)
+        strategy._track_trade(near)
+        due = dict(tracker._due)
+        await tracker.stop()
+        return due[near], due[far]
+
+    near_due, far_due = asyncio.run(run())
+    assert far_due - near_due == pytest.approx(300 - 0.5, abs=0.1)
@@ -0,0 +1,140 @@
+import asyncio
+from src.infrastructure.request_scheduler import RequestScheduler, Priority, TokenBucket, record_response_headers, with_response_headers
+
+
+def run_order(submissions, rate: float = 20.0):
+    """先用掉權杖再一次排入所有請求，回傳實際執行順序"""
+    async def run():
+        scheduler = RequestScheduler(default_rate=rate)
+        executed = []
+
+        def factory(tag):
+            async def call():
+                executed.append(tag)
+            return call
+
+        await scheduler.submit(Priority.BACKGROUND, "order/create", factory("warmup"))
+        scheduler.bucket("order/create").tokens = 0
+        await asyncio.gather(*(scheduler.submit(lane, endpoint, factory(tag)) for tag, lane, endpoint in submissions))
+        await scheduler.stop()
+        return executed[1:]
+
+    return asyncio.run(run())
+
+
+def test_higher_priority_lanes_are_released_first():
+    order = run_order([
+        ("background", Priority.BACKGROUND, "order/create"),
+        ("orders", Priority.ORDERS, "order/create"),
+        ("critical", Priority.CRITICAL, "order/create"),
+    ])
+    assert order == ["critical", "orders", "background"]
+
+
+def test_same_lane_is_first_in_first_out():
+    order = run_order([(f"tp{i}", Priority.ORDERS, "order/create") for i in range(4)])
+    assert order == ["tp0", "tp1", "tp2", "tp3"]
+
+
+def test_blocked_endpoint_does_not_hold_back_other_endpoints():
+    async def run():
+        scheduler = RequestScheduler(default_rate=100)
+        scheduler.penalize("order/create", 0.3)
+        executed = []
+
+        async def call(tag):
+            executed.append(tag)
+
+        await asyncio.gather(
+            scheduler.submit(Priority.CRITICAL, "order/create", lambda: call("create")),
+            scheduler.submit(Priority.BACKGROUND, "order/realtime", lambda: call("realtime")),
+        )
+        await scheduler.stop()
+        return executed
+
+    assert asyncio.run(run()) == ["realtime", "create"]
+
+
+def test_shared_global_bucket_limits_all_schedulers():
+    async def run():
+        bucket = TokenBucket(5, capacity=1)
+        first = RequestScheduler(default_rate=1000, global_bucket=bucket)
+        second = RequestScheduler(default_rate=1000, global_bucket=bucket)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        finished = []
+
+        async def call():
+            finished.append(loop.time() - started)
+
+        await asyncio.gather(first.submit(Priority.CRITICAL, "order/create", call),
+                             second.submit(Priority.CRITICAL, "order/create", call))
+        await first.stop()
+        await second.stop()
+        return finished
+
+    finished = asyncio.run(run())
+    # IP 額度每秒 5 次：兩個帳戶各一筆時第二筆需等待約 0.2 秒
+    assert finished[0] < 0.1
+    assert finished[1] >= 0.15
+
+
+def test_observe_ignores_missing_or_zero_limit():
+    scheduler = RequestScheduler(default_rate=10)
+    scheduler.observe("order/create", {"X-Bapi-Limit": "0", "X-Bapi-Limit-Status": "0"})
+    bucket = scheduler.bucket("order/create")
+    assert bucket.rate == 10
+    assert bucket.blocked_until > 0
+
+    scheduler.observe("order/cancel", {"X-Bapi-Limit": "20", "X-Bapi-Limit-Status": "5"})
+    assert scheduler.bucket("order/cancel").rate == 20
+    assert scheduler.bucket("order/cancel").tokens == 5
+
+
+class HeaderClient:
+    """模擬 ccxt：收到回應時同步呼叫 on_rest_response，之後仍可能暫停 (釋放連線 / 解析) 才返回"""
+
+    def __init__(self):
+        self.last_response_headers = None
+
+    def on_rest_response(self, code, reason, url, method, response_headers, body, request_headers, request_body):
+        return body
+
+    async def fetch(self, url, limit, before, after):
+        await asyncio.sleep(before)
+        headers = {"X-Bapi-Limit": str(limit), "X-Bapi-Limit-Status": str(limit - 1)}
+        body = self.on_rest_response(200, "OK", url, "GET", headers, "{}", {}, None)
+        self.last_response_headers = headers
+        await asyncio.sleep(after)
+        return body
+
+
+def test_interleaved_responses_calibrate_their_own_endpoint():
+    async def run():
+        scheduler = RequestScheduler(default_rate=100.0)
+        client = HeaderClient()
+        record_response_headers(client)
+
+        async def call(endpoint, limit, before, after):
+            factory = with_response_headers(lambda: client.fetch(endpoint, limit, before, after))
+            result, headers = await scheduler.submit(Priority.BACKGROUND, endpoint, factory)
+            scheduler.observe(endpoint, headers)
+
+        # order/create 先收到回應但較晚返回，期間 order/realtime 的回應覆寫了 last_response_headers
+        await asyncio.gather(call("order/create", 10, 0.01, 0.03), call("order/realtime", 50, 0.02, 0.0))
+        await scheduler.stop()
+        return scheduler, client
+
+    scheduler, client = asyncio.run(run())
+    assert client.last_response_headers["X-Bapi-Limit"] == "50"
+    assert scheduler.bucket("order/create").rate == 10
+    assert scheduler.bucket("order/realtime").rate == 50
+
+
+def test_request_without_http_response_reports_no_headers():
+    async def run():
+        async def cached():
+            return "cached"
+        return await with_response_headers(cached)()
+
+    assert asyncio.run(run()) == ("cached", None)
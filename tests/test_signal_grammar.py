@@ -0,0 +1,81 @@
+import pytest
+from src.infrastructure.message_parsers.parser_factory import ParserFactory
+from src.infrastructure.message_parsers.signal_grammar import SignalGrammar
+
+ADTRACK = """🔮預言機訊號🔮
+💎交易對： DAMUSDT
+📈倉位： SHORT
+⚡槓桿倍數： 6X
+🎯進場區域： 0.02023-0.02003
+🛑止損： 0.0215
+✅目標1： 0.0195
+✅目標2： 0.0190
+✅目標3： 0.0185
+✅目標4： 0.0180"""
+
+ITALY = """MORPHO/USDT
+LONG Cross 20x
+Entry Zone: 1.2168/1.2446
+TP1: 1.30
+TP2: 1.40
+SL: 1.10"""
+
+NOISE = "gm everyone, market looks choppy today — waiting for a cleaner setup before the next call"
+
+ADTRACK_TPS = (0.0195, 0.019, 0.0185, 0.018)
+
+# 期望值為改用 YAML 格式前 AdTrackParser / ItalyParser 對同一訊息的輸出
+# (symbol, side, leverage, entry_min, entry_max, stop_loss, take_profits, force_market)
+CASES = [
+    ("adtrack_parser", ADTRACK, ("DAM/USDT:USDT", "sell", 6, 0.02003, 0.02023, 0.0215, ADTRACK_TPS, False)),
+    ("adtrack_parser", ADTRACK.replace("SHORT", "LONG").replace("6X", "12X"),
+     ("DAM/USDT:USDT", "buy", 12, 0.02003, 0.02023, 0.0215, ADTRACK_TPS, False)),
+    ("adtrack_parser", ADTRACK.replace("⚡槓桿倍數： 6X\n", ""),
+     ("DAM/USDT:USDT", "sell", 1, 0.02003, 0.02023, 0.0215, ADTRACK_TPS, False)),
+    ("adtrack_parser", "\n".join(ADTRACK.split("\n")[:4]), ("DAM/USDT:USDT", "sell", 6, None, None, None, (), False)),
+    ("adtrack_parser", NOISE, None),
+    ("italy_parser", ITALY, ("MORPHO/USDT:USDT", "buy", 20, 1.2168, 1.2446, 1.1, (1.3, 1.4), True)),
+    ("italy_parser", ITALY.replace("LONG", "SHORT"), ("MORPHO/USDT:USDT", "sell", 20, 1.2168, 1.2446, 1.1, (1.3, 1.4), True)),
+    ("italy_parser", ITALY.replace("\nSL: 1.10", ""), ("MORPHO/USDT:USDT", "buy", 20, 1.2168, 1.2446, None, (1.3, 1.4), True)),
+    ("italy_parser", "ETH/USDT\nBUY 5x\nEntry Zone: 3000/2900\nTP1: 3100\nStop Loss: 2800",
+     ("ETH/USDT:USDT", "buy", 5, 2900.0, 3000.0, 2800.0, (3100.0,), True)),
+    ("italy_parser", NOISE, None),
+]
+
+
+def summary(signal):
+    if signal is None:
+        return None
+    return (signal.symbol, signal.side, signal.leverage, signal.entry_min, signal.entry_max,
+            signal.stop_loss, signal.take_profits, signal.force_market)
+
+
+@pytest.mark.parametrize("name, message, expected", CASES)
+def test_grammar_matches_previous_parsers(name, message, expected):
+    signal = ParserFactory.create_parser(name).parse(message)
+    assert summary(signal) == expected
+    if signal is not None:
+        assert signal.raw_text == message
+
+
+def test_non_string_message_is_ignored():
+    assert ParserFactory.create_parser("adtrack_parser").parse(None) is None
+
+
+def test_required_many_field_needs_its_own_match():
+    grammar = SignalGrammar({
+        "name": "tp_required",
+        "required": ["symbol", "take_profits"],
+        "fields": {
+            "symbol": {"pattern": r"^(?P<symbol>[A-Z]+)", "flags": "m"},
+            "take_profits": {"pattern": r"TP\d+:\s*(?P<take_profits>[\d\.]+)", "many": True, "normalize": "float"},
+        },
+    })
+    assert grammar.match("BTCUSDT\nTP1: 1\nTP2: 2")["take_profits"] == [1.0, 2.0]
+    # 其他欄位已有值不代表 many 欄位成立
+    assert grammar.match("BTCUSDT\nno targets") is None
+
+
+def test_unknown_output_field_is_rejected():
+    with pytest.raises(ValueError):
+        SignalGrammar({"name": "bad", "fields": {"symbol": {"pattern": r"(?P<symbol>\w+) (?P<colour>\w+)"}}})
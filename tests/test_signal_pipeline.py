@@ -0,0 +1,119 @@
+import json
+import time
+import asyncio
+from src.adapters.sim_adapter import SimulatedExchange
+from src.core.strategy_base import StrategyBase
+from src.core.strategy_engine import StrategyEngine
+from src.infrastructure.message_parsers.demo_tg_parser import DemoTGParser
+
+SOURCE = "demo"
+
+
+class RecordingStrategy(StrategyBase):
+    """記錄收到的訊號 (不下單)"""
+
+    def __init__(self, exchange):
+        super().__init__(exchange)
+        self.received = []
+
+    def on_tick(self, data):
+        pass
+
+    def on_signal(self, signal_data, source: str = None):
+        self.received.append(signal_data.entry_price)
+
+    @property
+    def requirements(self):
+        return {}
+
+
+def entries(count: int):
+    """進場價 1..count 的訊息 (各不相同，不會被冪等檢查剔除)"""
+    return [f"Long BTC entry {i}" for i in range(1, count + 1)]
+
+
+def make_engine(**pipeline_config):
+    exchange = SimulatedExchange()
+    exchange.initialize({"active": "sim", "sim": {"order_stream": False}})
+    engine = StrategyEngine(exchange, pipeline_config=pipeline_config,
+                            tracing_config={"path": None}, store_config={"enabled": False})
+    engine.parsers[SOURCE] = DemoTGParser()
+    strategy = RecordingStrategy(exchange)
+    engine.add_strategy(strategy, {})
+    return engine, strategy
+
+
+def burst(messages, **pipeline_config):
+    """在工作者執行前一次送入所有訊息，處理完畢後回傳 (引擎, 策略, 各筆是否排入)"""
+    async def run():
+        engine, strategy = make_engine(**pipeline_config)
+        engine.pipeline.start()
+        accepted = [engine.pipeline.submit(SOURCE, message) for message in messages]
+        await engine.pipeline.drain()
+        await engine.pipeline.stop()
+        return engine, strategy, accepted
+
+    return asyncio.run(run())
+
+
+def test_drop_oldest_keeps_the_latest_signals():
+    engine, strategy, accepted = burst(entries(5), receive_queue=2, overflow="drop_oldest")
+    assert all(accepted)
+    assert strategy.received == [4.0, 5.0]
+    assert engine.pipeline.counters["dropped"] == 3
+
+
+def test_drop_newest_rejects_signals_once_full():
+    engine, strategy, accepted = burst(entries(5), receive_queue=2, overflow="drop_newest")
+    assert accepted == [True, True, False, False, False]
+    assert strategy.received == [1.0, 2.0]
+    assert engine.pipeline.counters["dropped"] == 3
+
+
+def test_spill_writes_overflow_to_file(tmp_path):
+    spill_path = tmp_path / "spilled.jsonl"
+    engine, strategy, _ = burst(entries(4), receive_queue=1, overflow="spill", spill_path=str(spill_path))
+    records = [json.loads(line) for line in spill_path.read_text(encoding="utf-8").splitlines()]
+    assert strategy.received == [1.0]
+    assert [r["payload"] for r in records] == ["Long BTC entry 2", "Long BTC entry 3", "Long BTC entry 4"]
+    assert {r["stage"] for r in records} == {"receive"}
+    assert engine.pipeline.counters["spilled"] == 3
+    assert engine.pipeline.counters["dropped"] == 0
+
+
+def test_dispatch_queue_overflow_is_per_account():
+    async def run():
+        engine, strategy = make_engine(dispatch_queue=1, overflow="drop_newest")
+        engine.pipeline.start()
+        # 直接走解析階段，讓三筆訊號在派發工作者執行前同時排入派發佇列
+        for i in range(1, 4):
+            engine.pipeline._parse(SOURCE, f"Long BTC entry {i}", received_at=time.time())
+        await engine.pipeline.drain()
+        await engine.pipeline.stop()
+        return engine, strategy
+
+    engine, strategy = asyncio.run(run())
+    assert strategy.received == [1.0]
+    assert engine.pipeline.counters["dropped"] == 2
+
+
+def test_stale_signals_are_skipped_at_dispatch():
+    async def run():
+        engine, strategy = make_engine(max_signal_age=5)
+        engine.pipeline.start()
+        engine.pipeline._parse(SOURCE, "Long BTC entry 1", received_at=time.time() - 60)
+        engine.pipeline._parse(SOURCE, "Long BTC entry 2", received_at=time.time())
+        await engine.pipeline.drain()
+        await engine.pipeline.stop()
+        return engine, strategy
+
+    engine, strategy = asyncio.run(run())
+    assert strategy.received == [2.0]
+    assert engine.pipeline.counters["expired"] == 1
+
+
+def test_duplicate_signals_are_dropped_before_dispatch():
+    engine, strategy, accepted = burst(["Long BTC entry 1"] * 2)
+    assert accepted == [True, True]
+    assert strategy.received == [1.0]
+    assert engine.pipeline.counters["duplicates"] == 1
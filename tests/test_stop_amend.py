@@ -0,0 +1,90 @@
+import asyncio
+from src.adapters.sim_adapter import SimulatedExchange
+from src.core.strategy_base import StrategyBase
+from src.core.models import TrackedTrade
+
+SYMBOL = "BTC/USDT:USDT"
+
+
+class TrailingStrategy(StrategyBase):
+    """只使用 StrategyBase._move_stop 的最小策略"""
+
+    def on_tick(self, data):
+        pass
+
+    def on_signal(self, signal_data, source: str = None):
+        pass
+
+    @property
+    def requirements(self):
+        return {}
+
+
+def move_stop(stop_amend: str = "edit", errors=None, trigger_first: bool = False):
+    """開多倉並掛出 90 的止損，再將止損移至 100；回傳 (交易所, 交易, 原止損單 ID)"""
+    async def run():
+        exchange = SimulatedExchange()
+        exchange.initialize({"active": "sim", "sim": {
+            "prices": {SYMBOL: 100.0}, "order_stream": False, "stop_amend": stop_amend, "errors": errors or [],
+        }})
+        await exchange.create_order(SYMBOL, "market", "buy", 1.0)
+        stop = await exchange.create_order(SYMBOL, "market", "sell", 1.0, None,
+                                           {"reduceOnly": True, "stopPrice": 90.0, "clientOrderId": "jz1SL"})
+        trade = TrackedTrade(symbol=SYMBOL, side="buy", entry_price=100.0, remaining_amount=1.0,
+                             sl_order_id=stop["id"], sl_price=90.0, signal_id="1")
+        if trigger_first:
+            exchange.set_price(SYMBOL, 89.0)
+        await TrailingStrategy(exchange)._move_stop(trade, 100.0 if not trigger_first else 95.0, "SL2")
+        return exchange, trade, stop["id"]
+
+    return asyncio.run(run())
+
+
+def test_amend_keeps_the_same_stop_order():
+    exchange, trade, stop_id = move_stop()
+    assert trade.sl_order_id == stop_id
+    assert trade.sl_price == 100.0
+    assert exchange._orders[stop_id]["stopPrice"] == 100.0
+    assert exchange.counters["amends"] == 1
+    assert exchange.counters["cancels"] == 0
+
+
+def test_rejected_amend_falls_back_to_cancel_and_replace():
+    exchange, trade, stop_id = move_stop(errors=[{"endpoint": "order/amend", "code": 10001, "times": 1}])
+    assert trade.sl_order_id != stop_id
+    assert trade.sl_price == 100.0
+    assert exchange._orders[stop_id]["status"] == "canceled"
+    replacement = exchange._orders[trade.sl_order_id]
+    assert replacement["stopPrice"] == 100.0
+    assert replacement["clientOrderId"] == "jz1SL2"
+    assert exchange.counters["amends"] == 0
+
+
+def test_replace_mode_skips_the_amend_request():
+    exchange, trade, stop_id = move_stop(stop_amend="replace")
+    assert trade.sl_order_id != stop_id
+    assert exchange._orders[stop_id]["status"] == "canceled"
+    assert exchange.counters["amends"] == 0
+    assert exchange.stats()["open_orders"] == 1
+
+
+def test_triggered_stop_is_not_replaced():
+    exchange, trade, stop_id = move_stop(trigger_first=True)
+    # 舊止損已觸發：撤單失敗，不重掛也不改變追蹤中的止損
+    assert trade.sl_order_id == stop_id
+    assert trade.sl_price == 90.0
+    assert exchange.stats()["open_orders"] == 0
+
+
+def test_supports_stop_edit_follows_config_and_order_state():
+    async def run():
+        results = {}
+        for mode in ("edit", "replace"):
+            exchange = SimulatedExchange()
+            exchange.initialize({"active": "sim", "sim": {"prices": {SYMBOL: 100.0}, "order_stream": False, "stop_amend": mode}})
+            await exchange.create_order(SYMBOL, "market", "buy", 1.0)
+            stop = await exchange.create_order(SYMBOL, "market", "sell", 1.0, None, {"reduceOnly": True, "stopPrice": 90.0})
+            results[mode] = (exchange.supports_stop_edit(stop["id"]), exchange.supports_stop_edit("missing"))
+        return results
+
+    assert asyncio.run(run()) == {"edit": (True, False), "replace": (False, False)}
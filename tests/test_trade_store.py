@@ -0,0 +1,163 @@
+import asyncio
+from src.adapters.sim_adapter import SimulatedExchange
+from src.core.strategy_base import StrategyBase
+from src.core.models import TrackedTrade, TPLeg
+from src.infrastructure.trade_store import TradeStore
+
+SYMBOL = "BTC/USDT:USDT"
+
+
+class TrackingStrategy(StrategyBase):
+    """只使用 StrategyBase 持倉追蹤的最小策略"""
+
+    def on_tick(self, data):
+        pass
+
+    def on_signal(self, signal_data, source: str = None):
+        pass
+
+    @property
+    def requirements(self):
+        return {}
+
+    @property
+    def strategy_name(self):
+        return "tracking"
+
+
+def make_exchange() -> SimulatedExchange:
+    exchange = SimulatedExchange()
+    exchange.initialize({"active": "sim", "sim": {"prices": {SYMBOL: 100.0}, "order_stream": False}})
+    return exchange
+
+
+def make_strategy(exchange: SimulatedExchange, store: TradeStore) -> TrackingStrategy:
+    strategy = TrackingStrategy(exchange)
+    strategy.store = store
+    return strategy
+
+
+def sample_trade(tp_ids) -> TrackedTrade:
+    return TrackedTrade(
+        symbol=SYMBOL, side="buy", entry_price=100.0, remaining_amount=1.0,
+        tp_orders=[TPLeg(tp_id, 110.0 + 10 * i, i + 1) for i, tp_id in enumerate(tp_ids)],
+        tp_history=(110.0, 120.0), sl_order_id="sl-1", sl_price=90.0, signal_id="s1", opened_at=1,
+    )
+
+
+def test_flush_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "trades.db")
+
+    async def run():
+        store = TradeStore(path)
+        store.open()
+        trade = sample_trade(["tp-1", "tp-2"])
+        store.save("acct/tracking/*", trade, "opened")
+        store.save("other/tracking/*", sample_trade(["tp-9"]))
+        await store.flush()
+        await store.close()
+
+        reopened = TradeStore(path)
+        loaded = reopened.load("acct/tracking/*")
+        reopened.remove("acct/tracking/*", loaded[0])
+        await reopened.flush()
+        remaining = reopened.load("acct/tracking/*")
+        await reopened.close()
+        return trade, loaded, remaining
+
+    trade, loaded, remaining = asyncio.run(run())
+    assert len(loaded) == 1
+    assert loaded[0].to_record() == trade.to_record()
+    assert loaded[0].tp_orders[1] == TPLeg("tp-2", 120.0, 2)
+    assert remaining == []
+
+
+def test_pending_writes_keep_only_latest_state(tmp_path):
+    path = str(tmp_path / "trades.db")
+
+    async def run():
+        store = TradeStore(path)
+        store.open()
+        trade = sample_trade(["tp-1"])
+        store.save("scope", trade, "opened")
+        trade.current_tp_stage = 1
+        trade.remaining_amount = 0.5
+        store.save("scope", trade, "tp1_closed")
+        await store.flush()
+        loaded = store.load("scope")
+        events = store._conn.execute("SELECT event, stage FROM trade_events ORDER BY id").fetchall()
+        await store.close()
+        return loaded, events
+
+    loaded, events = asyncio.run(run())
+    assert [(t.current_tp_stage, t.remaining_amount) for t in loaded] == [(1, 0.5)]
+    assert events == [("opened", 0), ("tp1_closed", 1)]
+
+
+def test_restore_reconciles_fills_missed_while_offline(tmp_path):
+    path = str(tmp_path / "trades.db")
+
+    async def run():
+        exchange = make_exchange()
+        await exchange.create_order(SYMBOL, "market", "buy", 1.0)
+        tp1 = await exchange.create_order(SYMBOL, "limit", "sell", 0.5, 110.0, {"reduceOnly": True})
+        tp2 = await exchange.create_order(SYMBOL, "limit", "sell", 0.5, 120.0, {"reduceOnly": True})
+
+        # 第一次運行：追蹤交易後關閉
+        store = TradeStore(path)
+        store.open()
+        first = make_strategy(exchange, store)
+        first._track_trade(sample_trade([tp1["id"], tp2["id"]]))
+        await first.stop()
+        await store.close()
+
+        # 停機期間 TP1 成交
+        exchange.set_price(SYMBOL, 112.0)
+
+        # 第二次運行：還原後以訂單快照對帳
+        store = TradeStore(path)
+        store.open()
+        second = make_strategy(exchange, store)
+        restored = await second.restore_trades()
+        trades = second.watched_trades
+        await store.flush()
+        persisted = store.load(second.store_scope)
+        await second.stop()
+        await store.close()
+        return restored, trades, persisted, tp2["id"]
+
+    restored, trades, persisted, tp2_id = asyncio.run(run())
+    assert restored == 1
+    assert [tp.id for tp in trades[0].tp_orders] == [tp2_id]
+    assert [tp.id for tp in persisted[0].tp_orders] == [tp2_id]
+
+
+def test_restore_untracks_trade_once_all_targets_are_done(tmp_path):
+    path = str(tmp_path / "trades.db")
+
+    async def run():
+        exchange = make_exchange()
+        await exchange.create_order(SYMBOL, "market", "buy", 1.0)
+        tp1 = await exchange.create_order(SYMBOL, "limit", "sell", 1.0, 110.0, {"reduceOnly": True})
+
+        store = TradeStore(path)
+        store.open()
+        store.save(make_strategy(exchange, store).store_scope, sample_trade([tp1["id"]]), "opened")
+        await store.close()
+
+        exchange.set_price(SYMBOL, 111.0)
+
+        store = TradeStore(path)
+        store.open()
+        strategy = make_strategy(exchange, store)
+        restored = await strategy.restore_trades()
+        await store.flush()
+        result = restored, strategy.watched_trades, store.load(strategy.store_scope)
+        await strategy.stop()
+        await store.close()
+        return result
+
+    restored, trades, persisted = asyncio.run(run())
+    assert restored == 1
+    assert trades == []
+    assert persisted == []